@@ -35,3 +35,48 @@ def lint_fix():
     print("\n👉 RUFF")
     os.system("ruff check . --fix")
     os.system("ruff format .")
+
+
+def benchmark(args=sys.argv):
+    from americanes_randomizer.benchmark import main
+
+    main(args[1:])
+
+
+def import_players(args=sys.argv):
+    import argparse
+    from pathlib import Path
+
+    from americanes_randomizer.db.bulk import import_players
+    from americanes_randomizer.db.session import DATABASE_SESSION, create_tables
+
+    parser = argparse.ArgumentParser(description="Import players from a CSV, JSON or JSONL file")
+    parser.add_argument("path", type=Path)
+    parser.add_argument("--no-update", action="store_true", help="keep the existing players")
+    parsed_args = parser.parse_args(args[1:])
+
+    create_tables()
+    with DATABASE_SESSION() as db:
+        report = import_players(parsed_args.path, db, update_existing=not parsed_args.no_update)
+
+    print(f"{report.imported} players imported")
+    for row_error in report.errors:
+        print(f"Row {row_error.row}: {row_error.error}")
+
+
+def export_players(args=sys.argv):
+    import argparse
+    from pathlib import Path
+
+    from americanes_randomizer.db.bulk import export_players
+    from americanes_randomizer.db.session import DATABASE_SESSION, create_tables
+
+    parser = argparse.ArgumentParser(description="Export players to a CSV, JSON or JSONL file")
+    parser.add_argument("path", type=Path)
+    parsed_args = parser.parse_args(args[1:])
+
+    create_tables()
+    with DATABASE_SESSION() as db:
+        n_players = export_players(parsed_args.path, db)
+
+    print(f"{n_players} players exported to {parsed_args.path}")
@@ -0,0 +1,273 @@
+from sqlalchemy.orm import Session
+
+from americanes_randomizer.constants import Levels
+from americanes_randomizer.db import history, ratings
+from americanes_randomizer.instrumentation import timed
+from americanes_randomizer.roster import PlayerRoster
+
+
+REPEAT_LOOKBACK_AMERICANAS = 10
+"""Latest americanas whose courts are penalized when avoiding repeated courts"""
+
+
+@timed
+def generate_americana(
+    roster: PlayerRoster,
+    probability_modification: float,
+    americana_level: Levels,
+    db: Session,
+    best_of: int = 1,
+    seed: int | None = None,
+    n_rounds: int = 1,
+    use_ratings: bool = False,
+    avoid_repeats: bool = False,
+    save: bool = True,
+) -> tuple[int | None, int, list[dict[int, list[str]]]]:
+    """Load what a draw needs from the database, draw an americana and save it in the history
+
+    Parameters
+    ----------
+    roster : PlayerRoster
+        The players to distribute
+    probability_modification : float
+        How much the level of a player skews its probability towards the first or last courts
+    americana_level : Levels
+        The level of the americana
+    db : Session
+        Database of the ratings and the history
+    best_of : int, optional
+        The number of distributions to draw and pick the best from, by default 1
+    seed : int | None, optional
+        Seed of the draw, by default a new one is generated
+    n_rounds : int, optional
+        The number of rounds of the americana, by default 1
+    use_ratings : bool, optional
+        Whether to weight the courts by the ratings of the players instead of their levels, by
+        default False
+    avoid_repeats : bool, optional
+        Whether to penalize courts that group again players that shared one in the last
+        REPEAT_LOOKBACK_AMERICANAS americanas, by default False
+    save : bool, optional
+        Whether to save the americana in the history, by default True
+
+    Returns
+    -------
+    tuple[int | None, int, list[dict[int, list[str]]]]
+        The id of the saved americana, None if not saved, the seed of the draw and the names of
+        the players of each court in each round
+    """
+    player_ratings = None
+    if use_ratings:
+        player_ratings = ratings.load_ratings(roster.names, db)
+
+    co_occurrences = None
+    if avoid_repeats:
+        co_occurrences = history.recent_co_occurrences(roster.names, REPEAT_LOOKBACK_AMERICANAS, db)
+
+    seed, distributions = draw_americana(
+        roster,
+        probability_modification,
+        americana_level,
+        best_of,
+        seed,
+        n_rounds,
+        player_ratings,
+        co_occurrences,
+    )
+
+    americana_id = None
+    if save:
+        americana_id = history.save_americana(
+            distributions,
+            americana_level,
+            probability_modification,
+            seed,
+            db,
+            best_of=best_of,
+            use_ratings=use_ratings,
+            avoid_repeats=avoid_repeats,
+        )
+
+    return americana_id, seed, distributions
+
+
+def format_americana(
+    rounds: list[dict[int, list[str]]],
+    americana_level: Levels,
+    probability_modification: float,
+    best_of: int,
+    seed: int,
+    americana_id: int | None = None,
+    use_ratings: bool = False,
+    avoid_repeats: bool = False,
+) -> str:
+    """Write an americana as text, the players of each court or the matches of each round
+
+    Parameters
+    ----------
+    rounds : list[dict[int, list[str]]]
+        The names of the players of each court in each round
+    americana_level : Levels
+        The level of the americana
+    probability_modification : float
+        The probability modification of the draw
+    best_of : int
+        The number of distributions the first round was picked from
+    seed : int
+        The seed of the draw
+    americana_id : int | None, optional
+        The id of the americana in the history, by default it is not saved
+    use_ratings : bool, optional
+        Whether the courts were weighted by rating, by default False
+    avoid_repeats : bool, optional
+        Whether repeated courts were avoided, by default False
+
+    Returns
+    -------
+    str
+        The text of the americana
+    """
+    americana_text = (
+        f"Level: {americana_level.value}, Prob Mod: {probability_modification}, "
+        f"Best of: {best_of}, Seed: {seed}"
+    )
+    if americana_id is not None:
+        americana_text = f"Americana {americana_id}, {americana_text}"
+    if use_ratings:
+        americana_text += ", Weighted by rating"
+    if avoid_repeats:
+        americana_text += ", Avoiding repeated courts"
+    americana_text += "\n\n"
+
+    if len(rounds) == 1:
+        for court, players in rounds[0].items():
+            americana_text += f"Court {court + 1}:\n"
+            for player in players:
+                americana_text += f"\t{player}\n"
+            americana_text += "\n"
+    else:
+        for round_index, courts in enumerate(rounds):
+            americana_text += f"Round {round_index + 1}:\n"
+            for court, players in courts.items():
+                americana_text += (
+                    f"\tCourt {court + 1}: {players[0]} & {players[1]} vs "
+                    f"{players[2]} & {players[3]}\n"
+                )
+            americana_text += "\n"
+
+    return americana_text
+
+
+def draw_americana(
+    roster: PlayerRoster,
+    probability_modification: float,
+    americana_level: Levels,
+    best_of: int,
+    seed: int | None,
+    n_rounds: int = 1,
+    player_ratings: list[float] | None = None,
+    co_occurrences: list[tuple[int, int, int]] | None = None,
+) -> tuple[int, list[dict[int, list[str]]]]:
+    """Distribute the players, keeping the fairest of `best_of` distributions
+
+    With more than one round, the distribution is the first round of a schedule that rotates
+    partners and opponents in the next ones. NumPy is only imported from here on, this module is
+    imported when the app starts and main preloads NumPy once the window is shown.
+
+    Parameters
+    ----------
+    roster : PlayerRoster
+        The players to distribute
+    probability_modification : float
+        How much the level of a player skews its probability towards the first or last courts
+    americana_level : Levels
+        The level of the americana
+    best_of : int
+        The number of distributions to draw and pick the best from
+    seed : int | None
+        Seed of the draw, a new one is generated if None
+    n_rounds : int, optional
+        The number of rounds of the americana, by default 1
+    player_ratings : list[float] | None, optional
+        The rating of each player, to weight the courts with instead of their levels, by default
+        the levels are used
+    co_occurrences : list[tuple[int, int, int]] | None, optional
+        The positions in the roster of each pair of players that recently shared a court and how
+        many times, as `history.recent_co_occurrences` returns them, to penalize courts that would
+        group them again, by default they are not penalized
+
+    Returns
+    -------
+    tuple[int, list[dict[int, list[str]]]]
+        The seed of the draw and the names of the players of each court in each round
+
+    Raises
+    ------
+    ValueError
+        If `best_of` is lower than 1
+    """
+    if best_of < 1:
+        raise ValueError(f"The best of at least 1 distribution must be kept, got best_of={best_of}")
+
+    import numpy as np
+
+    from americanes_randomizer.co_occurrence import CoOccurrenceMatrix
+    from americanes_randomizer.randomize_logic import (
+        courts_to_distribution,
+        distribute_americana,
+        distribute_americana_batch,
+        new_seed,
+        spawn_generators,
+    )
+    from americanes_randomizer.ratings import rating_level_codes
+    from americanes_randomizer.schedule import schedule_americana
+    from americanes_randomizer.scoring import select_best_distributions
+
+    if seed is None:
+        seed = new_seed()
+
+    if player_ratings is not None:
+        player_ratings = np.asarray(player_ratings)
+    if co_occurrences is not None:
+        co_occurrences = CoOccurrenceMatrix.from_pairs(co_occurrences, len(roster))
+
+    if best_of == 1:
+        distributed_players = distribute_americana(
+            players=roster,
+            probability_modification=probability_modification,
+            americana_level=americana_level,
+            seed=seed,
+            ratings=player_ratings,
+            co_occurrences=co_occurrences,
+        )
+    else:
+        candidates = distribute_americana_batch(
+            players=roster,
+            probability_modification=probability_modification,
+            americana_level=americana_level,
+            n_samples=best_of,
+            seed=seed,
+            ratings=player_ratings,
+            co_occurrences=co_occurrences,
+        )
+        best, _ = select_best_distributions(
+            level_codes=roster if player_ratings is None else rating_level_codes(player_ratings),
+            candidates=candidates,
+            americana_level=americana_level,
+            probability_modification=probability_modification,
+        )
+        distributed_players = courts_to_distribution(roster, candidates[best[0]])
+
+    if n_rounds == 1:
+        return seed, [distributed_players]
+
+    # the next rounds use their own stream of the seed, so the first round is drawn as before
+    return seed, schedule_americana(
+        players=roster,
+        n_rounds=n_rounds,
+        probability_modification=probability_modification,
+        americana_level=americana_level,
+        seed=spawn_generators(seed, 1)[0],
+        first_round=distributed_players,
+        ratings=player_ratings,
+    )
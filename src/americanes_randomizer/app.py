@@ -0,0 +1,825 @@
+import math
+import tkinter as tk
+import tkinter.ttk as ttk
+from pathlib import Path
+from tkinter import filedialog, messagebox, simpledialog
+
+from pydantic import ValidationError
+from sqlalchemy.orm import Session, sessionmaker
+
+from americanes_randomizer.americana import format_americana, generate_americana
+from americanes_randomizer.constants import (
+    MAX_SEED,
+    ButtonEmojis,
+    Levels,
+    ListPurposes,
+    PaginationOptions,
+    SearchLevelOptions,
+)
+from americanes_randomizer.db import bulk, history, ratings
+from americanes_randomizer.db.roster_cache import RosterCache
+from americanes_randomizer.instrumentation import timed
+from americanes_randomizer.roster import PlayerRoster, RosterPlayer
+from americanes_randomizer.schemas import CreatePlayer, ImportReport, RatingReport, UpdatePlayer
+from americanes_randomizer.tasks import TaskExecutor
+
+
+PLAYER_FILE_TYPES = [("CSV", "*.csv"), ("JSON", "*.json"), ("JSON Lines", "*.jsonl")]
+MAX_REPORTED_IMPORT_ERRORS = 10
+SEARCH_DEBOUNCE_MS = 150
+"""Time without typing before the player database is searched"""
+
+
+class PlayerListbox(ttk.Frame):
+    def __init__(
+        self,
+        parent: ttk.Frame,
+        players: list[RosterPlayer],
+        list_purpose: ListPurposes,
+        page_limit: int,
+        roster: RosterCache,
+        **kwargs,
+    ):
+        self.root = parent
+        super().__init__(parent, **kwargs)
+
+        self.roster = roster
+        self.list_purpose = list_purpose
+        self.page_limit = page_limit
+
+        self.page_index = 0
+        self["style"] = "Card.TFrame"
+        self.selected_players = []
+        self.players = []
+
+        self._generate_listbox()
+        self.update_players(players)
+
+    @property
+    def n_pages(self) -> int:
+        return math.ceil(len(self.players) / self.page_limit)
+
+    def show_players_page(self, direction: PaginationOptions):
+        last_page_index = max(self.n_pages - 1, 0)
+
+        if direction == PaginationOptions.FIRST:
+            self.page_index = 0
+        elif direction == PaginationOptions.NEXT:
+            self.page_index = min(self.page_index + 1, last_page_index)
+        elif direction == PaginationOptions.PREVIOUS:
+            self.page_index = max(self.page_index - 1, 0)
+        elif direction == PaginationOptions.LAST:
+            self.page_index = last_page_index
+        elif direction == PaginationOptions.SAME:
+            self.page_index = min(self.page_index, last_page_index)
+
+        self._show_page()
+
+    def update_players(
+        self, players: list[RosterPlayer], direction: PaginationOptions = PaginationOptions.SAME
+    ):
+        self.players = players
+
+        self.show_players_page(direction)
+
+    def page_player(self, row: int) -> RosterPlayer | None:
+        player_index = self.page_index * self.page_limit + row
+
+        return self.players[player_index] if player_index < len(self.players) else None
+
+    def _generate_listbox(self):
+        # the rows are created once and only their texts change when the page does
+        self.rows = []
+        for row in range(self.page_limit):
+            player_name_label = ttk.Label(self, width=52)
+            player_level_label = ttk.Label(self, width=4)
+
+            player_name_label.pack(side=tk.TOP, anchor=tk.W, padx=(5, 3), pady=9)
+            player_level_label.place(in_=player_name_label, relx=1, rely=0)
+
+            if self.list_purpose == ListPurposes.DATABASE:
+                row_buttons = [
+                    ttk.Button(
+                        self,
+                        text=ButtonEmojis.ADD.value,
+                        command=lambda r=row: self._on_row(r, self.root.master.select_player),
+                        width=3,
+                    ),
+                    ttk.Button(
+                        self,
+                        text=ButtonEmojis.EDIT.value,
+                        command=lambda r=row: self._on_row(r, self._update_player),
+                        width=3,
+                    ),
+                    ttk.Button(
+                        self,
+                        text=ButtonEmojis.DELETE.value,
+                        command=lambda r=row: self._on_row(r, self._delete_player),
+                        width=3,
+                    ),
+                ]
+            elif self.list_purpose == ListPurposes.SELECTED:
+                row_buttons = [
+                    ttk.Button(
+                        self,
+                        text=ButtonEmojis.CANCEL.value,
+                        command=lambda r=row: self._on_row(r, self.root.master.deselect_player),
+                        width=3,
+                    ),
+                ]
+
+            self.rows.append((player_name_label, player_level_label, row_buttons))
+
+        self.previous_button = ttk.Button(
+            self,
+            style="Accent.TButton",
+            text=ButtonEmojis.PREVIOUS.value,
+            command=lambda: self.show_players_page(PaginationOptions.PREVIOUS),
+            width=12,
+        )
+        self.page_counter = ttk.Label(self)
+        self.next_button = ttk.Button(
+            self,
+            style="Accent.TButton",
+            text=ButtonEmojis.NEXT.value,
+            command=lambda: self.show_players_page(PaginationOptions.NEXT),
+            width=12,
+        )
+
+        self.previous_button.pack(side=tk.LEFT, anchor=tk.SW, pady=(5, 0))
+        if self.list_purpose == ListPurposes.DATABASE:
+            self.page_counter.pack(side=tk.LEFT, anchor=tk.S, pady=10, padx=(160, 0))
+        elif self.list_purpose == ListPurposes.SELECTED:
+            self.page_counter.pack(side=tk.LEFT, anchor=tk.S, pady=10, padx=(130, 0))
+        self.next_button.pack(side=tk.RIGHT, anchor=tk.SE, pady=(5, 0))
+
+        for widget in [self, *self.winfo_children()]:
+            widget.bind("<MouseWheel>", self._on_mouse_wheel)
+            widget.bind("<Button-4>", lambda _: self.show_players_page(PaginationOptions.PREVIOUS))
+            widget.bind("<Button-5>", lambda _: self.show_players_page(PaginationOptions.NEXT))
+
+    @timed
+    def _show_page(self):
+        for row, (player_name_label, player_level_label, row_buttons) in enumerate(self.rows):
+            player = self.page_player(row)
+
+            if player is None:
+                player_name_label["text"] = ""
+                player_level_label["text"] = ""
+                for button in row_buttons:
+                    button.place_forget()
+                continue
+
+            player_name_label["text"] = f"{player.name:<50}"
+            player_level_label["text"] = f"{player.level.value:<3}"
+            if not row_buttons[0].winfo_manager():
+                row_buttons[0].place(in_=player_level_label, relx=1.1, rely=-0.3)
+                for previous_button, button in zip(row_buttons, row_buttons[1:]):
+                    button.place(in_=previous_button, relx=1.1, rely=0)
+
+        self.page_counter["text"] = f"{min(self.page_index + 1, self.n_pages)} / {self.n_pages}"
+
+    def _on_row(self, row: int, action):
+        if (player := self.page_player(row)) is not None:
+            action(player)
+
+    def _on_mouse_wheel(self, event: tk.Event):
+        if event.delta > 0:
+            self.show_players_page(PaginationOptions.PREVIOUS)
+        elif event.delta < 0:
+            self.show_players_page(PaginationOptions.NEXT)
+
+    def _delete_player(self, player: RosterPlayer):
+        delete_confirmation = messagebox.askyesno(
+            title="Delete player", message=f"Are you sure you want to delete {player.name}?"
+        )
+
+        if delete_confirmation:
+            self.root.master.executor.submit(
+                self.roster.delete_player,
+                player.name,
+                description="Deleting player",
+                on_done=lambda error: self._show_deleted_player(player, error),
+                on_error=self.root.master.show_error,
+                uses_db=True,
+            )
+
+    def _show_deleted_player(self, player: RosterPlayer, error: dict[str, str | int] | None):
+        if error:
+            messagebox.showerror("Error", error["error"])
+            return
+
+        if player in self.players:
+            self.players.remove(player)
+
+        self.update_players(self.players)
+
+    def _update_player(self, player: RosterPlayer):
+        new_player_level = simpledialog.askstring("Update player", "New level:", parent=self)
+
+        if new_player_level:
+            try:
+                update = UpdatePlayer(level=new_player_level)
+            except ValidationError as e:
+                messagebox.showerror("Error", f"{e}")
+                return
+
+            self.root.master.executor.submit(
+                self.roster.update_player,
+                player.name,
+                update,
+                description="Updating player",
+                on_done=lambda updated_player: self._show_updated_player(player, updated_player),
+                on_error=self.root.master.show_error,
+                uses_db=True,
+            )
+        else:
+            messagebox.showwarning("Warning", "Please input a new level.")
+
+    def _show_updated_player(
+        self, player: RosterPlayer, updated_player: RosterPlayer | dict[str, str | int]
+    ):
+        if isinstance(updated_player, dict):
+            messagebox.showerror("Error", updated_player["error"])
+            return
+
+        if player in self.players:
+            self.players[self.players.index(player)] = updated_player
+        self.root.master.refresh_selected_player(updated_player)
+
+        self.update_players(self.players)
+
+
+class AmericanesRandomizerApp(ttk.Frame):
+    def __init__(self, parent, db: Session):
+        super().__init__(parent, padding=10)
+        self.db = db
+        self.roster = RosterCache(db)
+        self.executor = TaskExecutor(
+            self,
+            sessionmaker(bind=db.get_bind(), autocommit=False, autoflush=False),
+            on_busy=self.show_busy,
+        )
+
+        self.selected_players = []
+        self._search_after_id = None
+
+        parent.config(menu=self.add_menu(parent))
+        self.add_status_bar().pack(side=tk.BOTTOM, fill=tk.X, pady=(5, 0))
+        self.add_database_list().pack(side=tk.LEFT, expand=True, fill=tk.BOTH)
+        self.add_player_addition_and_americana().pack(side=tk.RIGHT, expand=True, fill=tk.BOTH)
+
+    def add_menu(self, parent):
+        menu = tk.Menu(parent)
+
+        file_menu = tk.Menu(menu, tearoff=False)
+        file_menu.add_command(label="Import players...", command=self.import_players)
+        file_menu.add_command(label="Export players...", command=self.export_players)
+        file_menu.add_separator()
+        file_menu.add_command(label="Import results...", command=self.import_match_results)
+        menu.add_cascade(label="File", menu=file_menu)
+
+        self.americana_use_ratings = tk.BooleanVar(value=False)
+        americana_menu = tk.Menu(menu, tearoff=False)
+        americana_menu.add_checkbutton(
+            label="Weight courts by rating", variable=self.americana_use_ratings
+        )
+        self.americana_avoid_repeats = tk.BooleanVar(value=False)
+        americana_menu.add_checkbutton(
+            label="Avoid repeated courts", variable=self.americana_avoid_repeats
+        )
+        menu.add_cascade(label="Americana", menu=americana_menu)
+
+        return menu
+
+    def add_status_bar(self):
+        status_bar_frame = ttk.Frame(self)
+
+        self.status_spinner = ttk.Progressbar(status_bar_frame, mode="indeterminate", length=120)
+        self.status_label = ttk.Label(status_bar_frame)
+
+        self.status_label.pack(side=tk.RIGHT, padx=5)
+        self.status_spinner.pack(side=tk.RIGHT)
+
+        return status_bar_frame
+
+    def show_busy(self, task_descriptions: list[str]):
+        if task_descriptions:
+            self.status_label["text"] = f"{task_descriptions[-1]}..."
+            self.status_spinner.start(15)
+        else:
+            self.status_label["text"] = ""
+            self.status_spinner.stop()
+
+    def show_error(self, error: Exception):
+        messagebox.showerror("Error", f"{error}")
+
+    def add_database_list(self):
+        database_list_frame = ttk.Frame(self, style="Card.TFrame", padding=3)
+
+        self.database_name_query = tk.StringVar()
+        self.database_name_search = ttk.Entry(
+            database_list_frame, textvariable=self.database_name_query, width=52, justify=tk.LEFT
+        )
+        # the level filter is only picked from its list, typed text is not a level
+        self.database_level_search = ttk.Combobox(
+            database_list_frame,
+            values=[e.value for e in SearchLevelOptions],
+            width=7,
+            justify=tk.LEFT,
+            state="readonly",
+        )
+        self.database_level_search.current(0)
+        self.database_name_query.trace_add("write", lambda *_: self.schedule_search())
+        self.database_level_search.bind("<<ComboboxSelected>>", lambda _: self.schedule_search())
+        self.player_database = PlayerListbox(
+            parent=database_list_frame,
+            players=[],
+            list_purpose=ListPurposes.DATABASE,
+            page_limit=14,
+            roster=self.roster,
+        )
+        database_search_button = ttk.Button(
+            database_list_frame,
+            style="Accent.TButton",
+            text=ButtonEmojis.SEARCH.value,
+            command=lambda: self.search_players(PaginationOptions.FIRST),
+            width=3,
+        )
+
+        database_list_frame.columnconfigure(0, weight=1, pad=3)
+        database_list_frame.columnconfigure(1, weight=40)
+        database_list_frame.rowconfigure(0, weight=1, pad=5)
+        database_list_frame.rowconfigure(1, weight=100, pad=5)
+        database_list_frame.rowconfigure(2, weight=1, pad=5)
+
+        self.database_name_search.grid(row=0, column=0, sticky=tk.W)
+        self.database_level_search.grid(row=0, column=1, sticky=tk.W)
+        database_search_button.place(in_=self.database_level_search, relx=2, rely=0.5, anchor=tk.E)
+        self.player_database.grid(row=1, column=0, columnspan=2, sticky=tk.NSEW)
+
+        self.search_players()
+
+        return database_list_frame
+
+    def add_player_addition_and_americana(self):
+        player_addition_and_americana_frame = ttk.Frame(self, style="Card.TFrame", padding=15)
+
+        self.player_label = ttk.Label(player_addition_and_americana_frame, text="Player:")
+        self.level_label = ttk.Label(player_addition_and_americana_frame, text="Level:")
+        self.player_entry = ttk.Entry(player_addition_and_americana_frame, width=52)
+        self.level_entry = ttk.Combobox(
+            player_addition_and_americana_frame,
+            values=[e.value for e in Levels],
+            width=7,
+            justify=tk.LEFT,
+        )
+        self.add_button = ttk.Button(
+            player_addition_and_americana_frame,
+            style="Accent.TButton",
+            text="Add Player",
+            command=self.add_player,
+        )
+        self.selected_players_list = PlayerListbox(
+            parent=player_addition_and_americana_frame,
+            players=[],
+            list_purpose=ListPurposes.SELECTED,
+            page_limit=8,
+            roster=self.roster,
+        )
+        self.americana_level_title = ttk.Label(
+            player_addition_and_americana_frame, text="Americana Level:"
+        )
+        self.americana_level = ttk.Combobox(
+            player_addition_and_americana_frame,
+            values=[e.value for e in Levels],
+            width=7,
+            justify=tk.LEFT,
+        )
+        self.americana_probability_modification_title = ttk.Label(
+            player_addition_and_americana_frame, text="Prob Mod:"
+        )
+        self.americana_probability_modification = ttk.Entry(
+            player_addition_and_americana_frame, width=4, justify=tk.CENTER
+        )
+        self.americana_best_of_title = ttk.Label(
+            player_addition_and_americana_frame, text="Best of:"
+        )
+        self.americana_best_of = ttk.Entry(
+            player_addition_and_americana_frame, width=6, justify=tk.CENTER
+        )
+        self.americana_rounds_title = ttk.Label(player_addition_and_americana_frame, text="Rounds:")
+        self.americana_rounds = ttk.Entry(
+            player_addition_and_americana_frame, width=4, justify=tk.CENTER
+        )
+        self.americana_seed_title = ttk.Label(player_addition_and_americana_frame, text="Seed:")
+        self.americana_seed = ttk.Entry(
+            player_addition_and_americana_frame, width=12, justify=tk.CENTER
+        )
+        self.randomize_button = ttk.Button(
+            player_addition_and_americana_frame,
+            style="Accent.TButton",
+            text="Generate Americana",
+            command=self.generate_americana,
+        )
+
+        player_addition_and_americana_frame.columnconfigure(0, weight=1, pad=2)
+        player_addition_and_americana_frame.rowconfigure(0, weight=1, pad=5)
+        player_addition_and_americana_frame.rowconfigure(1, weight=8, pad=5)
+        player_addition_and_americana_frame.rowconfigure(2, weight=1, pad=5)
+
+        self.player_entry.grid(row=0, column=0, padx=2, pady=20, sticky=tk.NW)
+        self.player_label.place(in_=self.player_entry, relx=0, rely=-0.5, anchor=tk.W)
+
+        self.level_entry.grid(row=0, column=0, padx=2, pady=20, sticky=tk.NE)
+        self.level_label.place(in_=self.level_entry, relx=0, rely=-0.5, anchor=tk.W)
+        self.add_button.place(in_=self.level_entry, relx=1, rely=2, anchor=tk.E)
+
+        self.selected_players_list.grid(row=1, column=0, sticky=tk.EW)
+
+        self.americana_level_title.grid(row=1, column=0, sticky=tk.SW, pady=5)
+        self.americana_level.place(in_=self.americana_level_title, relx=1.7, rely=0.5, anchor=tk.E)
+        self.americana_probability_modification_title.grid(
+            row=1, column=0, sticky=tk.S, pady=5, padx=(0, 10)
+        )
+        self.americana_probability_modification.place(
+            in_=self.americana_probability_modification_title, relx=1.7, rely=0.5, anchor=tk.E
+        )
+        self.americana_probability_modification.insert(0, "1")
+        self.randomize_button.grid(row=1, column=0, sticky=tk.SE)
+
+        self.americana_best_of_title.grid(row=2, column=0, sticky=tk.SW, pady=5)
+        self.americana_best_of.place(
+            in_=self.americana_best_of_title, relx=1.7, rely=0.5, anchor=tk.E
+        )
+        self.americana_best_of.insert(0, "1")
+        self.americana_seed_title.grid(row=2, column=0, sticky=tk.S, pady=5, padx=(0, 60))
+        self.americana_seed.place(in_=self.americana_seed_title, relx=1.2, rely=0.5, anchor=tk.W)
+        self.americana_rounds_title.grid(row=2, column=0, sticky=tk.SE, pady=5, padx=(0, 50))
+        self.americana_rounds.place(
+            in_=self.americana_rounds_title, relx=1.1, rely=0.5, anchor=tk.W
+        )
+        self.americana_rounds.insert(0, "1")
+
+        return player_addition_and_americana_frame
+
+    def add_player(self):
+        player = self.player_entry.get()
+        level = self.level_entry.get()
+
+        if player and level:
+            try:
+                new_player = CreatePlayer(name=player, level=level)
+            except ValidationError as e:
+                messagebox.showerror("Error", f"{e}")
+                return
+
+            # a player that already exists fails with an IntegrityError, shown by show_error
+            self.executor.submit(
+                self.roster.create_player,
+                new_player,
+                description="Adding player",
+                on_done=lambda _: self._show_added_player(),
+                on_error=self.show_error,
+                uses_db=True,
+            )
+        else:
+            messagebox.showwarning("Warning", "Please input a player and level.")
+
+    def _show_added_player(self):
+        self.search_players()
+
+        self.player_entry.delete(0, tk.END)
+        self.level_entry.delete(0, tk.END)
+
+    def import_players(self):
+        import_path = filedialog.askopenfilename(
+            title="Import Players", filetypes=PLAYER_FILE_TYPES
+        )
+        if not import_path:
+            return
+
+        self.executor.submit(
+            self._import_players_task,
+            Path(import_path),
+            description="Importing players",
+            on_done=self._show_import_report,
+            on_error=self.show_error,
+            uses_db=True,
+        )
+
+    def _import_players_task(self, import_path: Path, db: Session) -> ImportReport:
+        # runs in a worker thread, it must not touch the widgets
+        report = bulk.import_players(import_path, db)
+        self.roster.reload(db)
+
+        return report
+
+    def _show_import_report(self, report: ImportReport):
+        self.search_players()
+
+        import_message = f"{report.imported} players imported."
+        if report.errors:
+            import_message += f"\n\n{len(report.errors)} rows couldn't be imported:\n"
+            for row_error in report.errors[:MAX_REPORTED_IMPORT_ERRORS]:
+                import_message += f"\tRow {row_error.row}: {row_error.error}\n"
+            if len(report.errors) > MAX_REPORTED_IMPORT_ERRORS:
+                import_message += "\t...\n"
+
+        messagebox.showinfo("Players Imported", import_message)
+
+    def import_match_results(self):
+        import_path = filedialog.askopenfilename(
+            title="Import Results", filetypes=PLAYER_FILE_TYPES
+        )
+        if not import_path:
+            return
+
+        self.executor.submit(
+            self._import_match_results_task,
+            Path(import_path),
+            description="Rating players",
+            on_done=self._show_match_results_report,
+            on_error=self.show_error,
+            uses_db=True,
+        )
+
+    def _import_match_results_task(
+        self, import_path: Path, db: Session
+    ) -> tuple[ImportReport, RatingReport]:
+        # runs in a worker thread, it must not touch the widgets
+        report = bulk.import_match_results(import_path, db)
+
+        return report, ratings.rate_matches(db)
+
+    def _show_match_results_report(self, result: tuple[ImportReport, RatingReport]):
+        report, rating_report = result
+
+        import_message = f"{report.imported} results imported, {rating_report.rated} matches rated."
+        if rating_report.skipped:
+            import_message += (
+                f"\n\n{rating_report.skipped} matches left pending, players not found: "
+                f"{', '.join(rating_report.missing_players[:MAX_REPORTED_IMPORT_ERRORS])}"
+            )
+            if len(rating_report.missing_players) > MAX_REPORTED_IMPORT_ERRORS:
+                import_message += ", ..."
+        if report.errors:
+            import_message += f"\n\n{len(report.errors)} rows couldn't be imported:\n"
+            for row_error in report.errors[:MAX_REPORTED_IMPORT_ERRORS]:
+                import_message += f"\tRow {row_error.row}: {row_error.error}\n"
+            if len(report.errors) > MAX_REPORTED_IMPORT_ERRORS:
+                import_message += "\t...\n"
+
+        messagebox.showinfo("Results Imported", import_message)
+
+    def export_players(self):
+        export_path = filedialog.asksaveasfilename(
+            title="Export Players", filetypes=PLAYER_FILE_TYPES, defaultextension=".csv"
+        )
+        if not export_path:
+            return
+
+        self.executor.submit(
+            bulk.export_players,
+            Path(export_path),
+            description="Exporting players",
+            on_done=lambda n_players: messagebox.showinfo(
+                "Players Exported", f"{n_players} players exported to {export_path}"
+            ),
+            on_error=self.show_error,
+            uses_db=True,
+        )
+
+    def deselect_player(self, player: RosterPlayer):
+        self.selected_players.remove(player)
+
+        self.selected_players_list.update_players(self.selected_players)
+
+    def schedule_search(self):
+        # searching as the user types, but only once the typing pauses
+        if self._search_after_id is not None:
+            self.after_cancel(self._search_after_id)
+
+        self._search_after_id = self.after(SEARCH_DEBOUNCE_MS, self._run_scheduled_search)
+
+    def _run_scheduled_search(self):
+        self._search_after_id = None
+
+        self.search_players(PaginationOptions.FIRST)
+
+    def search_players(self, direction: PaginationOptions = PaginationOptions.SAME):
+        search_name = self.database_name_search.get()
+        search_level = self.database_level_search.get()
+
+        if search_level == SearchLevelOptions.ALL.value:
+            search_level = None
+        else:
+            try:
+                search_level = Levels(search_level)
+            except ValueError:
+                messagebox.showwarning("Warning", "Please select a valid level to search.")
+                return
+
+        # a new search cancels the previous one if it is still running
+        self.executor.submit(
+            self.roster.search,
+            search_name,
+            search_level,
+            description="Searching players",
+            on_done=lambda players: self.player_database.update_players(players, direction),
+            on_error=self.show_error,
+            key="search_players",
+        )
+
+    def refresh_selected_player(self, player: RosterPlayer):
+        self.selected_players = [
+            player if p.name == player.name else p for p in self.selected_players
+        ]
+
+        self.selected_players_list.update_players(self.selected_players)
+
+    def select_player(self, player: RosterPlayer):
+        if player not in self.selected_players:
+            self.selected_players.append(player)
+
+            self.selected_players_list.update_players(self.selected_players)
+
+    def generate_americana(self):
+        if len(self.selected_players) < 8:
+            messagebox.showwarning("Warning", "Please select at least 8 players.")
+            return
+        elif len(self.selected_players) % 4 != 0:
+            messagebox.showwarning("Warning", "Please select a multiple of 4 players.")
+            return
+        elif not (americana_level_string := self.americana_level.get()):
+            messagebox.showwarning("Warning", "Please select an Americana level.")
+            return
+        elif not (
+            americana_probability_modification := self.americana_probability_modification.get()
+        ):
+            messagebox.showwarning("Warning", "Please input a probability modification.")
+            return
+        try:
+            americana_probability_modification = float(americana_probability_modification)
+        except ValueError:
+            messagebox.showwarning("Warning", "Please input a valid probability modification.")
+            return
+
+        try:
+            americana_best_of = int(self.americana_best_of.get())
+            if americana_best_of < 1:
+                raise ValueError
+        except ValueError:
+            messagebox.showwarning("Warning", "Please input a valid number of draws to pick from.")
+            return
+
+        try:
+            americana_rounds = int(self.americana_rounds.get())
+            if americana_rounds < 1:
+                raise ValueError
+        except ValueError:
+            messagebox.showwarning("Warning", "Please input a valid number of rounds.")
+            return
+
+        if americana_seed := self.americana_seed.get():
+            try:
+                americana_seed = int(americana_seed)
+                # the seed is saved in the history once the americana is accepted
+                if not 0 <= americana_seed <= MAX_SEED:
+                    raise ValueError
+            except ValueError:
+                messagebox.showwarning(
+                    "Warning", f"Please input a seed from 0 to {MAX_SEED} or leave it empty."
+                )
+                return
+        else:
+            americana_seed = None
+
+        for level in Levels:
+            if level.value == americana_level_string:
+                americana_level = level
+
+        americana_use_ratings = self.americana_use_ratings.get()
+        americana_avoid_repeats = self.americana_avoid_repeats.get()
+
+        # the draw is only saved in the history once accepted, organizers often redraw
+        self.executor.submit(
+            generate_americana,
+            PlayerRoster.from_players(self.selected_players),
+            americana_probability_modification,
+            americana_level,
+            best_of=americana_best_of,
+            seed=americana_seed,
+            n_rounds=americana_rounds,
+            use_ratings=americana_use_ratings,
+            avoid_repeats=americana_avoid_repeats,
+            save=False,
+            description="Generating americana",
+            on_done=lambda result: self.show_americana(
+                americana_level,
+                americana_probability_modification,
+                americana_best_of,
+                americana_use_ratings,
+                americana_avoid_repeats,
+                *result[1:],
+            ),
+            on_error=self.show_error,
+            key="generate_americana",
+            uses_db=True,
+        )
+
+    def show_americana(
+        self,
+        americana_level: Levels,
+        americana_probability_modification: float,
+        americana_best_of: int,
+        americana_use_ratings: bool,
+        americana_avoid_repeats: bool,
+        americana_seed: int,
+        americana_rounds: list[dict[int, list[str]]],
+    ):
+        americana_distribution_message = format_americana(
+            americana_rounds,
+            americana_level,
+            americana_probability_modification,
+            americana_best_of,
+            americana_seed,
+            use_ratings=americana_use_ratings,
+            avoid_repeats=americana_avoid_repeats,
+        )
+
+        is_save_americana = messagebox.askokcancel(
+            title="Save Distribution?", message=americana_distribution_message
+        )
+
+        if is_save_americana:
+            self.executor.submit(
+                self._save_americana_task,
+                americana_rounds,
+                americana_level,
+                americana_probability_modification,
+                americana_best_of,
+                americana_use_ratings,
+                americana_avoid_repeats,
+                americana_seed,
+                description="Saving americana",
+                on_done=lambda save_path: messagebox.showinfo(
+                    "Americana Distribution Saved",
+                    f"Americana distribution saved to {save_path}",
+                ),
+                on_error=self.show_error,
+                uses_db=True,
+            )
+
+    def _save_americana_task(
+        self,
+        americana_rounds: list[dict[int, list[str]]],
+        americana_level: Levels,
+        americana_probability_modification: float,
+        americana_best_of: int,
+        americana_use_ratings: bool,
+        americana_avoid_repeats: bool,
+        americana_seed: int,
+        db: Session,
+    ) -> Path:
+        # runs in a worker thread, it must not touch the widgets
+        americana_id = history.save_americana(
+            americana_rounds,
+            americana_level,
+            americana_probability_modification,
+            americana_seed,
+            db,
+            best_of=americana_best_of,
+            use_ratings=americana_use_ratings,
+            avoid_repeats=americana_avoid_repeats,
+        )
+
+        home_path = Path().home().resolve()
+        file_name = f"americana_distribution_{americana_id}.txt"
+
+        if (desktop_path := home_path / "Desktop").exists():
+            save_path = desktop_path / file_name
+        elif (desktop_path := home_path / "Escritorio").exists():
+            save_path = desktop_path / file_name
+        elif (desktop_path := home_path / "One Drive" / "Escritorio").exists():
+            save_path = desktop_path / file_name
+        elif (desktop_path := home_path / "OneDrive" / "Escritorio").exists():
+            save_path = desktop_path / file_name
+        else:
+            save_path = Path.cwd() / file_name
+
+        with open(save_path, "w") as f:
+            f.write(
+                format_americana(
+                    americana_rounds,
+                    americana_level,
+                    americana_probability_modification,
+                    americana_best_of,
+                    americana_seed,
+                    americana_id,
+                    americana_use_ratings,
+                    americana_avoid_repeats,
+                )
+            )
+
+        return save_path
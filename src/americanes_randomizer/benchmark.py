@@ -0,0 +1,734 @@
+import argparse
+import json
+import platform
+import random
+import tempfile
+import time
+import tracemalloc
+from collections.abc import Callable
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+import sqlalchemy
+from sqlalchemy.orm import sessionmaker
+
+from americanes_randomizer.co_occurrence import CoOccurrenceMatrix
+from americanes_randomizer.constants import (
+    COURT_CAPACITY,
+    LEVEL_NUMBERS,
+    DistributionEngines,
+    Levels,
+)
+from americanes_randomizer.db import controller, history
+from americanes_randomizer.db.models import BaseModel, Player
+from americanes_randomizer.db.roster_cache import RosterCache
+from americanes_randomizer.db.session import create_database_engine, create_tables
+from americanes_randomizer.parallel import available_cpus, sweep_best_distributions
+from americanes_randomizer.randomize_logic import (
+    MIN_PROBABILITY,
+    distribute_americana,
+    distribute_americana_batch,
+    player_level_codes,
+    spawn_generators,
+)
+from americanes_randomizer.roster import PlayerRoster, RosterPlayer
+from americanes_randomizer.schedule import schedule_americana
+from americanes_randomizer.schemas import CreatePlayer
+
+
+PLAYER_COUNTS = (8, 40, 200, 1_000, 10_000)
+QUICK_PLAYER_COUNTS = (8, 40, 200)
+AMERICANA_LEVELS = (Levels.A, Levels.B, Levels.D)
+PROBABILITY_MODIFICATIONS = (0.0, 0.5, 1.0)
+ROSTER_SIZES = (1_000, 10_000, 100_000, 1_000_000)
+QUICK_ROSTER_SIZES = (1_000, 10_000)
+DEFAULT_OUTPUT = Path("reports") / "benchmark.json"
+SCHEDULE_CASES = ((16, 5), (64, 7), (128, 7))
+"""The players and rounds of each benchmarked schedule"""
+QUICK_SCHEDULE_CASES = ((16, 5), (64, 7))
+SWEEP_CASES = ((40, 20_000), (200, 5_000))
+"""The players and samples per probability modification of each benchmarked sweep"""
+QUICK_SWEEP_CASES = ((40, 5_000),)
+HISTORY_SIZES = (100, 1_000)
+QUICK_HISTORY_SIZES = (100,)
+HISTORY_PLAYERS = 400
+HISTORY_EVENT_CASE = (64, 7)
+"""Players and rounds of each americana of the history benchmark, drawn from HISTORY_PLAYERS"""
+HISTORY_LOOKBACK = 20
+CO_OCCURRENCE_DRAWS = 10
+"""Previous draws of the same players from which the co-occurrence matrix of a case is built"""
+EQUIVALENCE_PLAYER_COUNTS = (8, 40)
+EQUIVALENCE_RUNS = 2_000
+QUICK_EQUIVALENCE_RUNS = 500
+EQUIVALENCE_MAX_Z_SCORE = 4.0
+"""Largest chi-square z-score accepted as the same distribution as the legacy implementation"""
+SEED = 3000
+SEED_CHUNK_SIZE = 50_000
+
+
+def measure(function: Callable[[], object], repeats: int) -> dict[str, float]:
+    """Time a function and get its peak memory
+
+    The function is timed `repeats` times and then run once more under tracemalloc, so that
+    tracing doesn't distort the timings.
+
+    Parameters
+    ----------
+    function : Callable[[], object]
+        The function to measure, called without arguments
+    repeats : int
+        The number of timed calls
+
+    Returns
+    -------
+    dict[str, float]
+        The latency percentiles in milliseconds, the throughput in calls per second and the peak
+        memory in KiB
+    """
+    latencies = np.empty(repeats)
+    for repeat in range(repeats):
+        start = time.perf_counter()
+        function()
+        latencies[repeat] = time.perf_counter() - start
+
+    tracemalloc.start()
+    try:
+        function()
+        _, peak_memory = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    p50, p95, p99 = np.percentile(latencies * 1000, [50, 95, 99])
+
+    return {
+        "repeats": repeats,
+        "p50_ms": p50,
+        "p95_ms": p95,
+        "p99_ms": p99,
+        "mean_ms": latencies.mean() * 1000,
+        "max_ms": latencies.max() * 1000,
+        "throughput_per_s": repeats / latencies.sum(),
+        "peak_memory_kib": peak_memory / 1024,
+    }
+
+
+def random_roster(rng: np.random.Generator, n_players: int) -> PlayerRoster:
+    """Create a roster of players named "Player i" with random levels
+
+    Parameters
+    ----------
+    rng : np.random.Generator
+        Random generator used for the levels
+    n_players : int
+        The number of players
+
+    Returns
+    -------
+    PlayerRoster
+        The players
+    """
+    levels = list(Levels)
+
+    return PlayerRoster.from_players(
+        RosterPlayer(f"Player {i}", levels[level_index])
+        for i, level_index in enumerate(rng.integers(len(levels), size=n_players))
+    )
+
+
+def benchmark_distribute_americana(
+    player_counts: tuple[int, ...] = PLAYER_COUNTS, repeats: int = 20
+) -> list[dict]:
+    """Benchmark `distribute_americana` for every player count, level, modifier and engine
+
+    Each player count is also distributed avoiding the courts of CO_OCCURRENCE_DRAWS previous
+    draws, reporting how many times the pairs of its courts already shared one, with and without
+    the co-occurrence penalty.
+
+    Parameters
+    ----------
+    player_counts : tuple[int, ...], optional
+        The number of players to distribute, by default PLAYER_COUNTS
+    repeats : int, optional
+        The number of timed calls of each case, by default 20
+
+    Returns
+    -------
+    list[dict]
+        The parameters and measures of each case
+    """
+    rng = np.random.default_rng(SEED)
+
+    results = []
+    for n_players in player_counts:
+        players = random_roster(rng, n_players)
+
+        for americana_level in AMERICANA_LEVELS:
+            for probability_modification in PROBABILITY_MODIFICATIONS:
+                for engine in DistributionEngines:
+                    measures = measure(
+                        lambda: distribute_americana(
+                            players,
+                            probability_modification,
+                            americana_level,
+                            seed=SEED,
+                            engine=engine,
+                        ),
+                        repeats,
+                    )
+
+                    results.append(
+                        {
+                            "benchmark": "distribute_americana",
+                            "n_players": n_players,
+                            "americana_level": americana_level.value,
+                            "probability_modification": probability_modification,
+                            "engine": engine.value,
+                            **measures,
+                        }
+                    )
+
+        previous_courts = distribute_americana_batch(
+            players, 0.5, Levels.B, CO_OCCURRENCE_DRAWS, seed=SEED
+        )
+        same_court = sum(
+            courts[:, np.newaxis] == courts[np.newaxis, :] for courts in previous_courts
+        )
+        np.fill_diagonal(same_court, 0)
+        first, second = np.nonzero(np.triu(same_court))
+        co_occurrences = CoOccurrenceMatrix.from_pairs(
+            zip(first.tolist(), second.tolist(), same_court[first, second].tolist()), n_players
+        )
+
+        def repeated_pairs(distribution: dict[int, list[str]]) -> int:
+            player_indices = {name: i for i, name in enumerate(players.names)}
+            return sum(
+                int(same_court[np.ix_(court_players, court_players)].sum()) // 2
+                for court_players in (
+                    [player_indices[name] for name in names] for names in distribution.values()
+                )
+            )
+
+        for penalized in (False, True):
+            measures = measure(
+                lambda: distribute_americana(
+                    players,
+                    0.5,
+                    Levels.B,
+                    seed=SEED,
+                    co_occurrences=co_occurrences if penalized else None,
+                ),
+                repeats,
+            )
+            results.append(
+                {
+                    "benchmark": "distribute_repeats",
+                    "n_players": n_players,
+                    "penalized": penalized,
+                    "repeated_pairs": repeated_pairs(
+                        distribute_americana(
+                            players,
+                            0.5,
+                            Levels.B,
+                            seed=SEED,
+                            co_occurrences=co_occurrences if penalized else None,
+                        )
+                    ),
+                    **measures,
+                }
+            )
+
+    return results
+
+
+def benchmark_schedule(
+    cases: tuple[tuple[int, int], ...] = SCHEDULE_CASES, repeats: int = 3
+) -> list[dict]:
+    """Benchmark `schedule_americana` and count the partners and opponents it repeats
+
+    Parameters
+    ----------
+    cases : tuple[tuple[int, int], ...], optional
+        The number of players and of rounds of each schedule, by default SCHEDULE_CASES
+    repeats : int, optional
+        The number of timed calls of each case, by default 3
+
+    Returns
+    -------
+    list[dict]
+        The parameters and measures of each case
+    """
+    rng = np.random.default_rng(SEED)
+
+    results = []
+    for n_players, n_rounds in cases:
+        players = random_roster(rng, n_players)
+
+        measures = measure(
+            lambda: schedule_americana(players, n_rounds, 0.5, Levels.B, seed=SEED), repeats
+        )
+
+        partners, opponents = set(), set()
+        repeated_partners = repeated_opponents = 0
+        for courts in schedule_americana(players, n_rounds, 0.5, Levels.B, seed=SEED):
+            for court_players in courts.values():
+                for pair in (court_players[:2], court_players[2:]):
+                    repeated_partners += frozenset(pair) in partners
+                    partners.add(frozenset(pair))
+                for first in court_players[:2]:
+                    for second in court_players[2:]:
+                        repeated_opponents += frozenset((first, second)) in opponents
+                        opponents.add(frozenset((first, second)))
+
+        results.append(
+            {
+                "benchmark": "schedule_americana",
+                "n_players": n_players,
+                "n_rounds": n_rounds,
+                "repeated_partners": repeated_partners,
+                "repeated_opponents": repeated_opponents,
+                **measures,
+            }
+        )
+
+    return results
+
+
+def benchmark_sweep(
+    cases: tuple[tuple[int, int], ...] = SWEEP_CASES, repeats: int = 3
+) -> list[dict]:
+    """Benchmark `sweep_best_distributions` in this process and in a pool of every CPU
+
+    Both runs use the same seed, so they must find the same best distributions and only the time
+    differs. The pool uses at least 2 workers, so it is measured even with a single CPU.
+
+    Parameters
+    ----------
+    cases : tuple[tuple[int, int], ...], optional
+        The number of players and of samples per probability modification of each sweep, by
+        default SWEEP_CASES
+    repeats : int, optional
+        The number of timed calls of each case, by default 3
+
+    Returns
+    -------
+    list[dict]
+        The parameters and measures of each case
+    """
+    rng = np.random.default_rng(SEED)
+    n_cpus = available_cpus()
+
+    results = []
+    for n_players, n_samples in cases:
+        level_codes = player_level_codes(random_roster(rng, n_players))
+
+        best_distributions = {}
+        for n_workers in (1, max(2, n_cpus)):
+
+            def sweep() -> dict[float, tuple[np.ndarray, np.ndarray]]:
+                return sweep_best_distributions(
+                    level_codes,
+                    Levels.B,
+                    PROBABILITY_MODIFICATIONS,
+                    n_samples,
+                    seed=SEED,
+                    n_workers=n_workers,
+                )
+
+            measures = measure(sweep, repeats)
+            best_distributions[n_workers] = sweep()
+
+            results.append(
+                {
+                    "benchmark": "sweep_best_distributions",
+                    "n_players": n_players,
+                    "n_samples": n_samples,
+                    "n_workers": n_workers,
+                    "n_cpus": n_cpus,
+                    "same_as_one_worker": all(
+                        np.array_equal(courts, best_distributions[1][probability_modification][0])
+                        for probability_modification, (courts, _) in best_distributions[
+                            n_workers
+                        ].items()
+                    ),
+                    **measures,
+                }
+            )
+
+    return results
+
+
+def benchmark_controller(
+    roster_sizes: tuple[int, ...] = ROSTER_SIZES, repeats: int = 10
+) -> list[dict]:
+    """Benchmark the player controller against SQLite databases of every roster size
+
+    Parameters
+    ----------
+    roster_sizes : tuple[int, ...], optional
+        The number of players in each database, by default ROSTER_SIZES
+    repeats : int, optional
+        The number of timed calls of each case, by default 10
+
+    Returns
+    -------
+    list[dict]
+        The parameters and measures of each case
+    """
+    results = []
+    with tempfile.TemporaryDirectory() as database_dir:
+        for roster_size in roster_sizes:
+            engine = create_database_engine(Path(database_dir) / f"roster_{roster_size}.db")
+            seed_players(engine, roster_size)
+
+            with sessionmaker(bind=engine)() as db:
+                roster = RosterCache(db)
+                cases = {
+                    "list_players_all": lambda: controller.list_players("", None, db),
+                    "list_players_name": lambda: controller.list_players("player 12", None, db),
+                    "list_players_level": lambda: controller.list_players("", Levels.B, db),
+                    "load_roster_all": lambda: controller.load_roster("", None, db),
+                    "roster_cache_load": roster.reload,
+                    "roster_cache_name": lambda: roster.search("player 12", None),
+                    "roster_cache_level": lambda: roster.search("", Levels.B),
+                    "roster_cache_typing": lambda: [
+                        roster.search_roster("player 12"[:length], None)
+                        for length in range(1, len("player 12") + 1)
+                    ],
+                }
+                for case, function in cases.items():
+                    results.append(
+                        {
+                            "benchmark": case,
+                            "roster_size": roster_size,
+                            **measure(function, repeats),
+                        }
+                    )
+
+                new_players = iter(range(roster_size, roster_size + repeats + 1))
+                results.append(
+                    {
+                        "benchmark": "create_new_player",
+                        "roster_size": roster_size,
+                        **measure(
+                            lambda: controller.create_new_player(
+                                CreatePlayer(name=f"Player {next(new_players)}", level=Levels.B),
+                                db,
+                            ),
+                            repeats,
+                        ),
+                    }
+                )
+
+            engine.dispose()
+
+    return results
+
+
+def benchmark_history(
+    history_sizes: tuple[int, ...] = HISTORY_SIZES, repeats: int = 10
+) -> list[dict]:
+    """Benchmark saving americanas and the co-occurrence queries against histories of every size
+
+    Parameters
+    ----------
+    history_sizes : tuple[int, ...], optional
+        The number of americanas in each history, by default HISTORY_SIZES
+    repeats : int, optional
+        The number of timed calls of each case, by default 10
+
+    Returns
+    -------
+    list[dict]
+        The parameters and measures of each case
+    """
+    rng = np.random.default_rng(SEED)
+    names = np.array([f"Player {i}" for i in range(HISTORY_PLAYERS)])
+    n_players, n_rounds = HISTORY_EVENT_CASE
+
+    def random_americana() -> list[dict[int, list[str]]]:
+        players = rng.choice(names, n_players, replace=False)
+        return [
+            dict(enumerate(rng.permutation(players).reshape(-1, COURT_CAPACITY).tolist()))
+            for _ in range(n_rounds)
+        ]
+
+    results = []
+    with tempfile.TemporaryDirectory() as database_dir:
+        for history_size in history_sizes:
+            engine = create_database_engine(Path(database_dir) / f"history_{history_size}.db")
+            BaseModel.metadata.create_all(bind=engine)
+
+            with sessionmaker(bind=engine)() as db:
+                for seed in range(history_size):
+                    history.save_americana(random_americana(), Levels.B, 0.5, seed, db)
+
+                drawn_players = rng.choice(names, n_players, replace=False).tolist()
+                cases = {
+                    "save_americana": lambda: history.save_americana(
+                        random_americana(), Levels.B, 0.5, SEED, db
+                    ),
+                    "recent_teammates": lambda: history.recent_teammates(
+                        drawn_players[0], HISTORY_LOOKBACK, db
+                    ),
+                    "recent_co_occurrences": lambda: history.recent_co_occurrences(
+                        drawn_players, HISTORY_LOOKBACK, db
+                    ),
+                }
+                for case, function in cases.items():
+                    results.append(
+                        {
+                            "benchmark": case,
+                            "history_size": history_size,
+                            **measure(function, repeats),
+                        }
+                    )
+
+            engine.dispose()
+
+    return results
+
+
+def check_equivalence(
+    player_counts: tuple[int, ...] = EQUIVALENCE_PLAYER_COUNTS, n_runs: int = EQUIVALENCE_RUNS
+) -> list[dict]:
+    """Compare the court frequencies of `distribute_americana` with the legacy implementation
+
+    For every player count, level and modifier, the same roster is distributed `n_runs` times by
+    both implementations and the number of times each player lands on each court is compared
+    with a chi-square homogeneity test. Its statistic is turned into a z-score, which stays
+    around 0 when both implementations follow the same distribution.
+
+    Parameters
+    ----------
+    player_counts : tuple[int, ...], optional
+        The number of players to distribute, by default EQUIVALENCE_PLAYER_COUNTS
+    n_runs : int, optional
+        The number of distributions drawn by each implementation, by default EQUIVALENCE_RUNS
+
+    Returns
+    -------
+    list[dict]
+        The parameters, z-score and verdict of each case
+    """
+    rng = np.random.default_rng(SEED)
+
+    results = []
+    for n_players in player_counts:
+        n_courts = n_players // COURT_CAPACITY
+        roster = random_roster(rng, n_players)
+        player_indices = {name: i for i, name in enumerate(roster.names)}
+
+        for americana_level in AMERICANA_LEVELS:
+            for probability_modification in PROBABILITY_MODIFICATIONS:
+                counts = np.zeros((2, n_players, n_courts))
+
+                for run_rng in spawn_generators(SEED, n_runs):
+                    distribution = distribute_americana(
+                        roster, probability_modification, americana_level, seed=run_rng
+                    )
+                    for court, names in distribution.items():
+                        counts[0, [player_indices[name] for name in names], court] += 1
+
+                legacy_rng = random.Random(SEED)  # noqa: S311
+                for _ in range(n_runs):
+                    distribution = _legacy_distribute_americana(
+                        roster, probability_modification, americana_level, legacy_rng
+                    )
+                    for court, names in distribution.items():
+                        counts[1, [player_indices[name] for name in names], court] += 1
+
+                # both samples have the same size, so the expected count is the mean of both
+                expected = counts.mean(axis=0)
+                observed_cells = expected > 0
+                chi_square = (
+                    ((counts[:, observed_cells] - expected[observed_cells]) ** 2)
+                    / expected[observed_cells]
+                ).sum()
+                degrees_of_freedom = observed_cells.sum() - n_players
+                z_score = (chi_square - degrees_of_freedom) / np.sqrt(2 * degrees_of_freedom)
+
+                results.append(
+                    {
+                        "benchmark": "equivalence",
+                        "n_players": n_players,
+                        "americana_level": americana_level.value,
+                        "probability_modification": probability_modification,
+                        "n_runs": n_runs,
+                        "chi_square": float(chi_square),
+                        "degrees_of_freedom": int(degrees_of_freedom),
+                        "z_score": float(z_score),
+                        "is_equivalent": bool(abs(z_score) < EQUIVALENCE_MAX_Z_SCORE),
+                    }
+                )
+
+    return results
+
+
+def _legacy_distribute_americana(
+    roster: PlayerRoster,
+    probability_modification: float,
+    americana_level: Levels,
+    rng: random.Random,
+) -> dict[int, list[str]]:
+    """Distribute the players as the first pandas based releases did, one player at a time
+
+    The players are shuffled and then each one draws its court among the open ones with
+    `random.choices`, weighted by the probabilities of its level. Shuffling a list gives the same
+    uniform order as the DataFrame sample it replaces.
+    """
+    n_courts = len(roster) // COURT_CAPACITY
+    standard_probability = 1 / n_courts
+    americana_level_number = LEVEL_NUMBERS[americana_level]
+
+    distributions = {}
+    for level, level_number in LEVEL_NUMBERS.items():
+        level_difference = (level_number - americana_level_number) / 2
+        distributions[level] = np.maximum(
+            np.linspace(
+                standard_probability + level_difference * probability_modification,
+                standard_probability - level_difference * probability_modification,
+                num=n_courts,
+            ),
+            MIN_PROBABILITY,
+        )
+
+    players_per_court = {c: [] for c in range(n_courts)}
+    open_courts = list(range(n_courts))
+    full_courts = []
+
+    players = list(roster)
+    rng.shuffle(players)
+
+    for player in players:
+        assigned_court = rng.choices(
+            open_courts, k=1, weights=np.delete(distributions[player.level], full_courts)
+        )[0]
+
+        players_per_court[assigned_court].append(player.name)
+
+        if len(players_per_court[assigned_court]) >= COURT_CAPACITY:
+            open_courts.remove(assigned_court)
+            full_courts.append(assigned_court)
+
+    return players_per_court
+
+
+def seed_players(engine: sqlalchemy.Engine, roster_size: int):
+    """Create the tables of a database and fill it with random players
+
+    The indexes and the player search index are created after filling the table, as a real
+    roster would have them.
+
+    Parameters
+    ----------
+    engine : sqlalchemy.Engine
+        Engine of the database to fill
+    roster_size : int
+        The number of players to create
+    """
+    BaseModel.metadata.create_all(bind=engine)
+
+    rng = np.random.default_rng(SEED)
+    levels = list(Levels)
+    level_indices = rng.integers(len(levels), size=roster_size)
+
+    with engine.begin() as connection:
+        for start in range(0, roster_size, SEED_CHUNK_SIZE):
+            connection.execute(
+                Player.__table__.insert(),
+                [
+                    {"name": f"Player {i}", "level": levels[level_index]}
+                    for i, level_index in enumerate(
+                        level_indices[start : start + SEED_CHUNK_SIZE].tolist(), start=start
+                    )
+                ],
+            )
+
+    create_tables(engine)
+
+
+def run(quick: bool = False, output: Path = DEFAULT_OUTPUT) -> dict:
+    """Run the whole benchmark suite and write its report as JSON
+
+    Parameters
+    ----------
+    quick : bool, optional
+        Whether to only run the small cases, by default False
+    output : Path, optional
+        Where to write the report, by default DEFAULT_OUTPUT
+
+    Returns
+    -------
+    dict
+        The report
+    """
+    report = {
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "numpy": np.__version__,
+        "sqlalchemy": sqlalchemy.__version__,
+        "quick": quick,
+        "results": [
+            *benchmark_distribute_americana(QUICK_PLAYER_COUNTS if quick else PLAYER_COUNTS),
+            *benchmark_schedule(QUICK_SCHEDULE_CASES if quick else SCHEDULE_CASES),
+            *benchmark_sweep(QUICK_SWEEP_CASES if quick else SWEEP_CASES),
+            *benchmark_controller(QUICK_ROSTER_SIZES if quick else ROSTER_SIZES),
+            *benchmark_history(QUICK_HISTORY_SIZES if quick else HISTORY_SIZES),
+        ],
+        "equivalence": check_equivalence(
+            n_runs=QUICK_EQUIVALENCE_RUNS if quick else EQUIVALENCE_RUNS
+        ),
+    }
+
+    output.parent.mkdir(parents=True, exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(report, f, indent=4)
+
+    return report
+
+
+def main(argv: list[str] | None = None):
+    """Run the benchmark suite from the command line
+
+    Exits with status 1 when any case of the equivalence check is not equivalent.
+
+    Parameters
+    ----------
+    argv : list[str] | None, optional
+        The command line arguments, by default the ones of the process
+    """
+    parser = argparse.ArgumentParser(description="Benchmark the randomizer and the database")
+    parser.add_argument("--quick", action="store_true", help="only run the small cases")
+    parser.add_argument("--output", type=Path, default=DEFAULT_OUTPUT, help="JSON report path")
+    args = parser.parse_args(argv)
+
+    report = run(args.quick, args.output)
+
+    for result in report["results"]:
+        case = ", ".join(
+            f"{key}={value}"
+            for key, value in result.items()
+            if key not in ("benchmark", "repeats") and not key.endswith(("_ms", "_s", "_kib"))
+        )
+        print(
+            f"{result['benchmark']:<22} {case:<70} "
+            f"p50 {result['p50_ms']:9.2f} ms  p95 {result['p95_ms']:9.2f} ms  "
+            f"peak {result['peak_memory_kib']:10.1f} KiB"
+        )
+
+    print()
+    for result in report["equivalence"]:
+        print(
+            f"equivalence n_players={result['n_players']}, "
+            f"americana_level={result['americana_level']}, "
+            f"probability_modification={result['probability_modification']:<4} "
+            f"z {result['z_score']:6.2f}  {'ok' if result['is_equivalent'] else 'DIFFERENT'}"
+        )
+
+    print(f"\nReport written to {args.output}")
+
+    n_different = sum(not result["is_equivalent"] for result in report["equivalence"])
+    if n_different:
+        parser.exit(1, f"{n_different} cases don't follow the legacy distribution\n")
@@ -0,0 +1,400 @@
+import argparse
+import csv
+import json
+import os
+import sys
+from collections.abc import Iterator
+from pathlib import Path
+from typing import TextIO
+
+from sqlalchemy.orm import Session
+
+from americanes_randomizer.americana import format_americana, generate_americana
+from americanes_randomizer.constants import COURT_CAPACITY, MAX_SEED, Levels
+from americanes_randomizer.db import bulk, controller, ratings
+from americanes_randomizer.db.session import DATABASE_SESSION, configure_database, create_tables
+from americanes_randomizer.instrumentation import configure as configure_instrumentation
+from americanes_randomizer.roster import PlayerRoster
+from americanes_randomizer.schemas import ImportReport
+
+
+OUTPUT_FORMATS = ("text", "json", "jsonl", "csv")
+CSV_FIELDS = (
+    "event",
+    "seed",
+    "round",
+    "court",
+    *(f"player_{i}" for i in range(1, COURT_CAPACITY + 1)),
+)
+"""Columns of the CSV output, one row per court of each round, the fields of a match result but
+the games, with the americana id as its event"""
+
+SWEEP_SAMPLES = 10_000
+
+Americana = tuple[int | None, int, list[dict[int, list[str]]]]
+
+
+def main(argv: list[str] | None = None):
+    """Run the randomizer from the command line, without the Tk app
+
+    Parameters
+    ----------
+    argv : list[str] | None, optional
+        The command line arguments, by default the ones of the process
+    """
+    parser = build_parser()
+    # the arguments of bench are left for the benchmark to parse
+    args, bench_args = parser.parse_known_args(argv)
+    if bench_args and args.command != "bench":
+        parser.error(f"unrecognized arguments: {' '.join(bench_args)}")
+
+    if args.metrics or args.profile:
+        configure_instrumentation(enabled=args.metrics, profile=args.profile)
+
+    try:
+        if args.command == "bench":
+            # the benchmark creates its own databases and needs NumPy, only import it when asked
+            from americanes_randomizer.benchmark import main as benchmark_main
+
+            benchmark_main(bench_args)
+            return
+
+        if args.database:
+            configure_database(args.database)
+
+        create_tables()
+
+        with DATABASE_SESSION() as db:
+            if args.command in ("generate", "sweep"):
+                if args.players_file:
+                    roster = bulk.read_roster(args.players_file)
+                else:
+                    roster = controller.load_players(args.players, db)
+
+            if args.command == "sweep":
+                if args.output:
+                    with open(args.output, "w", encoding="utf-8") as f:
+                        f.writelines(sweep_americanas(roster, args))
+                else:
+                    sys.stdout.writelines(sweep_americanas(roster, args))
+            elif args.command == "generate":
+                americanas = generate_americanas(
+                    roster,
+                    args.prob_mod,
+                    next(level for level in Levels if level.value == args.level),
+                    db,
+                    n_americanas=args.americanas,
+                    best_of=args.best_of,
+                    seed=args.seed,
+                    n_rounds=args.rounds,
+                    use_ratings=args.use_ratings,
+                    avoid_repeats=args.avoid_repeats,
+                    save=not args.no_save,
+                )
+
+                if args.output:
+                    with open(args.output, "w", newline="", encoding="utf-8") as f:
+                        write_americanas(americanas, args, f)
+                else:
+                    write_americanas(americanas, args, sys.stdout)
+            elif args.command == "import" and args.kind == "players":
+                report = bulk.import_players(args.path, db, update_existing=not args.no_update)
+                print_import_report(report, "players imported")
+            elif args.command == "import":
+                report = bulk.import_match_results(args.path, db)
+                print_import_report(report, "results imported")
+                rating_report = ratings.rate_matches(db)
+                print(f"{rating_report.rated} matches rated")
+                if rating_report.skipped:
+                    print(
+                        f"{rating_report.skipped} matches left pending, players not found: "
+                        f"{', '.join(rating_report.missing_players)}",
+                        file=sys.stderr,
+                    )
+            elif args.command == "export":
+                n_players = bulk.export_players(args.path, db)
+                print(f"{n_players} players exported to {args.path}")
+    except BrokenPipeError:
+        # the reader of the output went away, e.g. head, point stdout to devnull so that python
+        # doesn't fail again flushing it at exit
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+        sys.exit(1)
+    except (ValueError, OSError) as e:
+        parser.exit(1, f"{parser.prog}: error: {e}\n")
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """Build the parser of the command line arguments
+
+    Returns
+    -------
+    argparse.ArgumentParser
+        The parser, with a subparser for each command
+    """
+    parser = argparse.ArgumentParser(
+        prog="americanes-randomizer", description="Americanes Randomizer 3000 without the app"
+    )
+    parser.add_argument("--database", type=Path, help="the SQLite database file of the players")
+    parser.add_argument("--metrics", action="store_true", help="log the timing of the calls")
+    parser.add_argument("--profile", action="store_true", help="also profile the timed calls")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    generate_parser = commands.add_parser(
+        "generate", help="generate americanas, streaming each one as soon as it is drawn"
+    )
+    _add_players_arguments(generate_parser)
+    generate_parser.add_argument(
+        "--prob-mod", type=float, default=1.0, help="probability modification, by default 1"
+    )
+    generate_parser.add_argument(
+        "--seed", type=_seed, help="seed of the first americana, the next count up"
+    )
+    generate_parser.add_argument(
+        "-n", "--americanas", type=_positive_int, default=1, help="how many americanas to draw"
+    )
+    generate_parser.add_argument(
+        "--best-of", type=_positive_int, default=1, help="draws to pick each first round from"
+    )
+    generate_parser.add_argument("--rounds", type=_positive_int, default=1)
+    generate_parser.add_argument(
+        "--use-ratings", action="store_true", help="weight the courts by rating"
+    )
+    generate_parser.add_argument(
+        "--avoid-repeats", action="store_true", help="avoid the courts of the last americanas"
+    )
+    generate_parser.add_argument(
+        "--no-save", action="store_true", help="don't save the americanas in the history"
+    )
+    generate_parser.add_argument("--format", choices=OUTPUT_FORMATS, default="text")
+    generate_parser.add_argument("--output", type=Path, help="file to write, by default stdout")
+
+    sweep_parser = commands.add_parser(
+        "sweep",
+        help="draw many distributions for each probability modification on every CPU, keeping "
+        "the best one of each",
+    )
+    _add_players_arguments(sweep_parser)
+    sweep_parser.add_argument(
+        "--prob-mods", nargs="+", type=float, required=True, metavar="PROB_MOD"
+    )
+    sweep_parser.add_argument(
+        "--samples",
+        type=_positive_int,
+        default=SWEEP_SAMPLES,
+        help=f"distributions drawn for each probability modification, by default {SWEEP_SAMPLES}",
+    )
+    sweep_parser.add_argument(
+        "--workers", type=_positive_int, help="worker processes, by default one per usable CPU"
+    )
+    sweep_parser.add_argument("--seed", type=_seed)
+    sweep_parser.add_argument("--output", type=Path, help="file to write, by default stdout")
+
+    import_parser = commands.add_parser("import", help="import players or match results")
+    import_parser.add_argument("kind", choices=("players", "results"))
+    import_parser.add_argument("path", type=Path, help="CSV, JSON or JSONL file")
+    import_parser.add_argument(
+        "--no-update", action="store_true", help="keep the level of the existing players"
+    )
+
+    export_parser = commands.add_parser("export", help="export the players")
+    export_parser.add_argument("path", type=Path, help="CSV, JSON or JSONL file")
+
+    commands.add_parser(
+        "bench", help="run the benchmark suite, see bench --help for its options", add_help=False
+    )
+
+    return parser
+
+
+def sweep_americanas(roster: PlayerRoster, args: argparse.Namespace) -> Iterator[str]:
+    """Draw the best distribution of each probability modification in parallel
+
+    See `parallel.sweep_best_distributions`, all the modifications share the same seed.
+
+    Parameters
+    ----------
+    roster : PlayerRoster
+        The players to distribute
+    args : argparse.Namespace
+        The arguments of the sweep command
+
+    Yields
+    ------
+    str
+        The text of the best distribution of each probability modification, with its score
+    """
+    # the sweep needs NumPy, only import it when asked as the bench does
+    from americanes_randomizer.parallel import sweep_best_distributions
+    from americanes_randomizer.randomize_logic import (
+        courts_to_distribution,
+        new_seed,
+        player_level_codes,
+    )
+
+    americana_level = next(level for level in Levels if level.value == args.level)
+    seed = new_seed() if args.seed is None else args.seed
+
+    best_distributions = sweep_best_distributions(
+        player_level_codes(roster),
+        americana_level,
+        args.prob_mods,
+        args.samples,
+        seed=seed,
+        n_workers=args.workers,
+    )
+    for probability_modification, (courts, scores) in best_distributions.items():
+        yield (
+            format_americana(
+                [courts_to_distribution(roster, courts[0])],
+                americana_level,
+                probability_modification,
+                args.samples,
+                seed,
+            )
+            + f"Score: {scores[0]:.4f}\n\n"
+        )
+
+
+def generate_americanas(
+    roster: PlayerRoster,
+    probability_modification: float,
+    americana_level: Levels,
+    db: Session,
+    n_americanas: int = 1,
+    seed: int | None = None,
+    **kwargs,
+) -> Iterator[Americana]:
+    """Generate americanas one after the other, see `americana.generate_americana`
+
+    Parameters
+    ----------
+    roster : PlayerRoster
+        The players to distribute
+    probability_modification : float
+        How much the level of a player skews its probability towards the first or last courts
+    americana_level : Levels
+        The level of the americanas
+    db : Session
+        Database of the ratings and the history
+    n_americanas : int, optional
+        The number of americanas, by default 1
+    seed : int | None, optional
+        Seed of the first americana, the next ones use the following integers, by default every
+        americana gets a new one
+    **kwargs
+        The options of `americana.generate_americana`
+
+    Yields
+    ------
+    Americana
+        The id, seed and rounds of each americana, as soon as it is drawn
+    """
+    for i in range(n_americanas):
+        yield generate_americana(
+            roster,
+            probability_modification,
+            americana_level,
+            db,
+            seed=None if seed is None else seed + i,
+            **kwargs,
+        )
+
+
+def write_americanas(americanas: Iterator[Americana], args: argparse.Namespace, f: TextIO):
+    """Stream americanas to a file in the output format, flushing each one
+
+    Parameters
+    ----------
+    americanas : Iterator[Americana]
+        The id, seed and rounds of each americana
+    args : argparse.Namespace
+        The arguments of the generate command
+    f : TextIO
+        The file to write
+    """
+    americana_level = next(level for level in Levels if level.value == args.level)
+
+    if args.format == "csv":
+        writer = csv.writer(f)
+        writer.writerow(CSV_FIELDS)
+    elif args.format == "json":
+        f.write("[")
+
+    for i, (americana_id, seed, rounds) in enumerate(americanas):
+        if args.format == "text":
+            f.write(
+                format_americana(
+                    rounds,
+                    americana_level,
+                    args.prob_mod,
+                    args.best_of,
+                    seed,
+                    americana_id,
+                    args.use_ratings,
+                    args.avoid_repeats,
+                )
+            )
+        elif args.format == "csv":
+            writer.writerows(
+                [americana_id, seed, round_index + 1, court + 1, *players]
+                for round_index, courts in enumerate(rounds)
+                for court, players in courts.items()
+            )
+        else:
+            americana = json.dumps(
+                {
+                    "americana_id": americana_id,
+                    "seed": seed,
+                    "americana_level": args.level,
+                    "probability_modification": args.prob_mod,
+                    "best_of": args.best_of,
+                    "rounds": [list(courts.values()) for courts in rounds],
+                },
+                ensure_ascii=False,
+            )
+            if args.format == "jsonl":
+                f.write(americana + "\n")
+            else:
+                f.write(("," if i > 0 else "") + "\n    " + americana)
+
+        f.flush()
+
+    if args.format == "json":
+        f.write("\n]\n")
+
+
+def print_import_report(report: ImportReport, imported: str):
+    """Print how many rows were imported and the rows that couldn't be"""
+    print(f"{report.imported} {imported}")
+    for row_error in report.errors:
+        print(f"Row {row_error.row}: {row_error.error}", file=sys.stderr)
+
+
+def _add_players_arguments(parser: argparse.ArgumentParser):
+    """Add the arguments of the players to distribute and the americana level to a command"""
+    players_group = parser.add_mutually_exclusive_group(required=True)
+    players_group.add_argument(
+        "--players", nargs="+", metavar="NAME", help="names of players of the database"
+    )
+    players_group.add_argument(
+        "--players-file", type=Path, help="CSV, JSON or JSONL file of players with their level"
+    )
+    parser.add_argument("--level", required=True, choices=[level.value for level in Levels])
+
+
+def _positive_int(value: str) -> int:
+    """Parse an argument that must be an integer of at least 1"""
+    if not value.isdigit() or int(value) < 1:
+        raise argparse.ArgumentTypeError(f"{value} is not a positive integer")
+    return int(value)
+
+
+def _seed(value: str) -> int:
+    """Parse a seed, an integer from 0 to MAX_SEED"""
+    if not value.isdigit() or int(value) > MAX_SEED:
+        raise argparse.ArgumentTypeError(f"{value} is not a seed from 0 to {MAX_SEED}")
+    return int(value)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+from collections.abc import Iterable
+
+import numpy as np
+
+
+class CoOccurrenceMatrix:
+    """Sparse symmetric players x players matrix of how many times two players shared a court
+
+    Stored in compressed rows, as NumPy arrays: the partners of player `i` and the number of
+    times it shared a court with each of them are `indices[indptr[i] : indptr[i + 1]]` and
+    `counts[indptr[i] : indptr[i + 1]]`, so only the pairs that did share a court take memory.
+
+    Parameters
+    ----------
+    indptr : np.ndarray
+        Where the row of each player starts in `indices` and `counts`, plus their length
+    indices : np.ndarray
+        The partner of each stored entry
+    counts : np.ndarray
+        The number of shared courts of each stored entry
+    """
+
+    __slots__ = ("indptr", "indices", "counts")
+
+    def __init__(self, indptr: np.ndarray, indices: np.ndarray, counts: np.ndarray):
+        self.indptr = np.asarray(indptr, dtype=np.intp)
+        self.indices = np.asarray(indices, dtype=np.intp)
+        self.counts = np.asarray(counts, dtype=np.float64)
+
+        if len(self.indices) != len(self.counts) or self.indptr[-1] != len(self.indices):
+            raise ValueError("A co-occurrence matrix needs one count for each stored entry")
+
+    @classmethod
+    def from_pairs(
+        cls, pairs: Iterable[tuple[int, int, float]], n_players: int
+    ) -> "CoOccurrenceMatrix":
+        """Build the matrix from the count of each pair, e.g. `history.recent_co_occurrences`
+
+        Parameters
+        ----------
+        pairs : Iterable[tuple[int, int, float]]
+            The indices of both players of each pair, in any order and each pair once, and the
+            number of times they shared a court
+        n_players : int
+            The number of players
+
+        Returns
+        -------
+        CoOccurrenceMatrix
+            The symmetric matrix of the counts
+        """
+        pairs = np.asarray(list(pairs), dtype=np.float64).reshape(-1, 3)
+        first, second = pairs[:, 0].astype(np.intp), pairs[:, 1].astype(np.intp)
+
+        rows = np.concatenate([first, second])
+        order = np.argsort(rows, kind="stable")
+        indptr = np.concatenate([[0], np.cumsum(np.bincount(rows, minlength=n_players))])
+
+        return cls(
+            indptr,
+            np.concatenate([second, first])[order],
+            np.concatenate([pairs[:, 2], pairs[:, 2]])[order],
+        )
+
+    @property
+    def n_players(self) -> int:
+        """The number of players of the matrix"""
+        return len(self.indptr) - 1
+
+    def partners(self, player: int) -> tuple[np.ndarray, np.ndarray]:
+        """Get the players that shared a court with a player and how many times
+
+        Parameters
+        ----------
+        player : int
+            The index of the player
+
+        Returns
+        -------
+        tuple[np.ndarray, np.ndarray]
+            The indices of its partners and the number of shared courts with each one
+        """
+        start, end = self.indptr[player], self.indptr[player + 1]
+
+        return self.indices[start:end], self.counts[start:end]
@@ -64,3 +64,33 @@ class ButtonEmojis(enum.Enum):
     OPEN = "🔓"
     SUCCESS = "✅"
     ERROR = "❌"
+
+
+class DistributionEngines(enum.Enum):
+    """Enum for the algorithms that can distribute the players in courts"""
+
+    SEQUENTIAL = "sequential"
+    EXACT_CAPACITY = "exact_capacity"
+
+
+LEVEL_NUMBERS = {
+    Levels.A: 5,
+    Levels.B_PLUS: 4,
+    Levels.B: 3,
+    Levels.C_PLUS: 2,
+    Levels.C: 1,
+    Levels.D: 0,
+}
+"""Integer code of each level, used by the randomizer to work on NumPy arrays"""
+
+BASE_RATING = 1000.0
+RATING_PER_LEVEL = 200.0
+"""Rating of the lowest level and rating difference between consecutive levels"""
+LEVEL_RATINGS = {level: BASE_RATING + RATING_PER_LEVEL * n for level, n in LEVEL_NUMBERS.items()}
+"""Rating of a player that has only been given a level, without any rated match"""
+
+COURT_CAPACITY = 4
+"""Number of players that fit in a court"""
+
+MAX_SEED = 2**32 - 1
+"""Largest seed of a draw, the 32 bits of the new seeds, so every seed fits the history"""
@@ -1,6 +1,18 @@
-from americanes_randomizer.db.models import Player
+from americanes_randomizer.db.models import (
+    AmericanaEvent,
+    AmericanaRound,
+    CourtAssignment,
+    HistoryPlayer,
+    MatchResult,
+    Player,
+)
 
 
 __all__ = [
+    "AmericanaEvent",
+    "AmericanaRound",
+    "CourtAssignment",
+    "HistoryPlayer",
+    "MatchResult",
     "Player",
 ]
@@ -0,0 +1,326 @@
+import csv
+import json
+from collections.abc import Iterator
+from itertools import islice
+from pathlib import Path
+
+from pydantic import ValidationError
+from sqlalchemy import select
+from sqlalchemy.dialects.sqlite import insert
+from sqlalchemy.orm import Session
+
+from americanes_randomizer.db.models import Player
+from americanes_randomizer.db.ratings import record_match_results
+from americanes_randomizer.instrumentation import timed
+from americanes_randomizer.roster import PlayerRoster, RosterPlayer
+from americanes_randomizer.schemas import (
+    CreateMatchResult,
+    CreatePlayer,
+    ImportReport,
+    ImportRowError,
+)
+
+
+IMPORT_CHUNK_SIZE = 5_000
+EXPORT_CHUNK_SIZE = 5_000
+PLAYER_FIELDS = ("name", "level")
+SUPPORTED_FORMATS = (".csv", ".json", ".jsonl")
+
+
+@timed
+def import_players(
+    path: Path,
+    db: Session,
+    update_existing: bool = True,
+    chunk_size: int = IMPORT_CHUNK_SIZE,
+) -> ImportReport:
+    """Import players from a CSV, JSON or JSON Lines file
+
+    The file is read and validated in chunks, and every chunk is inserted with batched upserts in
+    its own transaction. Rows that fail validation are reported and skipped without aborting
+    the import. CSV and JSON Lines files are streamed, JSON files must hold a list of players and
+    are read whole.
+
+    Parameters
+    ----------
+    path : Path
+        The file to import, with "name" and "level" fields, levels written as [A, B+, B, C+, C, D]
+    db : Session
+        Database in which to put the players
+    update_existing : bool, optional
+        Whether to update the level of the players that already exist, by default True
+    chunk_size : int, optional
+        The number of rows validated and inserted at once, by default IMPORT_CHUNK_SIZE
+
+    Returns
+    -------
+    ImportReport
+        The number of imported players and the rows that couldn't be imported
+    """
+    path = Path(path)
+    _check_format(path)
+
+    report = ImportReport()
+
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        rows = enumerate(_read_rows(path, f), start=1)
+
+        while chunk := list(islice(rows, chunk_size)):
+            players = {}
+            for row_number, row in chunk:
+                try:
+                    player = CreatePlayer.model_validate(
+                        json.loads(row) if isinstance(row, str) else row
+                    )
+                except ValidationError as e:
+                    report.errors.append(ImportRowError(row=row_number, error=_describe(e)))
+                except ValueError as e:
+                    report.errors.append(ImportRowError(row=row_number, error=f"Invalid JSON: {e}"))
+                else:
+                    players[player.name] = {"name": player.name, "level": player.level}
+
+            if not players:
+                continue
+
+            statement = insert(Player.__table__)
+            if update_existing:
+                statement = statement.on_conflict_do_update(
+                    index_elements=[Player.name], set_={"level": statement.excluded.level}
+                )
+            else:
+                statement = statement.on_conflict_do_nothing(index_elements=[Player.name])
+
+            # with RETURNING the rows are sent in multi-row VALUES batches instead of one by one
+            imported = db.execute(statement.returning(Player.name), list(players.values())).all()
+            db.commit()
+
+            report.imported += len(imported)
+
+    return report
+
+
+@timed
+def import_match_results(
+    path: Path, db: Session, chunk_size: int = IMPORT_CHUNK_SIZE
+) -> ImportReport:
+    """Import match results from a CSV, JSON or JSON Lines file, pending to be rated
+
+    Rows are validated in chunks like in `import_players`, results with players that are not in
+    the database are reported and skipped, and so are the matches already recorded.
+
+    Parameters
+    ----------
+    path : Path
+        The file to import, with the fields of CreateMatchResult, players 1 and 2 against 3 and 4
+    db : Session
+        Database in which to put the results
+    chunk_size : int, optional
+        The number of rows validated and inserted at once, by default IMPORT_CHUNK_SIZE
+
+    Returns
+    -------
+    ImportReport
+        The number of imported results and the rows that couldn't be imported
+    """
+    path = Path(path)
+    _check_format(path)
+
+    report = ImportReport()
+
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        rows = enumerate(_read_rows(path, f), start=1)
+
+        while chunk := list(islice(rows, chunk_size)):
+            results = []
+            for row_number, row in chunk:
+                try:
+                    result = CreateMatchResult.model_validate(
+                        json.loads(row) if isinstance(row, str) else row
+                    )
+                except ValidationError as e:
+                    report.errors.append(ImportRowError(row=row_number, error=_describe(e)))
+                except ValueError as e:
+                    report.errors.append(ImportRowError(row=row_number, error=f"Invalid JSON: {e}"))
+                else:
+                    results.append((row_number, result))
+
+            names = {name for _, result in results for name in _match_players(result)}
+            known_names = set(db.scalars(select(Player.name).where(Player.name.in_(names))))
+
+            known_results = []
+            for row_number, result in results:
+                if unknown_names := [n for n in _match_players(result) if n not in known_names]:
+                    report.errors.append(
+                        ImportRowError(
+                            row=row_number, error=f"Unknown players: {', '.join(unknown_names)}"
+                        )
+                    )
+                else:
+                    known_results.append(result)
+
+            report.imported += record_match_results(known_results, db)
+
+    report.errors.sort(key=lambda row_error: row_error.row)
+
+    return report
+
+
+@timed
+def export_players(path: Path, db: Session, chunk_size: int = EXPORT_CHUNK_SIZE) -> int:
+    """Export all players to a CSV, JSON or JSON Lines file, sorted by name
+
+    The players are streamed from the database in chunks, so the whole roster is never in memory.
+
+    Parameters
+    ----------
+    path : Path
+        The file to write, its suffix sets the format
+    db : Session
+        Database from which to get the players
+    chunk_size : int, optional
+        The number of players fetched from the database at once, by default EXPORT_CHUNK_SIZE
+
+    Returns
+    -------
+    int
+        The number of exported players
+    """
+    path = Path(path)
+    _check_format(path)
+
+    rows = db.execute(
+        select(Player.name, Player.level)
+        .order_by(Player.name)
+        .execution_options(yield_per=chunk_size)
+    )
+
+    players = ({"name": name, "level": level.value} for name, level in rows)
+
+    return _write_players(path, players)
+
+
+@timed
+def export_roster(path: Path, roster: PlayerRoster) -> int:
+    """Export the players of a roster to a CSV, JSON or JSON Lines file, in their order
+
+    Parameters
+    ----------
+    path : Path
+        The file to write, its suffix sets the format
+    roster : PlayerRoster
+        The players to export
+
+    Returns
+    -------
+    int
+        The number of exported players
+    """
+    path = Path(path)
+    _check_format(path)
+
+    players = ({"name": player.name, "level": player.level.value} for player in roster)
+
+    return _write_players(path, players)
+
+
+@timed
+def read_roster(path: Path) -> PlayerRoster:
+    """Read the players of a CSV, JSON or JSON Lines file as a roster, without a database
+
+    Parameters
+    ----------
+    path : Path
+        The file to read, with "name" and "level" fields like in `import_players`
+
+    Returns
+    -------
+    PlayerRoster
+        The players of the file, in its order
+
+    Raises
+    ------
+    ValueError
+        If a row is not a valid player or a player is repeated
+    """
+    path = Path(path)
+    _check_format(path)
+
+    players = {}
+    errors = []
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        for row_number, row in enumerate(_read_rows(path, f), start=1):
+            try:
+                player = CreatePlayer.model_validate(
+                    json.loads(row) if isinstance(row, str) else row
+                )
+            except ValidationError as e:
+                errors.append(f"Row {row_number}: {_describe(e)}")
+            except ValueError as e:
+                errors.append(f"Row {row_number}: Invalid JSON: {e}")
+            else:
+                if player.name in players:
+                    errors.append(f"Row {row_number}: Repeated player {player.name}")
+                players[player.name] = RosterPlayer(player.name, player.level)
+
+    if errors:
+        raise ValueError("Invalid players file:\n" + "\n".join(errors))
+
+    return PlayerRoster.from_players(players.values())
+
+
+def _write_players(path: Path, players: Iterator[dict[str, str]]) -> int:
+    """Stream players to a file in the format of its suffix, returning how many were written"""
+    n_players = 0
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        if path.suffix == ".csv":
+            writer = csv.DictWriter(f, PLAYER_FIELDS)
+            writer.writeheader()
+            for n_players, player in enumerate(players, start=1):
+                writer.writerow(player)
+        elif path.suffix == ".jsonl":
+            for n_players, player in enumerate(players, start=1):
+                f.write(json.dumps(player, ensure_ascii=False) + "\n")
+        else:
+            f.write("[")
+            for n_players, player in enumerate(players, start=1):
+                f.write(
+                    ("," if n_players > 1 else "")
+                    + "\n    "
+                    + json.dumps(player, ensure_ascii=False)
+                )
+            f.write("\n]\n")
+
+    return n_players
+
+
+def _read_rows(path: Path, f) -> Iterator[dict | str]:
+    """Stream the rows of an opened players file, JSON Lines rows are left to be decoded"""
+    if path.suffix == ".csv":
+        yield from csv.DictReader(f)
+    elif path.suffix == ".jsonl":
+        for line in f:
+            if line.strip():
+                yield line
+    else:
+        yield from json.load(f)
+
+
+def _match_players(result: CreateMatchResult) -> tuple[str, str, str, str]:
+    """Get the names of the four players of a match result"""
+    return result.player_1, result.player_2, result.player_3, result.player_4
+
+
+def _check_format(path: Path):
+    """Raise a ValueError if the file has an unsupported suffix"""
+    if path.suffix not in SUPPORTED_FORMATS:
+        raise ValueError(
+            f"Unsupported file format {path.suffix}, use one of {', '.join(SUPPORTED_FORMATS)}"
+        )
+
+
+def _describe(error: ValidationError) -> str:
+    """Summarize a validation error in one line"""
+    return "; ".join(
+        f"{'.'.join(str(loc) for loc in e['loc'])}: {e['msg']}" if e["loc"] else e["msg"]
+        for e in error.errors()
+    )
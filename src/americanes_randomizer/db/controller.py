@@ -1,9 +1,21 @@
-from sqlalchemy.orm import Session
+from collections.abc import Sequence
 
+from sqlalchemy import String, func, select, type_coerce
+from sqlalchemy.orm import Query, Session
+
+from americanes_randomizer.constants import Levels
 from americanes_randomizer.db.models import Player
+from americanes_randomizer.db.search_index import (
+    is_search_index_available,
+    player_fts,
+    prefix_match,
+)
+from americanes_randomizer.instrumentation import timed
+from americanes_randomizer.roster import PlayerRoster
 from americanes_randomizer.schemas import CreatePlayer, UpdatePlayer
 
 
+@timed
 def create_new_player(player: CreatePlayer, db: Session) -> Player:
     """Add a new player to the database
 
@@ -28,29 +40,119 @@ def create_new_player(player: CreatePlayer, db: Session) -> Player:
     return db_player
 
 
-def list_players(search_name: str, search_level: str | None, db: Session) -> list[Player]:
+@timed
+def list_players(search_name: str, search_level: Levels | None, db: Session) -> list[Player]:
     """Get all players that comply with the search_name and search_level from the database
 
+    The players are sorted by the database, using the lowercase name indexes. When the database
+    has the player search index, the names must have words starting by each searched word,
+    ignoring case and accents. Otherwise, or when the text has no words, they must contain the
+    searched text, ignoring case.
+
     Parameters
     ----------
+    search_name : str
+        Text to search in the names of the players
+    search_level : Levels | None
+        The level of the players, None for all levels
     db : Session
         Database in which to get the players
 
     Returns
     -------
     list[Player]
-        A list of players
+        A list of players sorted by name
     """
-    db_users = (
-        db.query(Player)
-        .filter(Player.name.ilike(f"%{search_name}%"))
-        .filter(Player.level == search_level if search_level else True)
-        .all()
+    query = _search_query(search_name, search_level, db)
+
+    return query.order_by(func.lower(Player.name)).all()
+
+
+@timed
+def load_roster(search_name: str, search_level: Levels | None, db: Session) -> PlayerRoster:
+    """Get the compact roster of the players that comply with the search_name and search_level
+
+    Only the names and levels are selected, without building a database model for each player.
+
+    Parameters
+    ----------
+    search_name : str
+        Text to search in the names of the players, see `list_players`
+    search_level : Levels | None
+        The level of the players, None for all levels
+    db : Session
+        Database in which to get the players
+
+    Returns
+    -------
+    PlayerRoster
+        The roster of the players sorted by name
+    """
+    query = _search_query(search_name, search_level, db)
+
+    # the levels are read as their stored names, skipping the Enum conversion of every row
+    statement = (
+        query.with_entities(Player.name, type_coerce(Player.level, String))
+        .order_by(func.lower(Player.name))
+        .statement
     )
 
-    return db_users
+    return PlayerRoster.from_rows(db.execute(statement))
+
+
+@timed
+def load_players(names: Sequence[str], db: Session) -> PlayerRoster:
+    """Get the compact roster of some players by name, in the order of the names
+
+    Parameters
+    ----------
+    names : Sequence[str]
+        The names of the players
+    db : Session
+        Database in which to get the players
+
+    Returns
+    -------
+    PlayerRoster
+        The roster of the players
+
+    Raises
+    ------
+    ValueError
+        If a player is not in the database
+    """
+    levels = dict(
+        db.execute(
+            select(Player.name, type_coerce(Player.level, String)).where(Player.name.in_(names))
+        ).all()
+    )
+
+    if missing_names := [name for name in names if name not in levels]:
+        raise ValueError(f"Players not found: {', '.join(missing_names)}")
+
+    return PlayerRoster.from_rows((name, levels[name]) for name in names)
+
+
+def _search_query(search_name: str, search_level: Levels | None, db: Session) -> Query[Player]:
+    """Build the query of the players that comply with the search_name and search_level"""
+    query = db.query(Player)
+
+    name_match = None
+    if search_name and is_search_index_available(db):
+        name_match = prefix_match(search_name)
+
+    if name_match is not None:
+        query = query.join(player_fts, player_fts.c.name == Player.name).filter(name_match)
+    elif search_name:
+        query = query.filter(Player.name.icontains(search_name, autoescape=True))
+
+    if search_level:
+        query = query.filter(Player.level == search_level)
+
+    return query
 
 
+@timed
 def list_levels(db: Session) -> list[str]:
     """Get all levels from the database
 
@@ -69,6 +171,7 @@ def list_levels(db: Session) -> list[str]:
     return [level for (level,) in db_levels]
 
 
+@timed
 def update_player(name: str, player: UpdatePlayer, db: Session) -> Player | dict[str, str | int]:
     """Update a player
 
@@ -99,6 +202,7 @@ def update_player(name: str, player: UpdatePlayer, db: Session) -> Player | dict
     return db_player
 
 
+@timed
 def delete_player(name: str, db: Session) -> dict[str, str | int] | None:
     """Delete a player
 
@@ -0,0 +1,222 @@
+from collections.abc import Sequence
+from datetime import datetime
+
+from sqlalchemy import Select, and_, func, insert, select
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session, aliased
+
+from americanes_randomizer.constants import Levels
+from americanes_randomizer.db.models import (
+    AmericanaEvent,
+    AmericanaRound,
+    CourtAssignment,
+    HistoryPlayer,
+)
+from americanes_randomizer.instrumentation import timed
+
+
+@timed
+def save_americana(
+    rounds: Sequence[dict[int, list[str]]],
+    americana_level: Levels,
+    probability_modification: float,
+    seed: int,
+    db: Session,
+    best_of: int = 1,
+    use_ratings: bool = False,
+    avoid_repeats: bool = False,
+) -> int:
+    """Save a generated americana in the history, in a single transaction
+
+    The players are stored by their integer history id, created for the players not in the
+    history yet, and every court assignment is inserted in one batch.
+
+    Parameters
+    ----------
+    rounds : Sequence[dict[int, list[str]]]
+        The names of the players of each court in each round, as `schedule_americana` returns
+        them, or a single round as `distribute_americana` does
+    americana_level : Levels
+        The level of the americana
+    probability_modification : float
+        The probability modification of the draw
+    seed : int
+        The seed of the draw
+    db : Session
+        Database in which to save the americana
+    best_of : int, optional
+        The number of draws the first round was picked from, by default 1
+    use_ratings : bool, optional
+        Whether the courts were weighted by rating, by default False
+    avoid_repeats : bool, optional
+        Whether repeated courts were avoided, by default False
+
+    Returns
+    -------
+    int
+        The id of the saved americana
+    """
+    names = sorted({name for courts in rounds for players in courts.values() for name in players})
+
+    try:
+        db.execute(
+            sqlite_insert(HistoryPlayer.__table__).on_conflict_do_nothing(
+                index_elements=[HistoryPlayer.name]
+            ),
+            [{"name": name} for name in names],
+        )
+        player_ids = dict(
+            db.execute(
+                select(HistoryPlayer.name, HistoryPlayer.id).where(HistoryPlayer.name.in_(names))
+            ).all()
+        )
+
+        event_id = db.scalar(
+            insert(AmericanaEvent)
+            .values(
+                created_at=datetime.now(),
+                americana_level=americana_level,
+                probability_modification=probability_modification,
+                best_of=best_of,
+                seed=seed,
+                use_ratings=use_ratings,
+                avoid_repeats=avoid_repeats,
+            )
+            .returning(AmericanaEvent.id)
+        )
+        round_ids = db.scalars(
+            insert(AmericanaRound).returning(AmericanaRound.id, sort_by_parameter_order=True),
+            [{"event_id": event_id, "number": number} for number in range(1, len(rounds) + 1)],
+        ).all()
+
+        db.execute(
+            insert(CourtAssignment),
+            [
+                {
+                    "round_id": round_id,
+                    "court": court,
+                    "position": position,
+                    "player_id": player_ids[name],
+                }
+                for round_id, courts in zip(round_ids, rounds)
+                for court, players in courts.items()
+                for position, name in enumerate(players)
+            ],
+        )
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+
+    return event_id
+
+
+@timed
+def recent_teammates(name: str, n_events: int, db: Session) -> dict[str, int]:
+    """Get who has a player shared a court with in the last americanas, and how many times
+
+    Parameters
+    ----------
+    name : str
+        The name of the player
+    n_events : int
+        The number of latest americanas to look at, whether the player was in them or not
+    db : Session
+        Database of the history
+
+    Returns
+    -------
+    dict[str, int]
+        The number of rounds each other player shared a court with the player
+    """
+    player = aliased(CourtAssignment)
+    teammate = aliased(CourtAssignment)
+    teammate_name = aliased(HistoryPlayer)
+
+    rows = db.execute(
+        select(teammate_name.name, func.count())
+        .select_from(player)
+        .join(HistoryPlayer, HistoryPlayer.id == player.player_id)
+        .join(
+            teammate,
+            and_(
+                teammate.round_id == player.round_id,
+                teammate.court == player.court,
+                teammate.player_id != player.player_id,
+            ),
+        )
+        .join(teammate_name, teammate_name.id == teammate.player_id)
+        .where(HistoryPlayer.name == name, player.round_id.in_(_recent_rounds(n_events)))
+        .group_by(teammate_name.name)
+    ).all()
+
+    return dict(rows)
+
+
+@timed
+def recent_co_occurrences(
+    names: Sequence[str], n_events: int, db: Session
+) -> list[tuple[int, int, int]]:
+    """Count how many times each pair of some players shared a court in the last americanas
+
+    Parameters
+    ----------
+    names : Sequence[str]
+        The names of the players
+    n_events : int
+        The number of latest americanas to look at
+    db : Session
+        Database of the history
+
+    Returns
+    -------
+    list[tuple[int, int, int]]
+        The positions in `names` of each pair of players that shared a court, first one lower,
+        and the number of rounds they shared it
+    """
+    player_ids = dict(
+        db.execute(
+            select(HistoryPlayer.id, HistoryPlayer.name).where(HistoryPlayer.name.in_(names))
+        ).all()
+    )
+    if len(player_ids) < 2:
+        return []
+
+    first = aliased(CourtAssignment)
+    second = aliased(CourtAssignment)
+
+    # the players are filtered here and not in the query, with them SQLite looks the courts up by
+    # player and round instead of reading the recent rounds by primary key, orders slower
+    rows = db.execute(
+        select(first.player_id, second.player_id, func.count())
+        .join(
+            second,
+            and_(
+                second.round_id == first.round_id,
+                second.court == first.court,
+                second.player_id > first.player_id,
+            ),
+        )
+        .where(first.round_id.in_(_recent_rounds(n_events)))
+        .group_by(first.player_id, second.player_id)
+    )
+
+    name_indices = {name: i for i, name in enumerate(names)}
+    co_occurrences = []
+    for first_id, second_id, count in rows:
+        if first_id not in player_ids or second_id not in player_ids:
+            continue
+
+        first_index, second_index = sorted(
+            (name_indices[player_ids[first_id]], name_indices[player_ids[second_id]])
+        )
+        co_occurrences.append((first_index, second_index, count))
+
+    return co_occurrences
+
+
+def _recent_rounds(n_events: int) -> Select:
+    """Select the ids of the rounds of the last n_events americanas"""
+    recent_events = select(AmericanaEvent.id).order_by(AmericanaEvent.id.desc()).limit(n_events)
+
+    return select(AmericanaRound.id).where(AmericanaRound.event_id.in_(recent_events))
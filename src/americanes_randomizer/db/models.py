@@ -1,6 +1,17 @@
 from typing import Any
 
-from sqlalchemy import Column, Enum, String
+from sqlalchemy import (
+    Boolean,
+    Column,
+    DateTime,
+    Enum,
+    Float,
+    ForeignKey,
+    Index,
+    Integer,
+    String,
+    func,
+)
 from sqlalchemy.ext.declarative import declared_attr
 from sqlalchemy.orm import as_declarative
 
@@ -29,7 +40,168 @@ class Player(BaseModel):
         The name of the player, primary key
     level : str
         The level of the player [A, B+, B, C+, C, D]
+    rating : float | None
+        The continuous rating of the player, None until its first rated match
+    rated_matches : int
+        The number of matches already counted in the rating of the player
     """
 
     name = Column(String, primary_key=True)
     level = Column(Enum(Levels), nullable=False)
+    rating = Column(Float, nullable=True)
+    rated_matches = Column(Integer, nullable=False, default=0, server_default="0")
+
+    __table_args__ = (
+        Index("ix_player_lower_name", func.lower(name)),
+        Index("ix_player_level_lower_name", level, func.lower(name)),
+    )
+
+
+class MatchResult(BaseModel):
+    """Database model for the results of the matches of the americanas, table match_result
+
+    Attributes
+    ----------
+    id : int
+        The id of the result, primary key
+    event : str
+        The americana the match was played in, e.g. the name of its saved distribution
+    round : int
+        The round of the match, starting at 1
+    court : int
+        The court of the match, starting at 1
+    player_1, player_2 : str
+        The names of the players of the first team
+    player_3, player_4 : str
+        The names of the players of the second team
+    games_1, games_2 : int
+        The games won by each team
+    rated_at : datetime | None
+        When the result was counted in the ratings of its players, None while it is pending
+    """
+
+    id = Column(Integer, primary_key=True)
+    event = Column(String, nullable=False)
+    round = Column(Integer, nullable=False)
+    court = Column(Integer, nullable=False)
+    player_1 = Column(String, ForeignKey("player.name", onupdate="CASCADE"), nullable=False)
+    player_2 = Column(String, ForeignKey("player.name", onupdate="CASCADE"), nullable=False)
+    player_3 = Column(String, ForeignKey("player.name", onupdate="CASCADE"), nullable=False)
+    player_4 = Column(String, ForeignKey("player.name", onupdate="CASCADE"), nullable=False)
+    games_1 = Column(Integer, nullable=False)
+    games_2 = Column(Integer, nullable=False)
+    rated_at = Column(DateTime, nullable=True)
+
+    __tablename__ = "match_result"
+    __table_args__ = (
+        Index("ix_match_result_event_round_court", event, round, court, unique=True),
+        Index("ix_match_result_rated_at", rated_at),
+    )
+
+
+class HistoryPlayer(BaseModel):
+    """Database model for the integer ids of the players in the americana history
+
+    Players keep their id and their history after being deleted from the player table.
+
+    Attributes
+    ----------
+    id : int
+        The id of the player in the history, primary key
+    name : str
+        The name of the player, unique
+    """
+
+    id = Column(Integer, primary_key=True)
+    name = Column(String, nullable=False, unique=True)
+
+    __tablename__ = "history_player"
+
+
+class AmericanaEvent(BaseModel):
+    """Database model for the generated americanas, table americana_event
+
+    Attributes
+    ----------
+    id : int
+        The id of the americana, primary key, increasing with time
+    created_at : datetime
+        When the americana was generated
+    americana_level : str
+        The level of the americana [A, B+, B, C+, C, D]
+    probability_modification : float
+        The probability modification of the draw
+    best_of : int
+        The number of draws the first round was picked from
+    seed : int
+        The seed of the draw
+    use_ratings : bool
+        Whether the courts were weighted by the ratings of the players instead of their levels
+    avoid_repeats : bool
+        Whether courts grouping again players of the latest americanas were penalized, false for
+        the americanas saved before it was stored
+    """
+
+    id = Column(Integer, primary_key=True)
+    created_at = Column(DateTime, nullable=False)
+    americana_level = Column(Enum(Levels), nullable=False)
+    probability_modification = Column(Float, nullable=False)
+    best_of = Column(Integer, nullable=False)
+    seed = Column(Integer, nullable=False)
+    use_ratings = Column(Boolean, nullable=False)
+    avoid_repeats = Column(Boolean, nullable=False, default=False, server_default="0")
+
+    __tablename__ = "americana_event"
+
+
+class AmericanaRound(BaseModel):
+    """Database model for the rounds of the generated americanas, table americana_round
+
+    Attributes
+    ----------
+    id : int
+        The id of the round, primary key, increasing with its americana
+    event_id : int
+        The americana of the round
+    number : int
+        The number of the round in its americana, starting at 1
+    """
+
+    id = Column(Integer, primary_key=True)
+    event_id = Column(Integer, ForeignKey("americana_event.id", ondelete="CASCADE"), nullable=False)
+    number = Column(Integer, nullable=False)
+
+    __tablename__ = "americana_round"
+    __table_args__ = (Index("ix_americana_round_event_id_number", event_id, number, unique=True),)
+
+
+class CourtAssignment(BaseModel):
+    """Database model for the court of each player in each round, table court_assignment
+
+    Stored without rowid, clustered by round and court so the players of a court are read
+    together, and indexed by player to find the courts of a player.
+
+    Attributes
+    ----------
+    round_id : int
+        The round, part of the primary key
+    court : int
+        The index of the court, starting at 0, part of the primary key
+    position : int
+        The position of the player in the court, 0 and 1 against 2 and 3, part of the primary key
+    player_id : int
+        The player, see HistoryPlayer
+    """
+
+    round_id = Column(
+        Integer, ForeignKey("americana_round.id", ondelete="CASCADE"), primary_key=True
+    )
+    court = Column(Integer, primary_key=True)
+    position = Column(Integer, primary_key=True)
+    player_id = Column(Integer, ForeignKey("history_player.id"), nullable=False)
+
+    __tablename__ = "court_assignment"
+    __table_args__ = (
+        Index("ix_court_assignment_player_id_round_id", player_id, round_id, court),
+        {"sqlite_with_rowid": False},
+    )
@@ -0,0 +1,243 @@
+from collections.abc import Sequence
+from datetime import datetime
+
+from sqlalchemy import (
+    Column,
+    Engine,
+    Enum,
+    Float,
+    Integer,
+    MetaData,
+    String,
+    Table,
+    func,
+    select,
+    text,
+    update,
+)
+from sqlalchemy.dialects.sqlite import insert
+from sqlalchemy.orm import Session
+
+from americanes_randomizer.constants import LEVEL_NUMBERS, LEVEL_RATINGS, RATING_PER_LEVEL, Levels
+from americanes_randomizer.db.models import MatchResult, Player
+from americanes_randomizer.instrumentation import timed
+from americanes_randomizer.schemas import CreateMatchResult, RatingReport
+
+
+# kept out of the models metadata, create_all would create it as a table
+player_rating = Table(
+    "player_rating",
+    MetaData(),
+    Column("name", String),
+    Column("level", Enum(Levels)),
+    Column("rating", Float),
+    Column("rated_matches", Integer),
+    Column("rated_level", Enum(Levels)),
+)
+"""View of the players with their rating, the one of their level until their first rated match,
+and the level closest to it"""
+
+
+def create_player_rating_view(engine: Engine):
+    """Create the player_rating view, replacing it in case the level ratings changed
+
+    Parameters
+    ----------
+    engine : Engine
+        Engine of the database
+    """
+    level_ratings = " ".join(
+        f"WHEN '{level.name}' THEN {rating}" for level, rating in LEVEL_RATINGS.items()
+    )
+    # the closest level, rounding half up as ratings.rating_level_codes does
+    *upper_levels, lowest_level = sorted(LEVEL_NUMBERS, key=LEVEL_NUMBERS.get, reverse=True)
+    rated_levels = " ".join(
+        f"WHEN rating >= {LEVEL_RATINGS[level] - RATING_PER_LEVEL / 2} THEN '{level.name}'"
+        for level in upper_levels
+    )
+
+    # only built from the level constants, there is no user input in it
+    create_view = f"""
+        CREATE VIEW player_rating AS
+        SELECT
+            name,
+            level,
+            COALESCE(rating, CASE level {level_ratings} END) AS rating,
+            rated_matches,
+            CASE
+                WHEN rating IS NULL THEN level
+                {rated_levels}
+                ELSE '{lowest_level.name}'
+            END AS rated_level
+        FROM player
+    """  # noqa: S608
+
+    with engine.begin() as connection:
+        connection.execute(text("DROP VIEW IF EXISTS player_rating"))
+        connection.execute(text(create_view))
+
+
+@timed
+def record_match_results(results: Sequence[CreateMatchResult], db: Session) -> int:
+    """Save the results of some matches, pending to be rated
+
+    Results of a match already recorded, same event, round and court, are skipped.
+
+    Parameters
+    ----------
+    results : Sequence[CreateMatchResult]
+        The results to save
+    db : Session
+        Database in which to save the results
+
+    Returns
+    -------
+    int
+        The number of saved results
+    """
+    if not results:
+        return 0
+
+    statement = insert(MatchResult.__table__).on_conflict_do_nothing(
+        index_elements=[MatchResult.event, MatchResult.round, MatchResult.court]
+    )
+    recorded = db.execute(
+        statement.returning(MatchResult.id), [result.model_dump() for result in results]
+    ).all()
+    db.commit()
+
+    return len(recorded)
+
+
+@timed
+def rate_matches(db: Session) -> RatingReport:
+    """Update the ratings of the players with every pending match result, event by event
+
+    Events are rated in the order they were recorded, all the matches of an event at once with
+    `ratings.update_ratings` from the ratings the players had before it. Results with players
+    deleted after they were recorded are skipped and reported, SQLite doesn't enforce the
+    foreign keys of the results.
+
+    Parameters
+    ----------
+    db : Session
+        Database of the players and the results
+
+    Returns
+    -------
+    RatingReport
+        The number of rated and skipped matches and the missing players
+    """
+    # NumPy is only needed from here on, keep it out of the imports of the app start
+    from americanes_randomizer.ratings import update_ratings
+
+    pending_events = db.scalars(
+        select(MatchResult.event)
+        .where(MatchResult.rated_at.is_(None))
+        .group_by(MatchResult.event)
+        .order_by(func.min(MatchResult.id))
+    ).all()
+
+    report = RatingReport()
+    missing_players = set()
+    for event in pending_events:
+        results = db.execute(
+            select(
+                MatchResult.id,
+                MatchResult.player_1,
+                MatchResult.player_2,
+                MatchResult.player_3,
+                MatchResult.player_4,
+                MatchResult.games_1,
+                MatchResult.games_2,
+            ).where(MatchResult.event == event, MatchResult.rated_at.is_(None))
+        ).all()
+
+        names = {name for result in results for name in result[1:5]}
+        ratings = {
+            name: (rating, rated_matches)
+            for name, rating, rated_matches in db.execute(
+                select(
+                    player_rating.c.name, player_rating.c.rating, player_rating.c.rated_matches
+                ).where(player_rating.c.name.in_(names))
+            )
+        }
+
+        if event_missing_players := names - ratings.keys():
+            missing_players |= event_missing_players
+            n_results = len(results)
+            results = [
+                result for result in results if event_missing_players.isdisjoint(result[1:5])
+            ]
+            report.skipped += n_results - len(results)
+            if not results:
+                continue
+
+            names = {name for result in results for name in result[1:5]}
+
+        names = sorted(names)
+        player_indices = {name: i for i, name in enumerate(names)}
+
+        new_ratings, new_rated_matches = update_ratings(
+            [ratings[name][0] for name in names],
+            [ratings[name][1] for name in names],
+            [[player_indices[name] for name in result[1:5]] for result in results],
+            [result[5:7] for result in results],
+        )
+
+        db.execute(
+            update(Player),
+            [
+                {"name": name, "rating": rating, "rated_matches": rated_matches}
+                for name, rating, rated_matches in zip(
+                    names, new_ratings.tolist(), new_rated_matches.tolist()
+                )
+            ],
+        )
+        db.execute(
+            update(MatchResult)
+            .where(MatchResult.id.in_([result[0] for result in results]))
+            .values(rated_at=datetime.now())
+        )
+        db.commit()
+
+        report.rated += len(results)
+
+    report.missing_players = sorted(missing_players)
+
+    return report
+
+
+@timed
+def load_ratings(names: Sequence[str], db: Session) -> list[float]:
+    """Get the rating of some players, the one of their level if they have no rated matches
+
+    Parameters
+    ----------
+    names : Sequence[str]
+        The names of the players
+    db : Session
+        Database of the players
+
+    Returns
+    -------
+    list[float]
+        The rating of each player, in the order of `names`
+
+    Raises
+    ------
+    ValueError
+        If a player is not in the database
+    """
+    ratings = dict(
+        db.execute(
+            select(player_rating.c.name, player_rating.c.rating).where(
+                player_rating.c.name.in_(names)
+            )
+        ).all()
+    )
+
+    if missing_names := [name for name in names if name not in ratings]:
+        raise ValueError(f"Players not found: {', '.join(missing_names)}")
+
+    return [ratings[name] for name in names]
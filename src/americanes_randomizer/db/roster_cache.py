@@ -0,0 +1,326 @@
+import re
+import sys
+import threading
+import unicodedata
+from bisect import bisect_left
+
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from americanes_randomizer.constants import LEVEL_NUMBERS, Levels
+from americanes_randomizer.db import controller
+from americanes_randomizer.db.search_index import is_search_index_available
+from americanes_randomizer.instrumentation import timed
+from americanes_randomizer.roster import PlayerRoster, RosterPlayer
+from americanes_randomizer.schemas import CreatePlayer, UpdatePlayer
+
+
+WORD_PATTERN = re.compile(r"\w+")
+
+
+class RosterCache:
+    """In-memory copy of the player roster that searches without querying the database
+
+    The roster is loaded once as a PlayerRoster sorted by lowercase name, with parallel lists of
+    the lowercase names and of their words folded for searching.
+    Creating, updating and deleting players writes to the database through the controller and
+    then updates the cache in place. Searches, updates and reloads hold a lock, so the cache can be
+    searched or reloaded from worker threads while other threads edit players.
+    The last search is kept, so a search that narrows it, e.g. after typing one more letter, only
+    filters its results instead of the whole roster.
+
+    Parameters
+    ----------
+    db : Session
+        Database of the roster
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+        self._lock = threading.RLock()
+        self._version = 0
+        self._last_search: tuple[str, Levels | None, list[int]] | None = None
+
+        self.reload()
+
+    def __len__(self) -> int:
+        """Get the number of cached players"""
+        return len(self._roster)
+
+    @timed
+    def reload(self, db: Session | None = None):
+        """Load the whole roster from the database, e.g. after a bulk import
+
+        The new roster is built before taking the lock, searches keep using the old one meanwhile.
+        Every write to the cache counts a new version, if a player is created, updated or deleted
+        while the roster loads it may be missing from the new roster, so it is loaded again.
+
+        Parameters
+        ----------
+        db : Session | None, optional
+            Database from which to load the roster, e.g. the session of a worker thread, by default
+            the database of the cache
+        """
+        db = db or self.db
+
+        while True:
+            with self._lock:
+                version = self._version
+
+            roster = controller.load_roster("", None, db)
+            lower_names = [name.lower() for name in roster.names]
+
+            # sorted again here, SQLite lower() only folds ASCII letters
+            order = sorted(range(len(roster)), key=list(zip(lower_names, roster.names)).__getitem__)
+
+            roster = roster.take(order)
+            lower_names = [lower_names[i] for i in order]
+            search_keys = [_search_key(name) for name in roster.names]
+            is_word_search = is_search_index_available(db)
+
+            with self._lock:
+                if self._version != version:
+                    # a write patched the old roster while this one was loading
+                    continue
+
+                self._roster = roster
+                self._lower_names = lower_names
+                self._search_keys = search_keys
+                self._is_word_search = is_word_search
+                self._version += 1
+                self._last_search = None
+
+            return
+
+    def search(self, search_name: str, search_level: Levels | None) -> list[RosterPlayer]:
+        """Get the players that comply with the search_name and search_level, sorted by name
+
+        Parameters
+        ----------
+        search_name : str
+            Text to search in the names of the players, see `search_roster`
+        search_level : Levels | None
+            The level of the players, None for all levels
+
+        Returns
+        -------
+        list[RosterPlayer]
+            A list of players sorted by name
+        """
+        return list(self.search_roster(search_name, search_level))
+
+    @timed
+    def search_roster(self, search_name: str, search_level: Levels | None) -> PlayerRoster:
+        """Get the roster of the players that comply with the search_name and search_level
+
+        Matches the same players as `controller.list_players`: with the player search index,
+        names must have words starting by each searched word, ignoring case and diacritics,
+        otherwise, or when the text has no words such as a lone quote, they must contain the
+        searched text ignoring case.
+
+        Parameters
+        ----------
+        search_name : str
+            Text to search in the names of the players
+        search_level : Levels | None
+            The level of the players, None for all levels
+
+        Returns
+        -------
+        PlayerRoster
+            The roster of the players sorted by name
+        """
+        with self._lock:
+            indices = self._narrowed_indices(search_name, search_level)
+            if indices is None:
+                indices = range(len(self._roster))
+
+            if search_level is not None:
+                level_code = LEVEL_NUMBERS[search_level]
+                level_codes = self._roster.level_codes
+                indices = [i for i in indices if level_codes[i] == level_code]
+
+            if words := self._search_words(search_name):
+                for word in words:
+                    word = f" {word}"
+                    indices = [i for i in indices if word in self._search_keys[i]]
+            elif search_name:
+                lower_search_name = search_name.lower()
+                indices = [i for i in indices if lower_search_name in self._lower_names[i]]
+
+            self._last_search = (search_name, search_level, list(indices))
+
+            return self._roster.take(indices)
+
+    def create_player(self, player: CreatePlayer, db: Session | None = None) -> RosterPlayer:
+        """Add a new player to the database and the cache
+
+        Parameters
+        ----------
+        player : CreatePlayer
+            The player to be created
+        db : Session | None, optional
+            Database in which to create the player, e.g. the session of a worker thread, by
+            default the database of the cache
+
+        Returns
+        -------
+        RosterPlayer
+            The created player
+
+        Raises
+        ------
+        IntegrityError
+            If there is already a player with the same name
+        """
+        db = db or self.db
+
+        try:
+            db_player = controller.create_new_player(player, db)
+        except IntegrityError:
+            db.rollback()
+            raise
+
+        with self._lock:
+            # a reload that ran after the commit already has the player
+            if (index := self._index(db_player.name)) is not None:
+                self._roster.level_codes[index] = LEVEL_NUMBERS[db_player.level]
+            else:
+                index = self._insertion_index(db_player.name)
+                self._roster.names.insert(index, sys.intern(db_player.name))
+                self._roster.level_codes.insert(index, LEVEL_NUMBERS[db_player.level])
+                self._lower_names.insert(index, db_player.name.lower())
+                self._search_keys.insert(index, _search_key(db_player.name))
+            self._version += 1
+            self._last_search = None
+
+        return RosterPlayer(db_player.name, db_player.level)
+
+    def update_player(
+        self, name: str, player: UpdatePlayer, db: Session | None = None
+    ) -> RosterPlayer | dict[str, str | int]:
+        """Update a player in the database and the cache
+
+        Parameters
+        ----------
+        name : str
+            The name of the player to update
+        player : UpdatePlayer
+            The player to update
+        db : Session | None, optional
+            Database in which to update the player, by default the database of the cache
+
+        Returns
+        -------
+        RosterPlayer | dict[str, str | int]
+            The updated player or a dictionary with the error
+        """
+        db_player = controller.update_player(name, player, db or self.db)
+        if isinstance(db_player, dict):
+            return db_player
+
+        with self._lock:
+            if (index := self._index(name)) is not None:
+                self._roster.level_codes[index] = LEVEL_NUMBERS[db_player.level]
+            self._version += 1
+            self._last_search = None
+
+        return RosterPlayer(db_player.name, db_player.level)
+
+    def delete_player(self, name: str, db: Session | None = None) -> dict[str, str | int] | None:
+        """Delete a player from the database and the cache
+
+        Parameters
+        ----------
+        name : str
+            The name of the player to delete
+        db : Session | None, optional
+            Database in which to delete the player, by default the database of the cache
+
+        Returns
+        -------
+        dict[str, str | int] | None
+            Nothing or a dictionary with the error
+        """
+        error = controller.delete_player(name, db or self.db)
+        if error:
+            return error
+
+        with self._lock:
+            if (index := self._index(name)) is not None:
+                del self._roster.names[index]
+                del self._roster.level_codes[index]
+                del self._lower_names[index]
+                del self._search_keys[index]
+            self._version += 1
+            self._last_search = None
+
+        return None
+
+    def _narrowed_indices(self, search_name: str, search_level: Levels | None) -> list[int] | None:
+        """Get the results of the last search if every match of the new one is among them"""
+        if self._last_search is None:
+            return None
+
+        last_search_name, last_search_level, last_indices = self._last_search
+        if last_search_level is not None and last_search_level != search_level:
+            return None
+
+        words = self._search_words(search_name)
+        last_words = self._search_words(last_search_name)
+        if words and last_words:
+            # every searched word must still be the prefix of one of the new searched words
+            is_narrower = all(
+                any(word.startswith(last_word) for word in words) for last_word in last_words
+            )
+        elif not words and not last_words:
+            is_narrower = last_search_name.lower() in search_name.lower()
+        else:
+            # one search matches words and the other one text, only an empty search holds both
+            is_narrower = not last_search_name
+
+        return last_indices if is_narrower else None
+
+    def _search_words(self, search_name: str) -> list[str]:
+        """Get the folded words searched with the index, none to search the text as a substring"""
+        if not self._is_word_search:
+            return []
+
+        return WORD_PATTERN.findall(_fold(search_name))
+
+    def _insertion_index(self, name: str) -> int:
+        """Find where a name goes in the cache to keep it sorted by lowercase name"""
+        lower_name = name.lower()
+
+        index = bisect_left(self._lower_names, lower_name)
+        while (
+            index < len(self._roster)
+            and self._lower_names[index] == lower_name
+            and self._roster.names[index] < name
+        ):
+            index += 1
+
+        return index
+
+    def _index(self, name: str) -> int | None:
+        """Find the position of a player in the cache"""
+        index = self._insertion_index(name)
+        if index < len(self._roster) and self._roster.names[index] == name:
+            return index
+
+        return None
+
+
+def _fold(text: str) -> str:
+    """Lowercase a text and remove its diacritics, as the player search index tokenizer does"""
+    if text.isascii():
+        return text.lower()
+
+    return "".join(
+        c for c in unicodedata.normalize("NFKD", text.lower()) if not unicodedata.combining(c)
+    )
+
+
+def _search_key(name: str) -> str:
+    """Get the folded words of a name, each preceded by a space to match word prefixes"""
+    return "".join(f" {word}" for word in WORD_PATTERN.findall(_fold(name)))
@@ -0,0 +1,177 @@
+import re
+from weakref import WeakKeyDictionary
+
+from sqlalchemy import Column, ColumnElement, Engine, MetaData, String, Table, text
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session
+
+
+SEARCH_INDEX_TOKENIZER = "unicode61 remove_diacritics 2"
+
+# kept out of the models metadata, create_all can't create virtual tables
+player_fts = Table(
+    "player_fts",
+    MetaData(),
+    Column("name", String),
+)
+
+_CREATE_SEARCH_INDEX = [
+    # player is keyed by its name, its implicit rowid may be renumbered by a VACUUM
+    """
+    CREATE TABLE IF NOT EXISTS player_search_key (
+        id INTEGER PRIMARY KEY, name TEXT NOT NULL UNIQUE
+    )
+    """,
+    f"""
+    CREATE VIRTUAL TABLE IF NOT EXISTS player_fts
+    USING fts5(
+        name,
+        content = 'player_search_key',
+        content_rowid = 'id',
+        tokenize = '{SEARCH_INDEX_TOKENIZER}'
+    )
+    """,
+]
+_FILL_SEARCH_INDEX = [
+    "INSERT INTO player_search_key (name) SELECT name FROM player",
+    "INSERT INTO player_fts (player_fts) VALUES ('rebuild')",
+]
+_CREATE_SEARCH_INDEX_TRIGGERS = [
+    """
+    CREATE TRIGGER IF NOT EXISTS player_search_key_insert AFTER INSERT ON player BEGIN
+        INSERT INTO player_search_key (name) VALUES (new.name);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS player_search_key_delete AFTER DELETE ON player BEGIN
+        DELETE FROM player_search_key WHERE name = old.name;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS player_search_key_update AFTER UPDATE OF name ON player BEGIN
+        UPDATE player_search_key SET name = new.name WHERE name = old.name;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS player_fts_insert AFTER INSERT ON player_search_key BEGIN
+        INSERT INTO player_fts (rowid, name) VALUES (new.id, new.name);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS player_fts_delete AFTER DELETE ON player_search_key BEGIN
+        INSERT INTO player_fts (player_fts, rowid, name) VALUES ('delete', old.id, old.name);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS player_fts_update AFTER UPDATE OF name ON player_search_key BEGIN
+        INSERT INTO player_fts (player_fts, rowid, name) VALUES ('delete', old.id, old.name);
+        INSERT INTO player_fts (rowid, name) VALUES (new.id, new.name);
+    END
+    """,
+]
+_DROP_SEARCH_INDEX = [
+    "DROP TRIGGER IF EXISTS player_search_key_insert",
+    "DROP TRIGGER IF EXISTS player_search_key_delete",
+    "DROP TRIGGER IF EXISTS player_search_key_update",
+    "DROP TRIGGER IF EXISTS player_fts_insert",
+    "DROP TRIGGER IF EXISTS player_fts_delete",
+    "DROP TRIGGER IF EXISTS player_fts_update",
+    "DROP TABLE IF EXISTS player_fts",
+    "DROP TABLE IF EXISTS player_search_key",
+]
+
+_is_search_index_available: WeakKeyDictionary[Engine, bool] = WeakKeyDictionary()
+
+
+def create_player_search_index(engine: Engine) -> bool:
+    """Create the FTS5 index of the player names and the triggers that keep it in sync
+
+    The index is filled with the existing players when it is created. Names are tokenized with
+    unicode61 removing diacritics, so searching "Gonzalez" finds "González". It is an external
+    content index of the player_search_key table, which gives every name an INTEGER PRIMARY KEY
+    kept by a VACUUM, unlike the rowid of the player table, so the triggers delete and update the
+    entries of a player by id instead of scanning the index for its name. Indexes of older
+    versions of the app, which kept their own copy of the names or were keyed by the player
+    rowid, are replaced.
+
+    Parameters
+    ----------
+    engine : Engine
+        Engine of the database
+
+    Returns
+    -------
+    bool
+        Whether the index is available, False if SQLite was built without FTS5
+    """
+    try:
+        with engine.begin() as connection:
+            index_sql = connection.execute(
+                text("SELECT sql FROM sqlite_master WHERE type = 'table' AND name = 'player_fts'")
+            ).scalar()
+
+            is_new = index_sql is None or "player_search_key" not in index_sql
+            if is_new:
+                for statement in _DROP_SEARCH_INDEX:
+                    connection.execute(text(statement))
+
+            for statement in _CREATE_SEARCH_INDEX:
+                connection.execute(text(statement))
+
+            if is_new:
+                for statement in _FILL_SEARCH_INDEX:
+                    connection.execute(text(statement))
+
+            for statement in _CREATE_SEARCH_INDEX_TRIGGERS:
+                connection.execute(text(statement))
+    except OperationalError:
+        _is_search_index_available[engine] = False
+    else:
+        _is_search_index_available[engine] = True
+
+    return _is_search_index_available[engine]
+
+
+def is_search_index_available(db: Session) -> bool:
+    """Check whether the database of a session has the player search index
+
+    Parameters
+    ----------
+    db : Session
+        Database to check
+
+    Returns
+    -------
+    bool
+        Whether the player names can be searched with the FTS5 index
+    """
+    engine = db.get_bind()
+
+    if engine not in _is_search_index_available:
+        _is_search_index_available[engine] = bool(
+            db.execute(
+                text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'player_fts'")
+            ).first()
+        )
+
+    return _is_search_index_available[engine]
+
+
+def prefix_match(search_name: str) -> ColumnElement[bool] | None:
+    """Build the FTS5 condition matching the names with words starting by each searched word
+
+    Parameters
+    ----------
+    search_name : str
+        The searched text
+
+    Returns
+    -------
+    ColumnElement[bool] | None
+        The condition on the player_fts table, None if the text has no words to search
+    """
+    words = re.findall(r"\w+", search_name)
+    if not words:
+        return None
+
+    return player_fts.c.name.op("MATCH")(" ".join(f'"{word}"*' for word in words))
@@ -1,6 +1,148 @@
-from sqlalchemy import create_engine
+import os
+import re
+from pathlib import Path
+
+from sqlalchemy import Engine, create_engine, event, inspect, text
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import QueuePool
+from sqlalchemy.schema import CreateColumn, CreateIndex
+
+from americanes_randomizer.db.models import BaseModel
+from americanes_randomizer.db.ratings import create_player_rating_view
+from americanes_randomizer.db.search_index import create_player_search_index
+
+
+DATABASE_PATH_ENV_VAR = "AMERICANES_DATABASE"
+SQLITE_PRAGMA_ENV_VAR_PREFIX = "AMERICANES_SQLITE_"
+DEFAULT_DATABASE_PATH = Path("database") / "americanes_randomizer.db"
+SQLITE_PRAGMAS = {
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",
+    "mmap_size": "268435456",
+    "cache_size": "-65536",
+    "temp_store": "MEMORY",
+}
+"""Pragmas run on every new connection, WAL lets readers and the writer work concurrently and
+only fsyncs at checkpoints with synchronous NORMAL, the cache size is in KiB when negative"""
+SQLITE_POOL_SIZE = 4
+SQLITE_POOL_OVERFLOW = 4
+
+
+def create_database_engine(
+    database_path: Path | None = None, pragmas: dict[str, str] | None = None
+) -> Engine:
+    """Create the engine of an SQLite database tuned for the app
+
+    The pragmas are set on every new connection of the pool, which keeps the connections open so
+    they are only set once per connection. Every default pragma can be overridden with an
+    AMERICANES_SQLITE_<PRAGMA> environment variable, e.g. AMERICANES_SQLITE_SYNCHRONOUS=FULL.
+
+    Parameters
+    ----------
+    database_path : Path | None, optional
+        The database file, its directory is created on connect if missing, by default the
+        AMERICANES_DATABASE environment variable or DEFAULT_DATABASE_PATH
+    pragmas : dict[str, str] | None, optional
+        Pragmas overriding the default and environment ones, by default None
+
+    Returns
+    -------
+    Engine
+        The engine of the database
+    """
+    if database_path is None:
+        database_path = Path(os.environ.get(DATABASE_PATH_ENV_VAR, DEFAULT_DATABASE_PATH))
+    database_path = Path(database_path).expanduser().resolve()
+
+    connection_pragmas = {
+        **SQLITE_PRAGMAS,
+        **{
+            name: os.environ[SQLITE_PRAGMA_ENV_VAR_PREFIX + name.upper()]
+            for name in SQLITE_PRAGMAS
+            if SQLITE_PRAGMA_ENV_VAR_PREFIX + name.upper() in os.environ
+        },
+        **(pragmas or {}),
+    }
+    for name, value in connection_pragmas.items():
+        # pragmas can't take bound parameters, only accept plain names and numbers
+        if not re.fullmatch(r"\w+", name) or not re.fullmatch(r"-?\w+", str(value)):
+            raise ValueError(f"Invalid SQLite pragma {name}={value}")
+
+    engine = create_engine(
+        f"sqlite:///{database_path}",
+        poolclass=QueuePool,
+        pool_size=SQLITE_POOL_SIZE,
+        max_overflow=SQLITE_POOL_OVERFLOW,
+    )
+
+    @event.listens_for(engine, "do_connect")
+    def create_database_dir(dialect, connection_record, cargs, cparams):
+        database_path.parent.mkdir(parents=True, exist_ok=True)
+
+    @event.listens_for(engine, "connect")
+    def set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for name, value in connection_pragmas.items():
+                cursor.execute(f"PRAGMA {name} = {value}")
+        finally:
+            cursor.close()
 
+    return engine
 
-ENGINE = create_engine("sqlite:///database/americanes_randomizer.db")
+
+ENGINE = create_database_engine()
 DATABASE_SESSION = sessionmaker(autocommit=False, autoflush=False, bind=ENGINE)
+
+
+def configure_database(database_path: Path | None = None, pragmas: dict[str, str] | None = None):
+    """Point ENGINE and DATABASE_SESSION to another database or pragmas
+
+    Parameters
+    ----------
+    database_path : Path | None, optional
+        The database file, by default the AMERICANES_DATABASE environment variable or
+        DEFAULT_DATABASE_PATH
+    pragmas : dict[str, str] | None, optional
+        Pragmas overriding the default and environment ones, by default None
+    """
+    global ENGINE
+
+    ENGINE.dispose()
+    ENGINE = create_database_engine(database_path, pragmas)
+    DATABASE_SESSION.configure(bind=ENGINE)
+
+
+def create_tables(engine: Engine | None = None):
+    """Create the missing tables, columns and indexes, the player search index and views
+
+    Columns added to the models after their table was created are added with ALTER TABLE, so
+    databases of older versions of the app are migrated in place.
+
+    Parameters
+    ----------
+    engine : Engine | None, optional
+        Engine of the database, by default ENGINE
+    """
+    engine = engine or ENGINE
+
+    BaseModel.metadata.create_all(bind=engine)
+
+    # create_all only creates the columns and indexes of new tables, add the ones of existing
+    # tables too
+    with engine.begin() as connection:
+        inspector = inspect(connection)
+        for table in BaseModel.metadata.sorted_tables:
+            existing_columns = {column["name"] for column in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name not in existing_columns:
+                    column_definition = CreateColumn(column).compile(dialect=engine.dialect)
+                    connection.execute(
+                        text(f"ALTER TABLE {table.name} ADD COLUMN {column_definition}")
+                    )
+
+            for index in table.indexes:
+                connection.execute(CreateIndex(index, if_not_exists=True))
+
+    create_player_search_index(engine)
+    create_player_rating_view(engine)
@@ -0,0 +1,258 @@
+import cProfile
+import functools
+import importlib
+import json
+import logging
+import os
+import sys
+import threading
+import time
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from logging.handlers import RotatingFileHandler
+from pathlib import Path
+
+
+METRICS_ENV_VAR = "AMERICANES_METRICS"
+PROFILE_ENV_VAR = "AMERICANES_PROFILE"
+METRICS_DIR_ENV_VAR = "AMERICANES_METRICS_DIR"
+DEFAULT_METRICS_DIR = Path("metrics")
+METRICS_FILE_NAME = "americanes_randomizer.log"
+METRICS_FILE_MAX_BYTES = 1_000_000
+METRICS_FILE_BACKUPS = 5
+STARTUP_REPORT_FILE_NAME = "startup.jsonl"
+
+package_logger = logging.getLogger("americanes_randomizer")
+metrics_logger = logging.getLogger("americanes_randomizer.metrics")
+
+_is_enabled = False
+_is_profiling = False
+_metrics_dir = DEFAULT_METRICS_DIR
+_metrics_handler: logging.Handler | None = None
+_active_profiler: cProfile.Profile | None = None
+_profiler_lock = threading.Lock()
+
+
+def configure(
+    enabled: bool | None = None,
+    profile: bool | None = None,
+    metrics_dir: Path | None = None,
+):
+    """Turn the timing spans and the profiling on or off
+
+    Settings not given are read from the AMERICANES_METRICS, AMERICANES_PROFILE and
+    AMERICANES_METRICS_DIR environment variables. When enabled, the spans and the debug logs of
+    the package are written to a rolling log file in the metrics directory, and when profiling
+    the cProfile stats of every outermost span are dumped next to it.
+
+    Parameters
+    ----------
+    enabled : bool | None, optional
+        Whether to time the spans and write the debug logs, by default from the environment
+    profile : bool | None, optional
+        Whether to also profile the spans, implies `enabled`, by default from the environment
+    metrics_dir : Path | None, optional
+        Directory of the log file and the profiles, by default from the environment
+    """
+    global _is_enabled, _is_profiling, _metrics_dir, _metrics_handler
+
+    if profile is None:
+        profile = os.environ.get(PROFILE_ENV_VAR, "") == "1"
+    if enabled is None:
+        enabled = os.environ.get(METRICS_ENV_VAR, "") == "1"
+    if metrics_dir is None:
+        metrics_dir = Path(os.environ.get(METRICS_DIR_ENV_VAR, DEFAULT_METRICS_DIR))
+
+    _is_profiling = profile
+    _is_enabled = enabled or profile
+    _metrics_dir = metrics_dir
+
+    if _metrics_handler is not None:
+        package_logger.removeHandler(_metrics_handler)
+        _metrics_handler.close()
+        _metrics_handler = None
+
+    if _is_enabled:
+        _metrics_dir.mkdir(parents=True, exist_ok=True)
+        _metrics_handler = RotatingFileHandler(
+            _metrics_dir / METRICS_FILE_NAME,
+            maxBytes=METRICS_FILE_MAX_BYTES,
+            backupCount=METRICS_FILE_BACKUPS,
+            encoding="utf-8",
+        )
+        _metrics_handler.setFormatter(
+            logging.Formatter("%(asctime)s %(name)s %(levelname)s %(message)s")
+        )
+        package_logger.addHandler(_metrics_handler)
+        package_logger.setLevel(logging.DEBUG)
+    else:
+        package_logger.setLevel(logging.NOTSET)
+
+
+def is_enabled() -> bool:
+    """Check whether the instrumentation is on
+
+    Returns
+    -------
+    bool
+        Whether the spans are being timed
+    """
+    return _is_enabled
+
+
+@contextmanager
+def span(name: str, **attributes) -> Iterator[None]:
+    """Time a block of code and log it as a span, doing nothing when the instrumentation is off
+
+    When profiling, only one span is profiled at a time, the outermost one of the first thread
+    to open one, and only the code run by that thread is profiled. The spans opened meanwhile,
+    nested or in other threads, are timed but not profiled.
+
+    Parameters
+    ----------
+    name : str
+        The name of the span
+    **attributes
+        Extra values to log with the span
+    """
+    global _active_profiler
+
+    if not _is_enabled:
+        yield
+        return
+
+    # cProfile can't nest and since Python 3.12 only one profiler can be enabled at a time
+    profiler = None
+    if _is_profiling:
+        with _profiler_lock:
+            if _active_profiler is None:
+                profiler = _active_profiler = cProfile.Profile()
+                profiler.enable()
+
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        duration = time.perf_counter() - start
+
+        if profiler is not None:
+            profiler.disable()
+            with _profiler_lock:
+                _active_profiler = None
+            profiler.dump_stats(_metrics_dir / f"{name}-{time.time_ns()}.prof")
+
+        metrics_logger.info(
+            json.dumps({"span": name, "duration_ms": round(duration * 1000, 3), **attributes})
+        )
+
+
+def timed(function: Callable) -> Callable:
+    """Decorate a function to log every call to it as a span
+
+    Parameters
+    ----------
+    function : Callable
+        The function to time
+
+    Returns
+    -------
+    Callable
+        The timed function, which calls `function` straight away when the instrumentation is off
+    """
+    name = f"{function.__module__}.{function.__qualname__}"
+
+    @functools.wraps(function)
+    def timed_function(*args, **kwargs):
+        if not _is_enabled:
+            return function(*args, **kwargs)
+
+        with span(name):
+            return function(*args, **kwargs)
+
+    return timed_function
+
+
+class StartupTimer:
+    """Record how long each phase of the app startup takes
+
+    Parameters
+    ----------
+    start : float
+        The `time.perf_counter` at which the startup began
+    """
+
+    def __init__(self, start: float):
+        self.start = start
+        self.phases = []
+
+        self._last_mark = start
+
+    def mark(self, phase: str):
+        """Record the end of a phase started at the previous mark
+
+        Parameters
+        ----------
+        phase : str
+            The name of the phase
+        """
+        now = time.perf_counter()
+        self.phases.append(
+            {
+                "phase": phase,
+                "duration_ms": round((now - self._last_mark) * 1000, 3),
+                "elapsed_ms": round((now - self.start) * 1000, 3),
+            }
+        )
+        self._last_mark = now
+
+    def import_modules(self, module_names: list[str]):
+        """Import modules one after the other, recording each one as a phase
+
+        Like `python -X importtime` but per module asked for, each phase also counts the modules
+        that were loaded along with it.
+
+        Parameters
+        ----------
+        module_names : list[str]
+            The modules to import, in order
+        """
+        for module_name in module_names:
+            n_modules = len(sys.modules)
+            self._last_mark = time.perf_counter()
+
+            importlib.import_module(module_name)
+
+            self.mark(f"import {module_name}")
+            self.phases[-1]["new_modules"] = len(sys.modules) - n_modules
+
+    def record(self, **attributes) -> dict:
+        """Write the startup report to the metrics directory, when the instrumentation is on
+
+        Parameters
+        ----------
+        **attributes
+            Extra values to record with the report
+
+        Returns
+        -------
+        dict
+            The startup report
+        """
+        report = {
+            "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": sys.version.split()[0],
+            "frozen": getattr(sys, "frozen", False),
+            **attributes,
+            "phases": self.phases,
+        }
+
+        if _is_enabled:
+            with open(_metrics_dir / STARTUP_REPORT_FILE_NAME, "a", encoding="utf-8") as f:
+                f.write(json.dumps(report) + "\n")
+
+            metrics_logger.info(json.dumps({"span": "startup", **report}))
+
+        return report
+
+
+configure()
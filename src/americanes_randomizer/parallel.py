@@ -0,0 +1,167 @@
+import os
+from collections.abc import Sequence
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing.shared_memory import SharedMemory
+
+import numpy as np
+
+from americanes_randomizer.constants import COURT_CAPACITY, Levels
+from americanes_randomizer.randomize_logic import (
+    draw_courts_batch,
+    probability_table,
+    spawn_generators,
+)
+from americanes_randomizer.scoring import select_best_distributions
+
+
+PARALLEL_SHARD_SIZE = 2048
+PARALLEL_MIN_DRAWS = 200_000
+"""Minimum samples x players of a job to be worth sending to a process pool"""
+
+_worker_memory: SharedMemory | None = None
+_worker_level_codes: np.ndarray | None = None
+
+
+def sweep_best_distributions(
+    level_codes: np.ndarray,
+    americana_level: Levels,
+    probability_modifications: Sequence[float],
+    n_samples: int,
+    k: int = 1,
+    seed: int | np.random.SeedSequence | None = None,
+    n_workers: int | None = None,
+) -> dict[float, tuple[np.ndarray, np.ndarray]]:
+    """Draw and score many distributions for each probability modification, keeping the best
+
+    The samples of each probability modification are split in shards, every shard is drawn with
+    its own generator spawned from `seed` and only its best `k` candidates are sent back to be
+    merged. Big jobs are run in a process pool that reads the level codes from shared memory,
+    small ones in this process, both give the same result for the same seed.
+
+    Parameters
+    ----------
+    level_codes : np.ndarray
+        The level code of each player
+    americana_level : Levels
+        The level of the americana
+    probability_modifications : Sequence[float]
+        The probability modifications to draw distributions for
+    n_samples : int
+        The number of distributions to draw for each probability modification
+    k : int, optional
+        The number of distributions to keep for each probability modification, by default 1
+    seed : int | np.random.SeedSequence | None, optional
+        Seed of the whole job, by default None
+    n_workers : int | None, optional
+        The number of worker processes, by default the number of CPUs this process can run on
+
+    Returns
+    -------
+    dict[float, tuple[np.ndarray, np.ndarray]]
+        For each probability modification, the court index of each player in its best
+        distributions, best first, and their scores
+    """
+    level_codes = np.ascontiguousarray(level_codes, dtype=np.intp)
+    n_workers = n_workers or available_cpus()
+
+    shards = [
+        (probability_modification, min(PARALLEL_SHARD_SIZE, n_samples - start))
+        for probability_modification in probability_modifications
+        for start in range(0, n_samples, PARALLEL_SHARD_SIZE)
+    ]
+    generators = spawn_generators(seed, len(shards))
+    shard_jobs = [
+        (americana_level, probability_modification, shard_samples, k, rng)
+        for (probability_modification, shard_samples), rng in zip(shards, generators)
+    ]
+
+    is_small_job = (
+        len(probability_modifications) * n_samples * len(level_codes) < PARALLEL_MIN_DRAWS
+    )
+    if n_workers == 1 or len(shards) == 1 or is_small_job:
+        shard_results = [_best_of_shard(level_codes, *job) for job in shard_jobs]
+    else:
+        shard_results = _run_in_pool(level_codes, shard_jobs, min(n_workers, len(shards)))
+
+    candidates = {
+        probability_modification: [] for probability_modification in probability_modifications
+    }
+    for (probability_modification, _), shard_result in zip(shards, shard_results):
+        candidates[probability_modification].append(shard_result)
+
+    best_distributions = {}
+    for probability_modification, results in candidates.items():
+        courts = np.concatenate([shard_courts for shard_courts, _ in results])
+        scores = np.concatenate([shard_scores for _, shard_scores in results])
+
+        best = np.argsort(scores, kind="stable")[:k]
+        best_distributions[probability_modification] = (courts[best], scores[best])
+
+    return best_distributions
+
+
+def available_cpus() -> int:
+    """Get the number of CPUs this process can run on
+
+    Unlike `os.cpu_count`, it follows the CPU affinity of the process, e.g. the CPUs of a
+    container or a `taskset`, where the platform supports it.
+
+    Returns
+    -------
+    int
+        The number of usable CPUs, at least 1
+    """
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0))
+
+    return os.cpu_count() or 1
+
+
+def _run_in_pool(level_codes: np.ndarray, shard_jobs: list[tuple], n_workers: int) -> list:
+    """Run the shards in a process pool sharing the level codes through shared memory"""
+    memory = SharedMemory(create=True, size=level_codes.nbytes)
+    try:
+        np.ndarray(level_codes.shape, level_codes.dtype, buffer=memory.buf)[:] = level_codes
+
+        with ProcessPoolExecutor(
+            max_workers=n_workers,
+            initializer=_attach_level_codes,
+            initargs=(memory.name, level_codes.shape, level_codes.dtype.str),
+        ) as executor:
+            return list(executor.map(_best_of_shared_shard, *zip(*shard_jobs)))
+    finally:
+        memory.close()
+        memory.unlink()
+
+
+def _attach_level_codes(memory_name: str, shape: tuple[int, ...], dtype: str):
+    """Map the level codes of the job from shared memory when a worker process starts"""
+    global _worker_memory, _worker_level_codes
+
+    _worker_memory = SharedMemory(name=memory_name)
+    _worker_level_codes = np.ndarray(shape, np.dtype(dtype), buffer=_worker_memory.buf)
+
+
+def _best_of_shared_shard(*shard_job) -> tuple[np.ndarray, np.ndarray]:
+    """Run a shard in a worker process over the level codes in shared memory"""
+    return _best_of_shard(_worker_level_codes, *shard_job)
+
+
+def _best_of_shard(
+    level_codes: np.ndarray,
+    americana_level: Levels,
+    probability_modification: float,
+    n_samples: int,
+    k: int,
+    rng: np.random.Generator,
+) -> tuple[np.ndarray, np.ndarray]:
+    """Draw a shard of distributions and keep only its best `k` ones"""
+    distributions = probability_table(
+        len(level_codes) // COURT_CAPACITY, americana_level, probability_modification
+    )
+    candidates = draw_courts_batch(level_codes, distributions, n_samples, rng)
+    best, scores = select_best_distributions(
+        level_codes, candidates, americana_level, probability_modification, k
+    )
+
+    return candidates[best], scores
@@ -1,65 +1,626 @@
-import random
+import logging
+from collections.abc import Sequence
+from functools import lru_cache
 
 import numpy as np
-import pandas as pd
 
-from americanes_randomizer.constants import Levels
-from americanes_randomizer.db.models import Player
+from americanes_randomizer.co_occurrence import CoOccurrenceMatrix
+from americanes_randomizer.constants import (
+    COURT_CAPACITY,
+    LEVEL_NUMBERS,
+    DistributionEngines,
+    Levels,
+)
+from americanes_randomizer.instrumentation import timed
+from americanes_randomizer.ratings import level_positions
+from americanes_randomizer.roster import PlayerRoster, RosterPlayer
 
 
-np.set_printoptions(formatter={"float": lambda x: f"{x:0.2f}"})
+logger = logging.getLogger(__name__)
 
+MIN_PROBABILITY = 1e-15
+MIN_BATCH_SIZE = 32
+PROBABILITY_TABLE_CACHE_SIZE = 256
+RATING_POSITION_STEPS = 100
+"""Rating positions are rounded to this fraction of a level, so that the players share the rows
+of court weights instead of getting one each"""
+CO_OCCURRENCE_PENALTY = 1.0
+"""The weight of a court is divided by e to the power of this for every time a player already
+shared a court with each of the players in it"""
 
+Seed = int | np.random.SeedSequence | np.random.Generator | None
+Players = PlayerRoster | Sequence[RosterPlayer]
+"""A roster, or any players with a name and a level such as the database models"""
+
+
+@timed
 def distribute_americana(
-    players: list[Player],
+    players: Players,
     probability_modification: float,
     americana_level: Levels,
-) -> dict[str, list[str]]:
-    players_df = pd.DataFrame([{"name": p.name, "level": p.level} for p in players])
+    seed: Seed = None,
+    engine: DistributionEngines = DistributionEngines.SEQUENTIAL,
+    ratings: np.ndarray | None = None,
+    co_occurrences: CoOccurrenceMatrix | None = None,
+) -> dict[int, list[str]]:
+    """Randomly distribute the players in courts of 4 weighting each court by the player level
 
-    n_courts = int(len(players_df) / 4)
-    standard_probability = 1 / n_courts
+    Parameters
+    ----------
+    players : Players
+        The players to distribute, must be a multiple of 4
+    probability_modification : float
+        How much the level of a player skews its probability towards the first or last courts
+    americana_level : Levels
+        The level of the americana, players of this level have a uniform probability
+    seed : Seed, optional
+        Seed or random generator used for the whole draw, by default None
+    engine : DistributionEngines, optional
+        The algorithm used to assign the courts, by default DistributionEngines.SEQUENTIAL
+    ratings : np.ndarray | None, optional
+        The continuous rating of each player, used instead of its level to weight the courts, see
+        `rating_distributions`, by default None
+    co_occurrences : CoOccurrenceMatrix | None, optional
+        How many times each pair of players recently shared a court, courts holding players that
+        shared one with a player are penalized for it, see `assign_courts_avoiding_repeats`. Only
+        supported by the sequential engine, by default None
+
+    Returns
+    -------
+    dict[int, list[str]]
+        The names of the players assigned to each court
+    """
+    players = PlayerRoster.from_players(players)
+    level_codes = player_level_codes(players)
+    names = players.names
+
+    n_courts = len(players) // COURT_CAPACITY
+    if ratings is not None:
+        level_codes, distributions = rating_distributions(
+            ratings, n_courts, americana_level, probability_modification
+        )
+    else:
+        distributions = probability_table(n_courts, americana_level, probability_modification)
+
+    if ratings is None and logger.isEnabledFor(logging.DEBUG):
+        for level, level_number in LEVEL_NUMBERS.items():
+            logger.debug(
+                "Probabilities of %s: %s",
+                level,
+                np.array2string(
+                    100 * distributions[level_number], formatter={"float": lambda x: f"{x:0.2f}"}
+                ),
+            )
+
+    if co_occurrences is not None and engine != DistributionEngines.SEQUENTIAL:
+        raise ValueError("Co-occurrences are only supported by the sequential engine")
+
+    rng = np.random.default_rng(seed)
+    if engine == DistributionEngines.EXACT_CAPACITY:
+        order = np.arange(len(players))
+        assigned_courts = assign_courts_exact_capacity(level_codes, distributions, rng)
+    elif co_occurrences is not None:
+        order = rng.permutation(len(players))
+        assigned_courts = assign_courts_avoiding_repeats(
+            level_codes, distributions, co_occurrences, order, rng
+        )[order]
+    else:
+        order = rng.permutation(len(players))
+        assigned_courts = assign_courts(level_codes[order], distributions, rng)
+
+    players_per_court = {c: [] for c in range(n_courts)}
+    for player_index, court in zip(order.tolist(), assigned_courts.tolist()):
+        players_per_court[court].append(names[player_index])
+
+    return players_per_court
+
+
+def distribute_americana_batch(
+    players: Players,
+    probability_modification: float,
+    americana_level: Levels,
+    n_samples: int,
+    seed: Seed = None,
+    engine: DistributionEngines = DistributionEngines.SEQUENTIAL,
+    ratings: np.ndarray | None = None,
+    co_occurrences: CoOccurrenceMatrix | None = None,
+) -> np.ndarray:
+    """Generate many independent distributions of the players at once
+
+    Each sample follows the same probability model as `distribute_americana`, but all samples
+    are drawn together: every player of every sample is first drawn from the weights of its
+    level, then the players are walked in each sample's shuffled order and only the draws that
+    landed on a court already full in their sample are drawn again against its open courts.
+
+    Parameters
+    ----------
+    players : Players
+        The players to distribute, must be a multiple of 4
+    probability_modification : float
+        How much the level of a player skews its probability towards the first or last courts
+    americana_level : Levels
+        The level of the americana, players of this level have a uniform probability
+    n_samples : int
+        The number of distributions to generate
+    seed : Seed, optional
+        Seed or random generator used for all the samples, by default None
+    engine : DistributionEngines, optional
+        The algorithm used to assign the courts, by default DistributionEngines.SEQUENTIAL
+    ratings : np.ndarray | None, optional
+        The continuous rating of each player, used instead of its level to weight the courts, see
+        `rating_distributions`, by default None
+    co_occurrences : CoOccurrenceMatrix | None, optional
+        How many times each pair of players recently shared a court, see
+        `distribute_americana`. The samples are then drawn one after the other, by default None
+
+    Returns
+    -------
+    np.ndarray
+        A samples x players matrix with the court index of each player in each sample
+    """
+    players = PlayerRoster.from_players(players)
+    level_codes = player_level_codes(players)
+    n_courts = len(players) // COURT_CAPACITY
+    if ratings is not None:
+        level_codes, distributions = rating_distributions(
+            ratings, n_courts, americana_level, probability_modification
+        )
+    else:
+        distributions = probability_table(n_courts, americana_level, probability_modification)
+
+    if co_occurrences is not None and engine != DistributionEngines.SEQUENTIAL:
+        raise ValueError("Co-occurrences are only supported by the sequential engine")
 
-    level_numbers = {
-        Levels.A: 5,
-        Levels.B_PLUS: 4,
-        Levels.B: 3,
-        Levels.C_PLUS: 2,
-        Levels.C: 1,
-        Levels.D: 0,
-    }
-    distributions = {}
-    americana_level_number = level_numbers[americana_level]
-
-    print("PROBABILITIES")
-    for level in level_numbers.keys():
-        level_difference = (level_numbers[level] - americana_level_number) / 2
-        distributions[level] = np.linspace(
-            standard_probability + level_difference * probability_modification,
-            standard_probability - level_difference * probability_modification,
-            num=n_courts,
+    rng = np.random.default_rng(seed)
+    if co_occurrences is not None:
+        assigned_courts = np.empty(
+            (n_samples, len(players)), dtype=np.min_scalar_type(n_courts - 1)
         )
-        distributions[level] = np.array([np.maximum(p, 1e-15) for p in distributions[level]])
-        print(f"\t{level}: {100 * distributions[level]}\n")
+        for sample in range(n_samples):
+            assigned_courts[sample] = assign_courts_avoiding_repeats(
+                level_codes, distributions, co_occurrences, rng.permutation(len(players)), rng
+            )
+        return assigned_courts
+
+    if engine == DistributionEngines.EXACT_CAPACITY:
+        level_codes = np.broadcast_to(level_codes, (n_samples, len(level_codes)))
+        return assign_courts_exact_capacity(level_codes, distributions, rng).astype(
+            np.min_scalar_type(distributions.shape[1] - 1)
+        )
+
+    return draw_courts_batch(level_codes, distributions, n_samples, rng)
+
+
+def draw_courts_batch(
+    level_codes: np.ndarray,
+    distributions: np.ndarray,
+    n_samples: int,
+    rng: np.random.Generator,
+) -> np.ndarray:
+    """Draw the courts of many independent samples of the same players
+
+    Parameters
+    ----------
+    level_codes : np.ndarray
+        The level code of each player
+    distributions : np.ndarray
+        The levels x courts matrix of court weights
+    n_samples : int
+        The number of distributions to generate
+    rng : np.random.Generator
+        Random generator used for the draws
+
+    Returns
+    -------
+    np.ndarray
+        A samples x players matrix with the court index of each player in each sample
+    """
+    n_players = len(level_codes)
+    n_courts = distributions.shape[1]
 
-    players_per_court = {p: [] for p in range(n_courts)}
-    open_courts = [p for p in range(n_courts)]
-    full_courts = []
+    orders = np.argsort(rng.random((n_samples, n_players)), axis=1)
+    ordered_level_codes = level_codes[orders]
+    # laid out players x samples so that each step of the walk reads contiguous memory
+    position_level_codes = np.ascontiguousarray(ordered_level_codes.T)
+    draws = _draw_courts(
+        position_level_codes.ravel(), distributions, rng.random(n_samples * n_players)
+    ).reshape(n_players, n_samples)
 
-    players_df = players_df.sample(frac=1).reset_index(drop=True)
+    remaining_capacity = np.full(n_samples * n_courts, COURT_CAPACITY, dtype=np.intp)
+    sample_offsets = np.arange(n_samples) * n_courts
 
-    for row_player in players_df.iterrows():
-        player = row_player[1]
-        assigned_court = random.choices(  # noqa: S311
-            open_courts,
-            k=1,
-            weights=np.delete(distributions[player["level"]], full_courts),
-        )[0]
+    for position in range(n_players):
+        capacity_indices = sample_offsets + draws[position]
 
-        players_per_court[assigned_court].append(player["name"])
+        # draws that landed on a full court are drawn again from the open courts of their sample
+        rejected = np.flatnonzero(remaining_capacity[capacity_indices] == 0)
+        if rejected.size:
+            is_open = remaining_capacity.reshape(n_samples, n_courts)[rejected] > 0
+            cumulative_weights = np.cumsum(
+                distributions[position_level_codes[position, rejected]] * is_open, axis=1
+            )
+            targets = rng.random(rejected.size) * cumulative_weights[:, -1]
 
-        if len(players_per_court[assigned_court]) >= 4:
-            open_courts.remove(assigned_court)
-            full_courts.append(assigned_court)
+            last_open_court = n_courts - 1 - np.argmax(is_open[:, ::-1], axis=1)
+            draws[position, rejected] = np.minimum(
+                (cumulative_weights <= targets[:, np.newaxis]).sum(axis=1), last_open_court
+            )
+            capacity_indices[rejected] = sample_offsets[rejected] + draws[position, rejected]
+
+        remaining_capacity[capacity_indices] -= 1
+
+    assigned_courts = np.empty((n_samples, n_players), dtype=np.min_scalar_type(n_courts - 1))
+    np.put_along_axis(assigned_courts, orders, draws.T, axis=1)
+
+    return assigned_courts
+
+
+def new_seed() -> int:
+    """Generate a fresh random seed short enough to be written down and typed back
+
+    Returns
+    -------
+    int
+        A random 32 bits seed
+    """
+    return int(np.random.SeedSequence().generate_state(1)[0])
+
+
+def spawn_generators(
+    seed: int | np.random.SeedSequence | None, n_streams: int
+) -> list[np.random.Generator]:
+    """Create independent random generators for parallel or batched runs of the same seed
+
+    Parameters
+    ----------
+    seed : int | np.random.SeedSequence | None
+        The seed of the whole run
+    n_streams : int
+        The number of independent generators to create
+
+    Returns
+    -------
+    list[np.random.Generator]
+        One generator per stream, always the same ones for the same seed
+    """
+    if not isinstance(seed, np.random.SeedSequence):
+        seed = np.random.SeedSequence(seed)
+
+    return [np.random.default_rng(child) for child in seed.spawn(n_streams)]
+
+
+def courts_to_distribution(players: Players, assigned_courts: np.ndarray) -> dict[int, list[str]]:
+    """Convert the court index of each player into the names of the players of each court
+
+    Parameters
+    ----------
+    players : Players
+        The distributed players
+    assigned_courts : np.ndarray
+        The court index of each player, a row of `distribute_americana_batch`
+
+    Returns
+    -------
+    dict[int, list[str]]
+        The names of the players assigned to each court
+    """
+    players = PlayerRoster.from_players(players)
+
+    players_per_court = {c: [] for c in range(len(players) // COURT_CAPACITY)}
+    for name, court in zip(players.names, assigned_courts.tolist()):
+        players_per_court[court].append(name)
 
     return players_per_court
+
+
+def player_level_codes(players: Players) -> np.ndarray:
+    """Get the level code of each player, checking that they can fill complete courts
+
+    Parameters
+    ----------
+    players : Players
+        The players to distribute, must be a multiple of 4
+
+    Returns
+    -------
+    np.ndarray
+        The level code of each player
+    """
+    if not players or len(players) % COURT_CAPACITY != 0:
+        raise ValueError(f"The number of players must be a multiple of {COURT_CAPACITY}")
+
+    players = PlayerRoster.from_players(players)
+
+    return np.frombuffer(players.level_codes, dtype=np.uint8).astype(np.intp)
+
+
+@lru_cache(maxsize=PROBABILITY_TABLE_CACHE_SIZE)
+def probability_table(
+    n_courts: int,
+    americana_level: Levels,
+    probability_modification: float,
+) -> np.ndarray:
+    """Build the levels x courts matrix with the probability of each level to go to each court
+
+    The probability of a level goes linearly from the first to the last court, skewed by how far
+    the level is from the americana level. Tables are cached, use `probability_table.cache_info()`
+    to get the hits and misses and `probability_table.cache_clear()` to empty it.
+
+    Parameters
+    ----------
+    n_courts : int
+        The number of courts of the americana
+    americana_level : Levels
+        The level of the americana, players of this level have a uniform probability
+    probability_modification : float
+        How much the level of a player skews its probability towards the first or last courts
+
+    Returns
+    -------
+    np.ndarray
+        A read-only matrix indexed by level code and court
+    """
+    distributions = _court_weights(
+        np.arange(len(LEVEL_NUMBERS)), n_courts, americana_level, probability_modification
+    )
+    distributions.setflags(write=False)
+
+    return distributions
+
+
+def rating_distributions(
+    ratings: np.ndarray,
+    n_courts: int,
+    americana_level: Levels,
+    probability_modification: float,
+) -> tuple[np.ndarray, np.ndarray]:
+    """Build the court weights of each player from its continuous rating
+
+    Every player gets the same linear curve as `probability_table` at the level position of its
+    rating, e.g. a rating halfway between C+ and B gets the curve halfway between theirs. The
+    positions are rounded to 1 / RATING_POSITION_STEPS of a level and only the rounded positions
+    of the players get a row, so the table stays small however many players there are and is
+    used as a table of "levels".
+
+    Parameters
+    ----------
+    ratings : np.ndarray
+        The rating of each player
+    n_courts : int
+        The number of courts of the americana
+    americana_level : Levels
+        The level of the americana
+    probability_modification : float
+        How much the level of a player skews its probability towards the first or last courts
+
+    Returns
+    -------
+    tuple[np.ndarray, np.ndarray]
+        The code of the row of each player and the rows x courts matrix of weights
+    """
+    position_steps, level_codes = np.unique(
+        np.round(level_positions(ratings) * RATING_POSITION_STEPS), return_inverse=True
+    )
+
+    return level_codes.astype(np.intp), _court_weights(
+        position_steps / RATING_POSITION_STEPS, n_courts, americana_level, probability_modification
+    )
+
+
+def assign_courts(
+    level_codes: np.ndarray,
+    distributions: np.ndarray,
+    rng: np.random.Generator,
+) -> np.ndarray:
+    """Assign each player, in order, to a court drawn from the weights of its level
+
+    This is equivalent to drawing one player at a time from the courts that are still open, but
+    the draws are done in batches: a batch of pending players is drawn against the weights of the
+    courts open at the start of the batch and the draws are kept up to the first one that lands
+    on a court filled earlier in the same batch. Keeping a draw that avoided the full courts is
+    the same as drawing it from the open courts only, the rest of the batch is drawn again once
+    the full courts are masked out of the weights.
+
+    Parameters
+    ----------
+    level_codes : np.ndarray
+        The level code of each player, in the order in which they are assigned
+    distributions : np.ndarray
+        The levels x courts matrix of court weights
+    rng : np.random.Generator
+        Random generator used for the draws
+
+    Returns
+    -------
+    np.ndarray
+        The court index assigned to each player
+    """
+    n_players = len(level_codes)
+    n_courts = distributions.shape[1]
+
+    remaining_capacity = np.full(n_courts, COURT_CAPACITY, dtype=np.intp)
+    assigned_courts = np.empty(n_players, dtype=np.intp)
+
+    start = 0
+    batch_size = MIN_BATCH_SIZE
+    while start < n_players:
+        # only the rows of the batch are masked, a rating table can have hundreds of them
+        pending_codes, pending = np.unique(
+            level_codes[start : start + batch_size], return_inverse=True
+        )
+        live_weights = distributions[pending_codes] * (remaining_capacity > 0)
+        draws = _draw_courts(pending, live_weights, rng.random(len(pending)))
+
+        draw_order = np.argsort(draws, kind="stable")
+        sorted_draws = draws[draw_order]
+        occurrences = np.empty(len(draws), dtype=np.intp)
+        occurrences[draw_order] = np.arange(len(draws)) - np.searchsorted(
+            sorted_draws, sorted_draws
+        )
+        rejected = np.flatnonzero(occurrences >= remaining_capacity[draws])
+        accepted = rejected[0] if rejected.size else len(draws)
+        court_counts = np.bincount(draws[:accepted], minlength=n_courts)
+
+        assigned_courts[start : start + accepted] = draws[:accepted]
+        remaining_capacity -= court_counts
+
+        start += accepted
+        batch_size = max(MIN_BATCH_SIZE, 2 * accepted)
+
+    return assigned_courts
+
+
+def assign_courts_avoiding_repeats(
+    level_codes: np.ndarray,
+    distributions: np.ndarray,
+    co_occurrences: CoOccurrenceMatrix,
+    order: np.ndarray,
+    rng: np.random.Generator,
+) -> np.ndarray:
+    """Assign each player to a court drawn from its level weights, penalizing repeated groupings
+
+    Players are placed one at a time in `order`. The weight of each open court is multiplied by
+    exp(-CO_OCCURRENCE_PENALTY * penalty), where the penalty of a court is how many times the
+    player shared one with the players already placed in it. The penalties of a player are a
+    per-court vector summed with a single bincount over the courts of its placed partners, the
+    sparse row of the co-occurrence matrix, so a placement costs as much as the number of
+    partners of the player and players without any are drawn from their level weights only.
+
+    Parameters
+    ----------
+    level_codes : np.ndarray
+        The level code of each player
+    distributions : np.ndarray
+        The levels x courts matrix of court weights
+    co_occurrences : CoOccurrenceMatrix
+        How many times each pair of players recently shared a court
+    order : np.ndarray
+        The indices of the players in the order in which they are placed
+    rng : np.random.Generator
+        Random generator used for the draws
+
+    Returns
+    -------
+    np.ndarray
+        The court index assigned to each player, indexed like `level_codes`
+    """
+    if co_occurrences.n_players != len(level_codes):
+        raise ValueError("The co-occurrence matrix must have a row for each player")
+
+    n_courts = distributions.shape[1]
+
+    # unplaced players are in an extra court, dropped from the penalties
+    assigned_courts = np.full(len(level_codes), n_courts, dtype=np.intp)
+    remaining_capacity = np.full(n_courts, COURT_CAPACITY, dtype=np.intp)
+    is_open = np.ones(n_courts, dtype=bool)
+    last_open_court = n_courts - 1
+
+    for player, uniform in zip(order.tolist(), rng.random(len(order)).tolist()):
+        weights = distributions[level_codes[player]] * is_open
+
+        partners, counts = co_occurrences.partners(player)
+        if partners.size:
+            penalties = np.bincount(
+                assigned_courts[partners], weights=counts, minlength=n_courts + 1
+            )[:n_courts]
+            weights *= np.exp(-CO_OCCURRENCE_PENALTY * penalties)
+            # open courts must keep some weight however many repeats they hold
+            weights[is_open] = np.maximum(weights[is_open], MIN_PROBABILITY)
+
+        cumulative_weights = np.cumsum(weights)
+        court = min(
+            int(np.searchsorted(cumulative_weights, uniform * cumulative_weights[-1], "right")),
+            last_open_court,
+        )
+
+        assigned_courts[player] = court
+        remaining_capacity[court] -= 1
+        if remaining_capacity[court] == 0:
+            is_open[court] = False
+            if court == last_open_court and is_open.any():
+                last_open_court = int(np.flatnonzero(is_open)[-1])
+
+    return assigned_courts
+
+
+def assign_courts_exact_capacity(
+    level_codes: np.ndarray,
+    distributions: np.ndarray,
+    rng: np.random.Generator,
+) -> np.ndarray:
+    """Assign all the players at once to courts filled exactly to capacity
+
+    Every player draws a preferred court from the weights of its level and a uniform jitter
+    inside it, which is a position along the courts. Players are sorted by that position and
+    split in consecutive groups of 4, so no court is ever full when drawn and the result doesn't
+    depend on the order of the players.
+
+    Parameters
+    ----------
+    level_codes : np.ndarray
+        The level code of each player, or a samples x players matrix of them
+    distributions : np.ndarray
+        The levels x courts matrix of court weights
+    rng : np.random.Generator
+        Random generator used for the draws
+
+    Returns
+    -------
+    np.ndarray
+        The court index assigned to each player, with the same shape as `level_codes`
+    """
+    preferred_courts = _draw_courts(
+        level_codes.ravel(), distributions, rng.random(level_codes.size)
+    ).reshape(level_codes.shape)
+    positions = preferred_courts + rng.random(level_codes.shape)
+
+    position_courts = np.arange(level_codes.shape[-1]) // COURT_CAPACITY
+    assigned_courts = np.empty(level_codes.shape, dtype=np.intp)
+    np.put_along_axis(
+        assigned_courts,
+        np.argsort(positions, axis=-1),
+        np.broadcast_to(position_courts, level_codes.shape),
+        axis=-1,
+    )
+
+    return assigned_courts
+
+
+def _court_weights(
+    positions: np.ndarray,
+    n_courts: int,
+    americana_level: Levels,
+    probability_modification: float,
+) -> np.ndarray:
+    """Weight each court linearly from the first to the last one for each level position"""
+    standard_probability = 1 / n_courts
+    level_differences = (positions - LEVEL_NUMBERS[americana_level]) / 2
+
+    first_court = standard_probability + level_differences * probability_modification
+    last_court = standard_probability - level_differences * probability_modification
+    court_steps = np.linspace(0, 1, num=n_courts)
+
+    return np.maximum(
+        first_court[:, np.newaxis] + np.outer(last_court - first_court, court_steps),
+        MIN_PROBABILITY,
+    )
+
+
+def _draw_courts(level_codes: np.ndarray, weights: np.ndarray, uniforms: np.ndarray) -> np.ndarray:
+    """Draw one court per player by inverse transform sampling over the weights of its level
+
+    The cumulative weights of each row are normalized and offset by the row index, so a single
+    searchsorted over the flattened rows draws every player, however many rows the table has.
+    """
+    n_courts = weights.shape[1]
+    cumulative_weights = np.cumsum(weights, axis=1)
+    cumulative_weights /= cumulative_weights[:, -1:]
+    cumulative_weights += np.arange(len(weights))[:, np.newaxis]
+
+    # courts with no weight left at the end of a row must never be drawn, even with rounding
+    last_open_court = n_courts - 1 - np.argmax(weights[:, ::-1] > 0, axis=1)
+
+    draws = np.searchsorted(cumulative_weights.ravel(), level_codes + uniforms, side="right")
+    draws -= level_codes * n_courts
+
+    return np.minimum(draws, last_open_court[level_codes])
@@ -0,0 +1,104 @@
+import numpy as np
+
+from americanes_randomizer.constants import (
+    BASE_RATING,
+    COURT_CAPACITY,
+    LEVEL_NUMBERS,
+    RATING_PER_LEVEL,
+)
+
+
+ELO_SCALE = 400.0
+"""Rating difference at which a team is expected to win 10 times more games than the other"""
+K_FACTOR = 24.0
+PROVISIONAL_K_FACTOR = 48.0
+PROVISIONAL_MATCHES = 10
+"""Players move faster with the PROVISIONAL_K_FACTOR until they have this many rated matches"""
+
+
+def level_positions(ratings: np.ndarray) -> np.ndarray:
+    """Convert ratings to continuous level codes, e.g. 2.5 is halfway between C+ and B
+
+    Parameters
+    ----------
+    ratings : np.ndarray
+        The rating of each player
+
+    Returns
+    -------
+    np.ndarray
+        The continuous level code of each player
+    """
+    return (np.asarray(ratings, dtype=np.float64) - BASE_RATING) / RATING_PER_LEVEL
+
+
+def rating_level_codes(ratings: np.ndarray) -> np.ndarray:
+    """Get the level code closest to each rating, the level shown for a rated player
+
+    Parameters
+    ----------
+    ratings : np.ndarray
+        The rating of each player
+
+    Returns
+    -------
+    np.ndarray
+        The level code of each player
+    """
+    # rounding half up, as the CASE of the player rating view does
+    return np.clip(np.floor(level_positions(ratings) + 0.5), 0, len(LEVEL_NUMBERS) - 1).astype(
+        np.intp
+    )
+
+
+def update_ratings(
+    ratings: np.ndarray,
+    rated_matches: np.ndarray,
+    match_players: np.ndarray,
+    match_games: np.ndarray,
+) -> tuple[np.ndarray, np.ndarray]:
+    """Update the ratings of the players with the results of every match of an event at once
+
+    All the matches are rated against the ratings before the event, as an Elo rating period:
+    the rating of a team is the mean rating of its players, the expected share of games of a team
+    follows the logistic curve of the Elo system and every player gets the sum over its matches of
+    its K factor times the difference between the share of games won and the expected one.
+
+    Parameters
+    ----------
+    ratings : np.ndarray
+        The rating of each player before the event
+    rated_matches : np.ndarray
+        The number of rated matches of each player before the event
+    match_players : np.ndarray
+        A matches x 4 matrix with the player indices of each match, players 0 and 1 against 2
+        and 3
+    match_games : np.ndarray
+        A matches x 2 matrix with the games won by each team
+
+    Returns
+    -------
+    tuple[np.ndarray, np.ndarray]
+        The rating and the number of rated matches of each player after the event
+    """
+    ratings = np.asarray(ratings, dtype=np.float64)
+    rated_matches = np.asarray(rated_matches, dtype=np.int64)
+    match_players = np.asarray(match_players, dtype=np.intp).reshape(-1, COURT_CAPACITY)
+    match_games = np.asarray(match_games, dtype=np.float64).reshape(-1, 2)
+
+    team_ratings = ratings[match_players].reshape(-1, 2, 2).mean(axis=2)
+    expected_shares = 1 / (1 + 10 ** ((team_ratings[:, 1] - team_ratings[:, 0]) / ELO_SCALE))
+
+    total_games = match_games.sum(axis=1)
+    actual_shares = np.divide(
+        match_games[:, 0], total_games, out=np.full(len(match_games), 0.5), where=total_games > 0
+    )
+
+    surprises = actual_shares - expected_shares
+    player_surprises = np.concatenate([surprises, surprises, -surprises, -surprises])
+    players = match_players.T.ravel()
+
+    k_factors = np.where(rated_matches < PROVISIONAL_MATCHES, PROVISIONAL_K_FACTOR, K_FACTOR)
+    rating_changes = k_factors * np.bincount(players, player_surprises, minlength=len(ratings))
+
+    return ratings + rating_changes, rated_matches + np.bincount(players, minlength=len(ratings))
@@ -0,0 +1,161 @@
+import sys
+from array import array
+from collections.abc import Iterable, Iterator
+from typing import NamedTuple, overload
+
+from americanes_randomizer.constants import LEVEL_NUMBERS, Levels
+
+
+LEVELS_BY_NUMBER = {number: level for level, number in LEVEL_NUMBERS.items()}
+LEVEL_NUMBERS_BY_NAME = {level.name: number for level, number in LEVEL_NUMBERS.items()}
+"""Level code of each level by the name it is stored with in the database"""
+
+
+class RosterPlayer(NamedTuple):
+    """A single player of a roster, lighter than the database model
+
+    Attributes
+    ----------
+    name : str
+        The name of the player
+    level : Levels
+        The level of the player
+    """
+
+    name: str
+    level: Levels
+
+
+class PlayerRoster:
+    """Compact list of players, as parallel arrays of names and level codes
+
+    Names are interned and levels are stored as the uint8 codes of LEVEL_NUMBERS, so a roster
+    takes a fraction of the memory of the database models and its level codes can be viewed as a
+    NumPy array without copying them. Iterating or indexing it gives RosterPlayer tuples.
+
+    Parameters
+    ----------
+    names : Iterable[str], optional
+        The name of each player, by default no players
+    level_codes : Iterable[int], optional
+        The level code of each player, by default no players
+    """
+
+    __slots__ = ("names", "level_codes")
+
+    def __init__(self, names: Iterable[str] = (), level_codes: Iterable[int] = ()):
+        self.names = [sys.intern(name) for name in names]
+        self.level_codes = array("B", level_codes)
+
+        if len(self.names) != len(self.level_codes):
+            raise ValueError("A roster needs one level code for each name")
+
+    @classmethod
+    def from_players(cls, players: "Iterable[RosterPlayer] | PlayerRoster") -> "PlayerRoster":
+        """Build a roster from any players with a name and a level, e.g. database models
+
+        Parameters
+        ----------
+        players : Iterable[RosterPlayer] | PlayerRoster
+            The players, rosters are returned as they are
+
+        Returns
+        -------
+        PlayerRoster
+            The roster of the players
+        """
+        if isinstance(players, PlayerRoster):
+            return players
+
+        players = list(players)
+
+        return cls((p.name for p in players), (LEVEL_NUMBERS[p.level] for p in players))
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[tuple[str, str]]) -> "PlayerRoster":
+        """Build a roster from the rows of a `SELECT name, level` on the player table
+
+        Parameters
+        ----------
+        rows : Iterable[tuple[str, str]]
+            The name of each player and the name of its level, as stored in the database
+
+        Returns
+        -------
+        PlayerRoster
+            The roster of the players
+        """
+        rows = list(rows)
+
+        return cls((name for name, _ in rows), (LEVEL_NUMBERS_BY_NAME[level] for _, level in rows))
+
+    def __len__(self) -> int:
+        """Get the number of players"""
+        return len(self.names)
+
+    def __iter__(self) -> Iterator[RosterPlayer]:
+        """Iterate over the players"""
+        for name, level_code in zip(self.names, self.level_codes):
+            yield RosterPlayer(name, LEVELS_BY_NUMBER[level_code])
+
+    @overload
+    def __getitem__(self, index: int) -> RosterPlayer: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> "PlayerRoster": ...
+
+    def __getitem__(self, index):
+        """Get a player or a slice of the roster"""
+        if isinstance(index, slice):
+            return self._from_arrays(self.names[index], self.level_codes[index])
+
+        return RosterPlayer(self.names[index], LEVELS_BY_NUMBER[self.level_codes[index]])
+
+    def __eq__(self, other) -> bool:
+        """Check whether two rosters have the same players in the same order"""
+        if not isinstance(other, PlayerRoster):
+            return NotImplemented
+
+        return self.names == other.names and self.level_codes == other.level_codes
+
+    def __repr__(self) -> str:
+        """Show the size of the roster"""
+        return f"PlayerRoster({len(self)} players)"
+
+    def take(self, indices: Iterable[int]) -> "PlayerRoster":
+        """Get a roster with the players at the given positions
+
+        Parameters
+        ----------
+        indices : Iterable[int]
+            The position of each player to take
+
+        Returns
+        -------
+        PlayerRoster
+            The roster of the taken players, in the order of `indices`
+        """
+        indices = list(indices)
+
+        return self._from_arrays(
+            [self.names[i] for i in indices], array("B", (self.level_codes[i] for i in indices))
+        )
+
+    def levels(self) -> list[Levels]:
+        """Get the level of each player
+
+        Returns
+        -------
+        list[Levels]
+            The level of each player
+        """
+        return [LEVELS_BY_NUMBER[level_code] for level_code in self.level_codes]
+
+    @classmethod
+    def _from_arrays(cls, names: list[str], level_codes: array) -> "PlayerRoster":
+        """Wrap already interned names and level codes without copying them"""
+        roster = cls.__new__(cls)
+        roster.names = names
+        roster.level_codes = level_codes
+
+        return roster
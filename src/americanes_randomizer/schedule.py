@@ -0,0 +1,327 @@
+import numpy as np
+
+from americanes_randomizer.constants import COURT_CAPACITY, Levels
+from americanes_randomizer.instrumentation import timed
+from americanes_randomizer.randomize_logic import (
+    Players,
+    Seed,
+    assign_courts,
+    player_level_codes,
+    probability_table,
+    rating_distributions,
+)
+from americanes_randomizer.ratings import level_positions, rating_level_codes
+from americanes_randomizer.roster import PlayerRoster
+from americanes_randomizer.scoring import target_court_levels
+
+
+PARTNER_REPEAT_COST = 10.0
+OPPONENT_REPEAT_COST = 2.0
+LEVEL_BALANCE_COST = 1.0
+TEAM_BALANCE_COST = 0.5
+"""Weights of the cost of a court: repeated partners and opponents, counted once per previous
+time they played together, the level score of `scoring.score_distributions` and the squared level
+difference between the two teams"""
+LOCAL_SEARCH_RESTARTS = 8
+"""Random kicks given to each round once its local search gets stuck"""
+
+PAIR_POSITIONS = np.array([(0, 1), (2, 3), (0, 2), (1, 3), (0, 3), (1, 2)])
+"""The six pairs of positions of a court, pairs 2k and 2k + 1 are the teams of the pairing k"""
+PAIRING_ORDERS = np.array([(0, 1, 2, 3), (0, 2, 1, 3), (0, 3, 1, 2)])
+"""The positions of a court reordered so that each pairing plays 0 and 1 against 2 and 3"""
+
+
+@timed
+def schedule_americana(
+    players: Players,
+    n_rounds: int,
+    probability_modification: float,
+    americana_level: Levels,
+    seed: Seed = None,
+    first_round: dict[int, list[str]] | None = None,
+    ratings: np.ndarray | None = None,
+) -> list[dict[int, list[str]]]:
+    """Generate every round of an americana, rotating partners and opponents
+
+    See `schedule_rounds`.
+
+    Parameters
+    ----------
+    players : Players
+        The players of the americana, must be a multiple of 4
+    n_rounds : int
+        The number of rounds
+    probability_modification : float
+        How much the level of a player skews its probability towards the first or last courts
+    americana_level : Levels
+        The level of the americana
+    seed : Seed, optional
+        Seed or random generator used for the whole schedule, by default None
+    first_round : dict[int, list[str]] | None, optional
+        The courts of the first round, e.g. the output of `distribute_americana`, by default they
+        are drawn like the courts of the other rounds
+    ratings : np.ndarray | None, optional
+        The continuous rating of each player, used instead of its level, by default None
+
+    Returns
+    -------
+    list[dict[int, list[str]]]
+        The names of the players of each court in each round, the first two play against the
+        last two
+    """
+    players = PlayerRoster.from_players(players)
+
+    first_round_courts = None
+    if first_round is not None:
+        player_indices = {name: i for i, name in enumerate(players.names)}
+        first_round_courts = np.full(len(players), -1, dtype=np.intp)
+        for court, names in first_round.items():
+            for name in names:
+                first_round_courts[player_indices[name]] = court
+
+        if (first_round_courts < 0).any() or (
+            np.bincount(first_round_courts) != COURT_CAPACITY
+        ).any():
+            raise ValueError("The first round must have every player once, 4 in each court")
+
+    rounds = schedule_rounds(
+        player_level_codes(players),
+        n_rounds,
+        probability_modification,
+        americana_level,
+        seed,
+        first_round_courts,
+        ratings,
+    )
+
+    return [
+        {court: [players.names[i] for i in court_players] for court, court_players in enumerate(r)}
+        for r in rounds.tolist()
+    ]
+
+
+def schedule_rounds(
+    level_codes: np.ndarray,
+    n_rounds: int,
+    probability_modification: float,
+    americana_level: Levels,
+    seed: Seed = None,
+    first_round_courts: np.ndarray | None = None,
+    ratings: np.ndarray | None = None,
+) -> np.ndarray:
+    """Generate every round of an americana as the positions of the players in each court
+
+    The courts of each round start as a draw from the same probability tables as
+    `distribute_americana` and are then improved by a local search that swaps players between
+    courts, kicked out of its local minima LOCAL_SEARCH_RESTARTS times. The cost of a court adds
+    up how many times its partners and its opponents already played together in the previous
+    rounds, its level score and the level difference between its teams, always with the best of
+    the three ways of pairing its players. The partner and opponent counts are pair co-occurrence
+    matrices updated after every round, and only the swaps touching the courts changed by the
+    last move are evaluated again.
+
+    Parameters
+    ----------
+    level_codes : np.ndarray
+        The level code of each player
+    n_rounds : int
+        The number of rounds
+    probability_modification : float
+        How much the level of a player skews its probability towards the first or last courts
+    americana_level : Levels
+        The level of the americana
+    seed : Seed, optional
+        Seed or random generator used for the whole schedule, by default None
+    first_round_courts : np.ndarray | None, optional
+        The court index of each player in the first round, only its pairings are chosen, by
+        default they are drawn like the courts of the other rounds
+    ratings : np.ndarray | None, optional
+        The continuous rating of each player, used instead of its level to draw the courts and
+        to balance them, by default None
+
+    Returns
+    -------
+    np.ndarray
+        A rounds x courts x 4 array with the player indices of each court, the players in
+        positions 0 and 1 play against the players in positions 2 and 3
+    """
+    n_players = len(level_codes)
+    n_courts = n_players // COURT_CAPACITY
+
+    if ratings is not None:
+        levels = level_positions(ratings)
+        target_levels = target_court_levels(
+            rating_level_codes(ratings), americana_level, probability_modification
+        )
+        level_codes, distributions = rating_distributions(
+            ratings, n_courts, americana_level, probability_modification
+        )
+    else:
+        levels = level_codes.astype(np.float64)
+        target_levels = target_court_levels(level_codes, americana_level, probability_modification)
+        distributions = probability_table(n_courts, americana_level, probability_modification)
+
+    rng = np.random.default_rng(seed)
+    costs = _ScheduleCosts(levels, target_levels)
+
+    rounds = np.empty((n_rounds, n_courts, COURT_CAPACITY), dtype=np.intp)
+    for round_index in range(n_rounds):
+        if round_index == 0 and first_round_courts is not None:
+            assigned_courts = np.asarray(first_round_courts)
+        else:
+            order = rng.permutation(n_players)
+            assigned_courts = np.empty(n_players, dtype=np.intp)
+            assigned_courts[order] = assign_courts(level_codes[order], distributions, rng)
+
+        courts = np.argsort(assigned_courts, kind="stable").reshape(n_courts, COURT_CAPACITY)
+        if round_index > 0:
+            courts = _improve_round(courts, costs, rng)
+
+        _, pairings = costs.court_costs(courts, np.arange(n_courts))
+        rounds[round_index] = np.take_along_axis(courts, PAIRING_ORDERS[pairings], axis=1)
+        costs.add_round(rounds[round_index])
+
+    return rounds
+
+
+class _ScheduleCosts:
+    """Pair co-occurrence counts of the rounds scheduled so far and the cost of courts"""
+
+    def __init__(self, levels: np.ndarray, target_levels: np.ndarray):
+        self.levels = levels
+        self.target_levels = target_levels
+
+        n_players = len(levels)
+        self.partner_counts = np.zeros((n_players, n_players))
+        self.opponent_counts = np.zeros((n_players, n_players))
+
+    def add_round(self, courts: np.ndarray):
+        """Count the partners and opponents of a round, players 0 and 1 against 2 and 3"""
+        for counts, pair_positions in (
+            (self.partner_counts, PAIR_POSITIONS[:2]),
+            (self.opponent_counts, PAIR_POSITIONS[2:]),
+        ):
+            first, second = courts[:, pair_positions[:, 0]], courts[:, pair_positions[:, 1]]
+            counts[first, second] += 1
+            counts[second, first] += 1
+
+    def court_costs(
+        self, courts: np.ndarray, court_indices: np.ndarray
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """Get the cost of some courts of 4 players and the index of their best pairing"""
+        levels = self.levels[courts]
+        mean_levels = levels.mean(axis=1)
+        level_costs = LEVEL_BALANCE_COST * (
+            ((levels - mean_levels[:, np.newaxis]) ** 2).mean(axis=1)
+            + (mean_levels - self.target_levels[court_indices]) ** 2
+        )
+
+        first, second = courts[:, PAIR_POSITIONS[:, 0]], courts[:, PAIR_POSITIONS[:, 1]]
+        partners = self.partner_counts[first, second]
+        opponents = self.opponent_counts[first, second]
+        team_levels = levels[:, PAIR_POSITIONS[:, 0]] + levels[:, PAIR_POSITIONS[:, 1]]
+
+        # every pair not playing together in a pairing plays against each other
+        pairing_costs = (
+            PARTNER_REPEAT_COST * (partners[:, 0::2] + partners[:, 1::2])
+            + OPPONENT_REPEAT_COST
+            * (opponents.sum(axis=1, keepdims=True) - opponents[:, 0::2] - opponents[:, 1::2])
+            + TEAM_BALANCE_COST * (team_levels[:, 0::2] - team_levels[:, 1::2]) ** 2
+        )
+        pairings = pairing_costs.argmin(axis=1)
+
+        return level_costs + pairing_costs[np.arange(len(courts)), pairings], pairings
+
+
+def _improve_round(
+    courts: np.ndarray, costs: _ScheduleCosts, rng: np.random.Generator
+) -> np.ndarray:
+    """Lower the cost of a round swapping players between courts, with random restarts"""
+    n_courts = len(courts)
+    n_players = courts.size
+    first_players, second_players = np.triu_indices(n_players, k=1)
+
+    # a single court has no other court to kick players to, the local search is all there is
+    n_restarts = LOCAL_SEARCH_RESTARTS if n_courts > 1 else 0
+
+    best_courts = courts.copy()
+    best_cost = np.inf
+    for restart in range(n_restarts + 1):
+        if restart > 0:
+            courts = best_courts.copy()
+            for _ in range(max(2, n_courts // 2)):
+                first_court, second_court = rng.choice(n_courts, size=2, replace=False)
+                first_position, second_position = rng.integers(COURT_CAPACITY, size=2)
+                (
+                    courts[first_court, first_position],
+                    courts[second_court, second_position],
+                ) = (
+                    courts[second_court, second_position],
+                    courts[first_court, first_position],
+                )
+
+        courts, cost = _local_search(courts, costs, first_players, second_players)
+        if cost < best_cost:
+            best_courts, best_cost = courts, cost
+
+    return best_courts
+
+
+def _local_search(
+    courts: np.ndarray,
+    costs: _ScheduleCosts,
+    first_players: np.ndarray,
+    second_players: np.ndarray,
+) -> tuple[np.ndarray, float]:
+    """Apply the best swap of two players of different courts until none lowers the cost"""
+    courts = courts.copy()
+    n_courts = len(courts)
+    court_indices = np.arange(n_courts)
+    court_costs, _ = costs.court_costs(courts, court_indices)
+
+    player_courts = np.empty(courts.size, dtype=np.intp)
+    player_positions = np.empty(courts.size, dtype=np.intp)
+    player_courts[courts] = court_indices[:, np.newaxis]
+    player_positions[courts] = np.arange(COURT_CAPACITY)
+
+    deltas = np.empty(len(first_players))
+    changed = np.ones(len(first_players), dtype=bool)
+    while True:
+        first = first_players[changed]
+        second = second_players[changed]
+        first_courts = player_courts[first]
+        second_courts = player_courts[second]
+
+        swapped_first = courts[first_courts]
+        swapped_first[np.arange(len(first)), player_positions[first]] = second
+        swapped_second = courts[second_courts]
+        swapped_second[np.arange(len(second)), player_positions[second]] = first
+
+        deltas[changed] = np.where(
+            first_courts == second_courts,
+            np.inf,
+            costs.court_costs(swapped_first, first_courts)[0]
+            + costs.court_costs(swapped_second, second_courts)[0]
+            - court_costs[first_courts]
+            - court_costs[second_courts],
+        )
+
+        best = deltas.argmin()
+        if deltas[best] >= -1e-9:
+            return courts, court_costs.sum()
+
+        first, second = first_players[best], second_players[best]
+        first_court, second_court = player_courts[first], player_courts[second]
+        first_position, second_position = player_positions[first], player_positions[second]
+
+        courts[first_court, first_position] = second
+        courts[second_court, second_position] = first
+        player_courts[first], player_courts[second] = second_court, first_court
+        player_positions[first], player_positions[second] = second_position, first_position
+
+        moved_courts = np.array([first_court, second_court])
+        court_costs[moved_courts], _ = costs.court_costs(courts[moved_courts], moved_courts)
+
+        changed = np.isin(player_courts[first_players], moved_courts) | np.isin(
+            player_courts[second_players], moved_courts
+        )
@@ -1,4 +1,4 @@
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, model_validator
 
 from americanes_randomizer.constants import Levels
 
@@ -54,3 +54,90 @@ class DeletePlayer(BaseModel):
     """
 
     name: str = Field(..., min_length=3, max_length=50)
+
+
+class CreateMatchResult(BaseModel):
+    """Pydantic model to record the result of a match
+
+    Attributes
+    ----------
+    event : str
+        The americana the match was played in, min length 1, max length 100
+    round : int
+        The round of the match, starting at 1
+    court : int
+        The court of the match, starting at 1
+    player_1, player_2 : str
+        The names of the players of the first team
+    player_3, player_4 : str
+        The names of the players of the second team, all four must be different
+    games_1, games_2 : int
+        The games won by each team, min 0
+    """
+
+    event: str = Field(..., min_length=1, max_length=100)
+    round: int = Field(..., ge=1)
+    court: int = Field(..., ge=1)
+    player_1: str
+    player_2: str
+    player_3: str
+    player_4: str
+    games_1: int = Field(..., ge=0)
+    games_2: int = Field(..., ge=0)
+
+    @model_validator(mode="after")
+    def check_different_players(self) -> "CreateMatchResult":
+        """Check that no player is in the match twice"""
+        if len({self.player_1, self.player_2, self.player_3, self.player_4}) != 4:
+            raise ValueError("A match needs four different players")
+
+        return self
+
+
+class ImportRowError(BaseModel):
+    """Pydantic model for a row that couldn't be imported
+
+    Attributes
+    ----------
+    row : int
+        The number of the row in the imported file, starting at 1
+    error : str
+        Why the row couldn't be imported
+    """
+
+    row: int
+    error: str
+
+
+class ImportReport(BaseModel):
+    """Pydantic model with the result of importing players
+
+    Attributes
+    ----------
+    imported : int
+        The number of players created or updated
+    errors : list[ImportRowError]
+        The rows that couldn't be imported
+    """
+
+    imported: int = 0
+    errors: list[ImportRowError] = []
+
+
+class RatingReport(BaseModel):
+    """Pydantic model with the result of rating the pending match results
+
+    Attributes
+    ----------
+    rated : int
+        The number of rated matches
+    skipped : int
+        The number of results left pending because some of their players are no longer in the
+        database, they are rated once the players are added back
+    missing_players : list[str]
+        The players of the skipped results that are not in the database
+    """
+
+    rated: int = 0
+    skipped: int = 0
+    missing_players: list[str] = []
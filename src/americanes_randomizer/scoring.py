@@ -0,0 +1,159 @@
+import numpy as np
+
+from americanes_randomizer.constants import COURT_CAPACITY, LEVEL_NUMBERS, Levels
+from americanes_randomizer.randomize_logic import player_level_codes, probability_table
+from americanes_randomizer.roster import PlayerRoster
+
+
+SCORING_CHUNK_SIZE = 2048
+
+
+def target_court_levels(
+    level_codes: np.ndarray | PlayerRoster,
+    americana_level: Levels,
+    probability_modification: float,
+) -> np.ndarray:
+    """Get the mean level expected in each court according to the probability tables
+
+    Parameters
+    ----------
+    level_codes : np.ndarray | PlayerRoster
+        The level code of each player, or the roster of the players
+    americana_level : Levels
+        The level of the americana
+    probability_modification : float
+        The probability modification used to distribute the players
+
+    Returns
+    -------
+    np.ndarray
+        The expected mean level of each court
+    """
+    level_codes = _as_level_codes(level_codes)
+    n_courts = len(level_codes) // COURT_CAPACITY
+    distributions = probability_table(n_courts, americana_level, probability_modification)
+
+    level_counts = np.bincount(level_codes, minlength=len(LEVEL_NUMBERS))
+    level_weights = level_counts[:, np.newaxis] * distributions
+
+    return np.arange(len(LEVEL_NUMBERS)) @ level_weights / level_weights.sum(axis=0)
+
+
+def score_distributions(
+    level_codes: np.ndarray | PlayerRoster,
+    assigned_courts: np.ndarray,
+    americana_level: Levels,
+    probability_modification: float,
+) -> np.ndarray:
+    """Score how fair some distributions are, the lower the better
+
+    The score of a distribution is the mean of the level variance inside each court plus the mean
+    squared distance between the mean level of each court and its target level.
+
+    Parameters
+    ----------
+    level_codes : np.ndarray | PlayerRoster
+        The level code of each player, or the roster of the players
+    assigned_courts : np.ndarray
+        The court index of each player, or a samples x players matrix of them
+    americana_level : Levels
+        The level of the americana
+    probability_modification : float
+        The probability modification used to distribute the players
+
+    Returns
+    -------
+    np.ndarray
+        The score of each distribution
+    """
+    level_codes = _as_level_codes(level_codes)
+    assigned_courts = np.atleast_2d(assigned_courts)
+    n_samples, n_players = assigned_courts.shape
+    n_courts = n_players // COURT_CAPACITY
+
+    court_indices = (np.arange(n_samples)[:, np.newaxis] * n_courts + assigned_courts).ravel()
+    sample_levels = np.broadcast_to(level_codes, assigned_courts.shape).ravel()
+
+    court_level_sums = np.bincount(court_indices, sample_levels, minlength=n_samples * n_courts)
+    court_square_sums = np.bincount(court_indices, sample_levels**2, minlength=n_samples * n_courts)
+
+    court_means = court_level_sums.reshape(n_samples, n_courts) / COURT_CAPACITY
+    court_variances = (
+        court_square_sums.reshape(n_samples, n_courts) / COURT_CAPACITY - court_means**2
+    )
+
+    target_levels = target_court_levels(level_codes, americana_level, probability_modification)
+
+    return court_variances.mean(axis=1) + ((court_means - target_levels) ** 2).mean(axis=1)
+
+
+def select_best_distributions(
+    level_codes: np.ndarray | PlayerRoster,
+    candidates: np.ndarray,
+    americana_level: Levels,
+    probability_modification: float,
+    k: int = 1,
+    threshold: float | None = None,
+) -> tuple[np.ndarray, np.ndarray]:
+    """Select the best scored distributions among many candidates
+
+    Candidates are scored in chunks, if a threshold is given the scoring stops as soon as `k`
+    candidates with a score lower or equal to it have been found.
+
+    Parameters
+    ----------
+    level_codes : np.ndarray | PlayerRoster
+        The level code of each player, or the roster of the players
+    candidates : np.ndarray
+        A samples x players matrix with the court index of each player in each candidate
+    americana_level : Levels
+        The level of the americana
+    probability_modification : float
+        The probability modification used to distribute the players
+    k : int, optional
+        The number of distributions to keep, by default 1
+    threshold : float | None, optional
+        Score good enough to stop looking for better candidates, by default None
+
+    Returns
+    -------
+    tuple[np.ndarray, np.ndarray]
+        The index of the best candidates, best first, and their scores
+
+    Raises
+    ------
+    ValueError
+        If `k` is lower than 1 or there are no candidates
+    """
+    if k < 1:
+        raise ValueError(f"At least 1 distribution must be selected, got k={k}")
+    if len(candidates) == 0:
+        raise ValueError("There are no candidate distributions to select from")
+
+    level_codes = _as_level_codes(level_codes)
+    scores = np.full(len(candidates), np.inf)
+
+    for start in range(0, len(candidates), SCORING_CHUNK_SIZE):
+        scores[start : start + SCORING_CHUNK_SIZE] = score_distributions(
+            level_codes,
+            candidates[start : start + SCORING_CHUNK_SIZE],
+            americana_level,
+            probability_modification,
+        )
+
+        if threshold is not None and np.count_nonzero(scores <= threshold) >= k:
+            break
+
+    k = min(k, len(candidates))
+    best = np.argpartition(scores, k - 1)[:k]
+    best = best[np.argsort(scores[best], kind="stable")]
+
+    return best, scores[best]
+
+
+def _as_level_codes(level_codes: np.ndarray | PlayerRoster) -> np.ndarray:
+    """Get the level codes of a roster, arrays are returned as they are"""
+    if isinstance(level_codes, PlayerRoster):
+        return player_level_codes(level_codes)
+
+    return np.asarray(level_codes)
@@ -0,0 +1,228 @@
+import queue
+import threading
+import tkinter as tk
+from collections.abc import Callable
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any
+
+from sqlalchemy.orm import Session, sessionmaker
+
+
+TASK_WORKERS = 2
+TASK_POLL_INTERVAL_MS = 30
+
+
+class Task:
+    """A function submitted to a TaskExecutor, whose result is delivered in the Tk main loop
+
+    Parameters
+    ----------
+    description : str
+        What the task does, shown while it runs
+    on_done : Callable[[Any], None] | None
+        Called in the main loop with the result of the task
+    on_error : Callable[[Exception], None] | None
+        Called in the main loop with the exception raised by the task
+    """
+
+    def __init__(
+        self,
+        description: str,
+        on_done: Callable[[Any], None] | None,
+        on_error: Callable[[Exception], None] | None,
+    ):
+        self.description = description
+        self.on_done = on_done
+        self.on_error = on_error
+        self.future: Future | None = None
+
+        self._is_cancelled = threading.Event()
+
+    @property
+    def is_cancelled(self) -> bool:
+        """Whether the task was cancelled, long tasks can check it to stop early"""
+        return self._is_cancelled.is_set()
+
+    def cancel(self):
+        """Cancel the task, dropping its result if it already started"""
+        self._is_cancelled.set()
+        if self.future is not None:
+            self.future.cancel()
+
+
+class TaskExecutor:
+    """Run database queries and generations in worker threads without blocking the Tk main loop
+
+    Results are put in a queue that the main loop polls with `after` while there are tasks
+    running, so the callbacks of the tasks can safely update the widgets. Tasks that use the
+    database get a session of their own worker thread, never the one of the main loop.
+
+    Parameters
+    ----------
+    root : tk.Misc
+        Any widget of the app, used to poll the results
+    session_factory : sessionmaker
+        Factory of the sessions of the worker threads
+    on_busy : Callable[[list[str]], None] | None, optional
+        Called in the main loop with the descriptions of the running tasks whenever they change,
+        by default None
+    n_workers : int, optional
+        The number of worker threads, by default TASK_WORKERS
+    """
+
+    def __init__(
+        self,
+        root: tk.Misc,
+        session_factory: sessionmaker,
+        on_busy: Callable[[list[str]], None] | None = None,
+        n_workers: int = TASK_WORKERS,
+    ):
+        self.root = root
+        self.session_factory = session_factory
+        self.on_busy = on_busy
+
+        self._executor = ThreadPoolExecutor(n_workers, thread_name_prefix="americanes-task")
+        self._results: queue.SimpleQueue = queue.SimpleQueue()
+        self._running_tasks: list[Task] = []
+        self._keyed_tasks: dict[str, Task] = {}
+        self._worker_state = threading.local()
+        self._worker_sessions: list[Session] = []
+        self._poll_id: str | None = None
+
+    def submit(
+        self,
+        function: Callable,
+        *args,
+        description: str = "Working",
+        on_done: Callable[[Any], None] | None = None,
+        on_error: Callable[[Exception], None] | None = None,
+        key: str | None = None,
+        uses_db: bool = False,
+        **kwargs,
+    ) -> Task:
+        """Run a function in a worker thread
+
+        Parameters
+        ----------
+        function : Callable
+            The function to run
+        *args
+            The positional arguments of the function
+        description : str, optional
+            What the task does, shown while it runs, by default "Working"
+        on_done : Callable[[Any], None] | None, optional
+            Called in the main loop with the result of the function, by default None
+        on_error : Callable[[Exception], None] | None, optional
+            Called in the main loop with the exception raised by the function, by default None
+        key : str | None, optional
+            Tasks with the same key supersede each other, submitting one cancels the previous,
+            by default None
+        uses_db : bool, optional
+            Whether to pass the session of the worker thread as the `db` argument, by default
+            False
+        **kwargs
+            The keyword arguments of the function
+
+        Returns
+        -------
+        Task
+            The submitted task
+        """
+        if key is not None and (superseded_task := self._keyed_tasks.get(key)) is not None:
+            superseded_task.cancel()
+
+        task = Task(description, on_done, on_error)
+        if key is not None:
+            self._keyed_tasks[key] = task
+
+        task.future = self._executor.submit(self._run, task, function, args, kwargs, uses_db)
+
+        self._running_tasks.append(task)
+        self._notify_busy()
+        self._schedule_poll()
+
+        return task
+
+    def shutdown(self):
+        """Cancel the pending tasks, wait for the running ones and close the worker sessions"""
+        for task in self._running_tasks:
+            task.cancel()
+
+        self._executor.shutdown(wait=True, cancel_futures=True)
+
+        for session in self._worker_sessions:
+            session.close()
+
+        if self._poll_id is not None:
+            try:
+                self.root.after_cancel(self._poll_id)
+            except tk.TclError:
+                # the window is already destroyed, and its pending callbacks with it
+                pass
+            self._poll_id = None
+
+    def _run(self, task: Task, function: Callable, args: tuple, kwargs: dict, uses_db: bool):
+        """Run a task in a worker thread and queue its outcome for the main loop"""
+        if task.is_cancelled:
+            self._results.put((task, None, None))
+            return
+
+        try:
+            if uses_db:
+                kwargs = {**kwargs, "db": self._worker_session()}
+
+            self._results.put((task, function(*args, **kwargs), None))
+        except Exception as e:
+            if uses_db:
+                self._worker_session().rollback()
+
+            self._results.put((task, None, e))
+
+    def _worker_session(self) -> Session:
+        """Get the session of the current worker thread, creating it on its first use"""
+        if (session := getattr(self._worker_state, "session", None)) is None:
+            session = self._worker_state.session = self.session_factory()
+            self._worker_sessions.append(session)
+
+        return session
+
+    def _schedule_poll(self):
+        """Poll the results from the main loop while there are running tasks"""
+        if self._poll_id is None:
+            self._poll_id = self.root.after(TASK_POLL_INTERVAL_MS, self._poll)
+
+    def _poll(self):
+        """Deliver the finished tasks to their callbacks, in the main loop"""
+        self._poll_id = None
+
+        # tasks cancelled before they started never reach the queue
+        finished_tasks = [task for task in self._running_tasks if task.future.cancelled()]
+        while True:
+            try:
+                task, result, error = self._results.get_nowait()
+            except queue.Empty:
+                break
+
+            finished_tasks.append(task)
+            if task.is_cancelled:
+                continue
+
+            if error is None and task.on_done is not None:
+                task.on_done(result)
+            elif error is not None and task.on_error is not None:
+                task.on_error(error)
+
+        if finished_tasks:
+            self._running_tasks = [t for t in self._running_tasks if t not in finished_tasks]
+            self._keyed_tasks = {
+                key: t for key, t in self._keyed_tasks.items() if t not in finished_tasks
+            }
+            self._notify_busy()
+
+        if self._running_tasks:
+            self._schedule_poll()
+
+    def _notify_busy(self):
+        """Tell the app which tasks are running"""
+        if self.on_busy is not None:
+            self.on_busy([task.description for task in self._running_tasks])
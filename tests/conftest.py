@@ -0,0 +1,31 @@
+import logging
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from americanes_randomizer.db.session import create_tables
+
+
+@pytest.fixture(autouse=True)
+def quiet_timings():
+    """Silence the timing logs of the timed functions"""
+    logging.disable(logging.INFO)
+    yield
+    logging.disable(logging.NOTSET)
+
+
+@pytest.fixture
+def engine():
+    """In-memory SQLite database with the tables, the player search index and the views"""
+    engine = create_engine("sqlite://")
+    create_tables(engine)
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def db(engine):
+    """Session of the in-memory database"""
+    with sessionmaker(bind=engine)() as db:
+        yield db
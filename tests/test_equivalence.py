@@ -0,0 +1,31 @@
+from americanes_randomizer import benchmark
+from americanes_randomizer.benchmark import check_equivalence
+
+
+PLAYER_COUNTS = (8, 16)
+N_RUNS = 300
+BIASED_PLAYER_COUNTS = (16,)
+"""With 8 players in a level D americana the players above D all prefer the first court, which
+fills up and leaves nearly the same draw whatever the modifier, so it needs more courts"""
+
+
+def test_distribute_americana_matches_legacy():
+    results = check_equivalence(PLAYER_COUNTS, N_RUNS)
+
+    assert len(results) == len(PLAYER_COUNTS) * len(benchmark.AMERICANA_LEVELS) * len(
+        benchmark.PROBABILITY_MODIFICATIONS
+    )
+    assert [result for result in results if not result["is_equivalent"]] == []
+
+
+def test_check_equivalence_detects_a_different_distribution(monkeypatch):
+    distribute_americana = benchmark.distribute_americana
+
+    def distribute_uniformly(players, probability_modification, americana_level, **kwargs):
+        return distribute_americana(players, 0.0, americana_level, **kwargs)
+
+    monkeypatch.setattr(benchmark, "distribute_americana", distribute_uniformly)
+    results = check_equivalence(BIASED_PLAYER_COUNTS, N_RUNS)
+
+    for result in results:
+        assert result["is_equivalent"] == (result["probability_modification"] == 0.0), result
@@ -0,0 +1,109 @@
+from sqlalchemy import select
+
+from americanes_randomizer.constants import Levels
+from americanes_randomizer.db import controller
+from americanes_randomizer.db.history import (
+    recent_co_occurrences,
+    recent_teammates,
+    save_americana,
+)
+from americanes_randomizer.db.models import (
+    AmericanaEvent,
+    AmericanaRound,
+    CourtAssignment,
+    HistoryPlayer,
+)
+from americanes_randomizer.schemas import CreatePlayer
+
+
+NAMES = [f"Player {i}" for i in range(8)]
+FIRST_AMERICANA = [
+    {0: NAMES[:4], 1: NAMES[4:]},
+    {0: [NAMES[0], NAMES[1], NAMES[4], NAMES[5]], 1: [NAMES[2], NAMES[3], NAMES[6], NAMES[7]]},
+]
+SECOND_AMERICANA = [{0: [NAMES[0], NAMES[4], NAMES[2], NAMES[6]], 1: NAMES[1::2]}]
+
+
+def save(rounds, db, **kwargs) -> int:
+    return save_americana(rounds, Levels.B, 0.5, 42, db, **kwargs)
+
+
+def load_rounds(event_id: int, db) -> list[dict[int, list[str]]]:
+    rounds = []
+    for number, court, name in db.execute(
+        select(AmericanaRound.number, CourtAssignment.court, HistoryPlayer.name)
+        .join(CourtAssignment, CourtAssignment.round_id == AmericanaRound.id)
+        .join(HistoryPlayer, HistoryPlayer.id == CourtAssignment.player_id)
+        .where(AmericanaRound.event_id == event_id)
+        .order_by(AmericanaRound.number, CourtAssignment.court, CourtAssignment.position)
+    ):
+        if len(rounds) < number:
+            rounds.append({})
+        rounds[-1].setdefault(court, []).append(name)
+
+    return rounds
+
+
+def test_save_americana_round_trip(db):
+    event_id = save(FIRST_AMERICANA, db, best_of=3, use_ratings=True, avoid_repeats=True)
+
+    event = db.get(AmericanaEvent, event_id)
+    assert (
+        event.americana_level,
+        event.probability_modification,
+        event.seed,
+        event.best_of,
+        event.use_ratings,
+        event.avoid_repeats,
+    ) == (Levels.B, 0.5, 42, 3, True, True)
+    assert load_rounds(event_id, db) == FIRST_AMERICANA
+    assert save(SECOND_AMERICANA, db) == event_id + 1
+    assert db.get(AmericanaEvent, event_id + 1).avoid_repeats is False
+
+
+def test_recent_teammates(db):
+    save(FIRST_AMERICANA, db)
+    save(SECOND_AMERICANA, db)
+
+    assert recent_teammates(NAMES[0], 2, db) == {
+        NAMES[1]: 2,
+        NAMES[2]: 2,
+        NAMES[3]: 1,
+        NAMES[4]: 2,
+        NAMES[5]: 1,
+        NAMES[6]: 1,
+    }
+    assert recent_teammates(NAMES[0], 1, db) == {NAMES[2]: 1, NAMES[4]: 1, NAMES[6]: 1}
+    assert recent_teammates("Unknown", 2, db) == {}
+
+
+def test_recent_co_occurrences(db):
+    save(FIRST_AMERICANA, db)
+    save(SECOND_AMERICANA, db)
+    names = [NAMES[4], NAMES[0], NAMES[1], "Unknown"]
+
+    assert sorted(recent_co_occurrences(names, 2, db)) == [(0, 1, 2), (0, 2, 1), (1, 2, 2)]
+    assert sorted(recent_co_occurrences(names, 1, db)) == [(0, 1, 1)]
+    assert recent_co_occurrences([NAMES[0], "Unknown"], 2, db) == []
+
+
+def test_history_keeps_deleted_players(db):
+    for name in NAMES:
+        controller.create_new_player(CreatePlayer(name=name, level=Levels.B), db)
+    save(FIRST_AMERICANA, db)
+
+    controller.delete_player(NAMES[1], db)
+
+    assert recent_teammates(NAMES[1], 1, db)[NAMES[0]] == 2
+    assert recent_teammates(NAMES[0], 1, db)[NAMES[1]] == 2
+    assert sorted(recent_co_occurrences([NAMES[1], NAMES[0], NAMES[5]], 1, db)) == [
+        (0, 1, 2),
+        (0, 2, 1),
+        (1, 2, 1),
+    ]
+
+    # a new player with the name of the deleted one is the same player in the history
+    controller.create_new_player(CreatePlayer(name=NAMES[1], level=Levels.C), db)
+    save(SECOND_AMERICANA, db)
+
+    assert recent_teammates(NAMES[1], 2, db)[NAMES[3]] == 2
@@ -0,0 +1,42 @@
+import threading
+
+import pytest
+
+from americanes_randomizer import instrumentation
+
+
+N_THREADS = 4
+
+
+@pytest.fixture
+def profiling(tmp_path):
+    instrumentation.configure(enabled=True, profile=True, metrics_dir=tmp_path)
+    yield tmp_path
+    instrumentation.configure(enabled=False, profile=False, metrics_dir=tmp_path)
+
+
+def test_only_one_thread_is_profiled_at_a_time(profiling):
+    barrier = threading.Barrier(N_THREADS)
+    errors = []
+
+    def open_span():
+        try:
+            with instrumentation.span("thread"):
+                with instrumentation.span("nested"):
+                    barrier.wait(timeout=5)
+        except Exception as error:
+            errors.append(error)
+
+    threads = [threading.Thread(target=open_span) for _ in range(N_THREADS)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    assert [path.name.split("-")[0] for path in profiling.glob("*.prof")] == ["thread"]
+
+    with instrumentation.span("after"):
+        pass
+
+    assert len(list(profiling.glob("after-*.prof"))) == 1
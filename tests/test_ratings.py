@@ -0,0 +1,181 @@
+import numpy as np
+import pytest
+from sqlalchemy import create_engine, inspect, select, text
+from sqlalchemy.orm import sessionmaker
+
+from americanes_randomizer.benchmark import random_roster
+from americanes_randomizer.constants import LEVEL_RATINGS, DistributionEngines, Levels
+from americanes_randomizer.db import controller
+from americanes_randomizer.db.models import MatchResult, Player
+from americanes_randomizer.db.ratings import load_ratings, rate_matches, record_match_results
+from americanes_randomizer.db.session import create_tables
+from americanes_randomizer.randomize_logic import distribute_americana
+from americanes_randomizer.ratings import (
+    ELO_SCALE,
+    K_FACTOR,
+    PROVISIONAL_K_FACTOR,
+    PROVISIONAL_MATCHES,
+    update_ratings,
+)
+from americanes_randomizer.schedule import schedule_americana
+from americanes_randomizer.schemas import CreateMatchResult, CreatePlayer
+
+
+PROBABILITY_MODIFICATION = 0.5
+
+
+def expected_share(team_rating: float, other_team_rating: float) -> float:
+    return 1 / (1 + 10 ** ((other_team_rating - team_rating) / ELO_SCALE))
+
+
+def test_update_ratings_follows_elo():
+    ratings = [1300.0, 1100.0, 1000.0, 1000.0]
+    rated_matches = [PROVISIONAL_MATCHES] * 4
+
+    new_ratings, new_rated_matches = update_ratings(
+        ratings, rated_matches, [[0, 1, 2, 3]], [[6, 2]]
+    )
+
+    change = K_FACTOR * (6 / 8 - expected_share(1200, 1000))
+    assert new_ratings == pytest.approx(
+        [1300 + change, 1100 + change, 1000 - change, 1000 - change]
+    )
+    assert new_rated_matches.tolist() == [PROVISIONAL_MATCHES + 1] * 4
+
+
+def test_update_ratings_rates_the_matches_of_an_event_together():
+    ratings = np.full(6, 1000.0)
+    rated_matches = np.full(6, PROVISIONAL_MATCHES)
+    match_players = [[0, 1, 2, 3], [0, 4, 1, 5]]
+
+    new_ratings, new_rated_matches = update_ratings(
+        ratings, rated_matches, match_players, [[6, 2], [0, 0]]
+    )
+
+    # both matches are rated against the ratings before the event, a match without games is even
+    change = K_FACTOR * (6 / 8 - 1 / 2)
+    assert new_ratings == pytest.approx(1000 + np.array([change, change, -change, -change, 0, 0]))
+    assert new_rated_matches.tolist() == [PROVISIONAL_MATCHES + n for n in (2, 2, 1, 1, 1, 1)]
+
+
+def test_provisional_players_move_faster():
+    ratings = [1000.0] * 4
+    rated_matches = [0, PROVISIONAL_MATCHES - 1, PROVISIONAL_MATCHES, PROVISIONAL_MATCHES + 5]
+
+    new_ratings, _ = update_ratings(ratings, rated_matches, [[0, 2, 1, 3]], [[6, 2]])
+
+    surprise = 6 / 8 - 1 / 2
+    assert new_ratings - 1000 == pytest.approx(
+        [
+            PROVISIONAL_K_FACTOR * surprise,
+            -PROVISIONAL_K_FACTOR * surprise,
+            K_FACTOR * surprise,
+            -K_FACTOR * surprise,
+        ]
+    )
+
+
+def test_create_tables_adds_the_rating_columns():
+    engine = create_engine("sqlite://")
+    with engine.begin() as connection:
+        # the player table of the versions of the app without ratings
+        connection.execute(text("CREATE TABLE player (name VARCHAR PRIMARY KEY, level VARCHAR(6))"))
+        connection.execute(text("INSERT INTO player (name, level) VALUES ('Anna Puig', 'B')"))
+
+    create_tables(engine)
+
+    columns = {column["name"] for column in inspect(engine).get_columns("player")}
+    assert {"rating", "rated_matches"} <= columns
+    with sessionmaker(bind=engine)() as db:
+        player = db.scalars(select(Player)).one()
+        assert (player.name, player.rating, player.rated_matches) == ("Anna Puig", None, 0)
+        assert load_ratings(["Anna Puig"], db) == [LEVEL_RATINGS[Levels.B]]
+    engine.dispose()
+
+
+@pytest.mark.parametrize("engine", list(DistributionEngines))
+@pytest.mark.parametrize("seed", range(5))
+def test_level_ratings_reproduce_level_draws(engine, seed):
+    roster = random_roster(np.random.default_rng(seed), 16)
+    ratings = np.array([LEVEL_RATINGS[level] for level in roster.levels()])
+
+    by_level = distribute_americana(roster, PROBABILITY_MODIFICATION, Levels.B, seed, engine)
+    by_rating = distribute_americana(
+        roster, PROBABILITY_MODIFICATION, Levels.B, seed, engine, ratings=ratings
+    )
+
+    assert by_rating == by_level
+
+
+def test_level_ratings_reproduce_level_schedules():
+    roster = random_roster(np.random.default_rng(0), 16)
+    ratings = np.array([LEVEL_RATINGS[level] for level in roster.levels()])
+
+    assert schedule_americana(
+        roster, 4, PROBABILITY_MODIFICATION, Levels.B, seed=0, ratings=ratings
+    ) == schedule_americana(roster, 4, PROBABILITY_MODIFICATION, Levels.B, seed=0)
+
+
+def match_result(event: str, court: int, players: list[str], games: tuple[int, int]):
+    return CreateMatchResult(
+        event=event,
+        round=1,
+        court=court,
+        player_1=players[0],
+        player_2=players[1],
+        player_3=players[2],
+        player_4=players[3],
+        games_1=games[0],
+        games_2=games[1],
+    )
+
+
+def test_rate_matches(db):
+    names = [f"Player {i}" for i in range(6)]
+    for name in names:
+        controller.create_new_player(CreatePlayer(name=name, level=Levels.B), db)
+
+    assert (
+        record_match_results(
+            [
+                match_result("First", 1, names[:4], (6, 2)),
+                match_result("First", 1, names[:4], (0, 8)),
+                match_result("Second", 1, names[2:], (4, 4)),
+                match_result("Second", 2, [*names[:3], "Deleted"], (8, 0)),
+            ],
+            db,
+        )
+        == 3
+    )
+
+    report = rate_matches(db)
+
+    assert (report.rated, report.skipped, report.missing_players) == (2, 1, ["Deleted"])
+    change = PROVISIONAL_K_FACTOR * (6 / 8 - 1 / 2)
+    level_rating = LEVEL_RATINGS[Levels.B]
+    # the second event starts from the ratings left by the first one
+    second_change = PROVISIONAL_K_FACTOR * (
+        1 / 2 - expected_share(level_rating - change, (level_rating + level_rating) / 2)
+    )
+    assert load_ratings(names, db) == pytest.approx(
+        [
+            level_rating + change,
+            level_rating + change,
+            level_rating - change + second_change,
+            level_rating - change + second_change,
+            level_rating - second_change,
+            level_rating - second_change,
+        ]
+    )
+    assert [player.rated_matches for player in controller.list_players("", None, db)] == [
+        1,
+        1,
+        2,
+        2,
+        1,
+        1,
+    ]
+    assert db.scalars(select(MatchResult.event).where(MatchResult.rated_at.is_(None))).all() == [
+        "Second"
+    ]
+    assert rate_matches(db).rated == 0
@@ -0,0 +1,88 @@
+import pytest
+
+from americanes_randomizer.constants import Levels
+from americanes_randomizer.db import controller
+from americanes_randomizer.db.roster_cache import RosterCache
+from americanes_randomizer.schemas import CreatePlayer
+
+
+PLAYERS = {
+    "Anna Puig": Levels.B,
+    "Joan-Pere Vila": Levels.C,
+    'Pau "Xino" Roca': Levels.B,
+    "Marta Solé": Levels.A,
+    "Àlex Martí": Levels.B,
+    "Laia - Amic": Levels.D,
+}
+QUERIES = ('"', "-", " - ", '"X', "a", "an", '"Xino"', "joan-", "sole", "amic", "zz", "")
+"""Typed one after the other, so the cache also narrows its last search"""
+
+
+@pytest.fixture
+def roster(db):
+    for name, level in PLAYERS.items():
+        controller.create_new_player(CreatePlayer(name=name, level=level), db)
+
+    return RosterCache(db)
+
+
+def cached_names(roster: RosterCache, search_name: str, search_level: Levels | None) -> set[str]:
+    return {player.name for player in roster.search(search_name, search_level)}
+
+
+def database_names(db, search_name: str, search_level: Levels | None) -> set[str]:
+    return {player.name for player in controller.list_players(search_name, search_level, db)}
+
+
+@pytest.mark.parametrize("search_level", [None, Levels.B])
+def test_cache_matches_controller(roster, db, search_level):
+    for search_name in QUERIES:
+        assert cached_names(roster, search_name, search_level) == database_names(
+            db, search_name, search_level
+        ), search_name
+
+
+def test_query_without_words_matches_text(roster):
+    assert cached_names(roster, '"', None) == {'Pau "Xino" Roca'}
+    assert cached_names(roster, "-", None) == {"Joan-Pere Vila", "Laia - Amic"}
+    assert cached_names(roster, "*", None) == set()
+
+
+def test_word_query_after_query_without_words(roster):
+    assert cached_names(roster, '"', None) == {'Pau "Xino" Roca'}
+    assert cached_names(roster, '"a', None) == {
+        "Anna Puig",
+        "Àlex Martí",
+        "Laia - Amic",
+    }
+
+
+def test_write_during_reload_is_kept(roster, db, monkeypatch):
+    load_roster = controller.load_roster
+    loads = []
+
+    def load_roster_and_write(*args):
+        loaded_roster = load_roster(*args)
+        if not loads:
+            # the player is created once the roster was read, as another thread could
+            roster.create_player(CreatePlayer(name="Nil Ferrer", level=Levels.C))
+        loads.append(loaded_roster)
+        return loaded_roster
+
+    monkeypatch.setattr(controller, "load_roster", load_roster_and_write)
+    roster.reload()
+
+    assert len(loads) == 2
+    assert cached_names(roster, "nil", None) == {"Nil Ferrer"}
+    assert len(roster) == len(PLAYERS) + 1
+
+
+def test_create_after_reload_is_not_duplicated(roster, db, monkeypatch):
+    player = controller.create_new_player(CreatePlayer(name="Nil Ferrer", level=Levels.C), db)
+    roster.reload()
+
+    # the write commits before a reload reads it, but patches the cache after the reload
+    monkeypatch.setattr(controller, "create_new_player", lambda *_: player)
+    roster.create_player(CreatePlayer(name="Nil Ferrer", level=Levels.C))
+
+    assert [p.name for p in roster.search("nil", None)] == ["Nil Ferrer"]
@@ -0,0 +1,80 @@
+from collections import Counter
+
+import numpy as np
+import pytest
+
+from americanes_randomizer.benchmark import random_roster
+from americanes_randomizer.constants import COURT_CAPACITY, Levels
+from americanes_randomizer.roster import PlayerRoster
+from americanes_randomizer.schedule import schedule_americana
+
+
+PROBABILITY_MODIFICATION = 0.5
+SCHEDULES = [(8, 4), (12, 5), (16, 5)]
+"""Players and rounds of schedules that can always avoid repeating a partner"""
+SEEDS = range(10)
+
+
+def teams(rounds: list[dict[int, list[str]]]) -> list[frozenset[str]]:
+    return [
+        frozenset(team)
+        for courts in rounds
+        for names in courts.values()
+        for team in (names[:2], names[2:])
+    ]
+
+
+@pytest.mark.parametrize(("n_players", "n_rounds"), SCHEDULES)
+def test_every_round_has_every_player_once(n_players, n_rounds):
+    roster = random_roster(np.random.default_rng(0), n_players)
+
+    rounds = schedule_americana(roster, n_rounds, PROBABILITY_MODIFICATION, Levels.B, seed=0)
+
+    assert len(rounds) == n_rounds
+    for courts in rounds:
+        assert list(courts) == list(range(n_players // COURT_CAPACITY))
+        assert all(len(names) == COURT_CAPACITY for names in courts.values())
+        assert sorted(name for names in courts.values() for name in names) == sorted(roster.names)
+
+
+def test_same_seed_gives_same_schedule():
+    roster = random_roster(np.random.default_rng(0), 16)
+
+    first = schedule_americana(roster, 5, PROBABILITY_MODIFICATION, Levels.B, seed=42)
+    second = schedule_americana(roster, 5, PROBABILITY_MODIFICATION, Levels.B, seed=42)
+    other = schedule_americana(roster, 5, PROBABILITY_MODIFICATION, Levels.B, seed=43)
+
+    assert first == second
+    assert first != other
+
+
+@pytest.mark.parametrize(("n_players", "n_rounds"), SCHEDULES)
+@pytest.mark.parametrize("seed", SEEDS)
+def test_no_partner_is_repeated_when_avoidable(n_players, n_rounds, seed):
+    roster = random_roster(np.random.default_rng(seed), n_players)
+
+    rounds = schedule_americana(roster, n_rounds, PROBABILITY_MODIFICATION, Levels.B, seed=seed)
+
+    assert [team for team, n in Counter(teams(rounds)).items() if n > 1] == []
+
+
+def test_single_court_plays_every_pairing():
+    roster = PlayerRoster([f"Player {i}" for i in range(COURT_CAPACITY)], [2] * COURT_CAPACITY)
+
+    rounds = schedule_americana(roster, 3, PROBABILITY_MODIFICATION, Levels.B, seed=0)
+
+    assert [list(courts) for courts in rounds] == [[0]] * 3
+    assert len(set(teams(rounds))) == 6
+
+
+def test_first_round_is_kept():
+    roster = random_roster(np.random.default_rng(0), 8)
+    first_round = {0: roster.names[4:], 1: roster.names[:4]}
+
+    rounds = schedule_americana(
+        roster, 3, PROBABILITY_MODIFICATION, Levels.B, seed=0, first_round=first_round
+    )
+
+    assert {court: set(names) for court, names in rounds[0].items()} == {
+        court: set(names) for court, names in first_round.items()
+    }
@@ -0,0 +1,52 @@
+import numpy as np
+import pytest
+
+from americanes_randomizer.americana import draw_americana
+from americanes_randomizer.benchmark import random_roster
+from americanes_randomizer.constants import Levels
+from americanes_randomizer.randomize_logic import distribute_americana_batch
+from americanes_randomizer.scoring import score_distributions, select_best_distributions
+
+
+PROBABILITY_MODIFICATION = 0.5
+
+
+@pytest.fixture
+def roster():
+    return random_roster(np.random.default_rng(0), 16)
+
+
+def test_select_best_distributions(roster):
+    candidates = distribute_americana_batch(
+        roster, PROBABILITY_MODIFICATION, Levels.B, n_samples=50, seed=0
+    )
+    scores = score_distributions(roster, candidates, Levels.B, PROBABILITY_MODIFICATION)
+
+    best, best_scores = select_best_distributions(
+        roster, candidates, Levels.B, PROBABILITY_MODIFICATION, k=3
+    )
+
+    assert best_scores.tolist() == sorted(scores)[:3]
+    assert scores[best].tolist() == best_scores.tolist()
+
+
+@pytest.mark.parametrize("k", [0, -1])
+def test_select_best_distributions_needs_k(roster, k):
+    candidates = distribute_americana_batch(
+        roster, PROBABILITY_MODIFICATION, Levels.B, n_samples=5, seed=0
+    )
+
+    with pytest.raises(ValueError, match="At least 1 distribution"):
+        select_best_distributions(roster, candidates, Levels.B, PROBABILITY_MODIFICATION, k=k)
+
+
+def test_select_best_distributions_needs_candidates(roster):
+    candidates = np.empty((0, len(roster)), dtype=np.intp)
+
+    with pytest.raises(ValueError, match="no candidate distributions"):
+        select_best_distributions(roster, candidates, Levels.B, PROBABILITY_MODIFICATION)
+
+
+def test_draw_americana_needs_best_of(roster):
+    with pytest.raises(ValueError, match="best_of=0"):
+        draw_americana(roster, PROBABILITY_MODIFICATION, Levels.B, best_of=0, seed=0)
@@ -0,0 +1,25 @@
+from sqlalchemy import text
+
+from americanes_randomizer.constants import Levels
+from americanes_randomizer.db import controller
+from americanes_randomizer.schemas import CreatePlayer
+
+
+def test_index_survives_renumbered_player_rowids(db):
+    for i in range(6):
+        controller.create_new_player(CreatePlayer(name=f"Jugador {i}", level=Levels.B), db)
+    controller.delete_player("Jugador 2", db)
+
+    # what a VACUUM may do to the implicit rowid of a table with a TEXT primary key
+    db.execute(text("UPDATE player SET rowid = rowid + 100"))
+    db.commit()
+
+    controller.delete_player("Jugador 4", db)
+
+    assert [player.name for player in controller.list_players("jugador", None, db)] == [
+        "Jugador 0",
+        "Jugador 1",
+        "Jugador 3",
+        "Jugador 5",
+    ]
+    db.execute(text("INSERT INTO player_fts (player_fts, rank) VALUES ('integrity-check', 1)"))